@@ -1,26 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
-from sqlmodel import Session, select
+from jose import jwt
+from sqlmodel import select
 import logging
 
-from app.database import get_session
+from app.database import RequestSession, get_async_session, use_read_replica
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token
-from app.core.security import verify_password, get_password_hash, create_access_token, get_current_active_user, get_current_user
+from app.core.security import verify_password_async, get_password_hash_async, create_access_token, get_current_active_user, get_current_user, oauth2_scheme
+from app.core.revocation import revocation_store
 from app.config import settings
-from typing import Set
 
 logger = logging.getLogger(__name__)
 
-# In-memory token blacklist
-# In production, this will be replaced with a Redis or database solution
-BLACKLISTED_TOKENS: Set[str] = set()
-
 router = APIRouter(tags=["Authentication"])
 
 @router.post("/register", response_model=UserResponse)
-def register_user(user: UserCreate, session: Session = Depends(get_session)):
+async def register_user(user: UserCreate, session: RequestSession = Depends(get_async_session)):
     # Check if user with this email or username already exists
 
     # existing_user = await User.find_one({
@@ -38,17 +35,19 @@ def register_user(user: UserCreate, session: Session = Depends(get_session)):
     #         raise HTTPException(status_code=400, detail="Username already registered")
     
 
-    db_user = session.exec(select(User).where(User.email == user.email)).first()
+    db_user = (await session.exec(select(User).where(User.email == user.email))).first()
     if db_user:
-        logger.warning(f"Registration attempt with existing email: {user.email}")
+        logger.warning("Registration attempt with existing email: %s", user.email)
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    db_user = session.exec(select(User).where(User.username == user.username)).first()
+    db_user = (await session.exec(select(User).where(User.username == user.username))).first()
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
+    # Don't hold a pooled connection while bcrypt runs
+    await session.release()
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         email=user.email,
         username=user.username,
@@ -56,46 +55,63 @@ def register_user(user: UserCreate, session: Session = Depends(get_session)):
     )
     
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await session.refresh(db_user)
 
     # await db_user.insert()
     
-    logger.info(f"Successfully registered new user: {user.username}")
+    logger.info("Successfully registered new user: %s", user.username)
     return db_user
 
 @router.post("/token", response_model=Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), session: RequestSession = Depends(get_async_session)):
     # Check if user exists
-    user = session.exec(select(User).where(User.username == form_data.username)).first()
+    user = (await session.exec(select(User).where(User.username == form_data.username))).first()
+    # Don't hold a pooled connection while bcrypt runs
+    await session.release()
+    
+    password_valid, new_hash = (False, None)
+    if user:
+        password_valid, new_hash = await verify_password_async(form_data.password, user.hashed_password)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        logger.warning(f"Failed login attempt for user: {form_data.username}")
+    if not password_valid:
+        logger.warning("Failed login attempt for user: %s", form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Transparently upgrade hashes made with a different bcrypt cost factor
+    if new_hash:
+        user.hashed_password = new_hash
+        session.add(user)
+        await session.commit()
+        logger.info("Rehashed password for user: %s", user.username)
+    
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
     
-    logger.info(f"Successful login for user: {form_data.username}")
+    logger.info("Successful login for user: %s", form_data.username)
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.get("/users/me", response_model=UserResponse)
-def read_users_me(current_user: User = Depends(get_current_active_user)):
+@router.get("/users/me", response_model=UserResponse, dependencies=[Depends(use_read_replica)])
+async def read_users_me(current_user: User = Depends(get_current_active_user)):
     return current_user
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
-def logout(token: str = Depends(get_current_user)):
+async def logout(token: str = Depends(oauth2_scheme), current_user: User = Depends(get_current_user)):
     """
-    Logout endpoint that invalidates the current token by adding it to a blacklist
+    Logout endpoint that revokes the current token until it expires
     """
-    # Add token to blacklist
-    BLACKLISTED_TOKENS.add(token)
-    logger.info(f"Token successfully blacklisted")
+    # get_current_user has already validated the token
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if payload.get("jti") is None:
+        raise HTTPException(status_code=400, detail="Token does not support revocation, it expires on its own")
+    
+    await revocation_store.revoke(payload["jti"], payload["exp"])
+    logger.info("Token successfully revoked for user: %s", current_user.username)
     return {"detail": "Successfully logged out"}
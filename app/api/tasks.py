@@ -1,24 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlmodel import Session, select, or_
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, delete, func, tuple_, update
+from sqlmodel import select, or_
 from typing import List, Optional
 import datetime
 from datetime import date
 import logging
+import orjson
 # from beanie import PydanticObjectId
-from app.database import get_session
+from app.database import RequestSession, get_async_session, use_read_replica
 from app.models.task import Task, PriorityEnum, StatusEnum
+from app.models.enums import ExportFormatEnum, TaskEventTypeEnum, TaskSortEnum
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskResponse, TaskUpdate
+from app.schemas.task import (
+    BulkItemStatusEnum,
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkItemResult,
+    TaskBulkResponse,
+    TaskBulkUpdate,
+    TaskChangesResponse,
+    TaskCreate,
+    TaskResponse,
+    TaskStatsResponse,
+    TaskUpdate,
+)
+from app.config import settings
+from app.core.events import (
+    TASK_KEYS,
+    event_broker,
+    events_query,
+    latest_event_id_query,
+    pruned_through_query,
+    stream_task_events,
+)
+from app.core.response_cache import response_cache
 from app.core.security import get_current_active_user
+from app.utils.etag import if_match_versions, list_etag, not_modified, task_etag
+from app.utils.export import MEDIA_TYPES, stream_export
+from app.utils.pagination import (
+    InvalidCursorError,
+    InvalidSyncTokenError,
+    decode_cursor,
+    decode_sync_token,
+    encode_cursor,
+    encode_sync_token,
+)
+from app.utils.search import apply_text_search, relevance_order, substring_filter
+from app.utils.serialization import (
+    TASK_RESPONSE_COLUMNS,
+    UnknownFieldError,
+    encode_row,
+    encode_rows,
+    response_columns,
+    with_required_columns,
+)
+from app.utils.sql import chunked, dialect_insert, dialect_name
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     task: TaskCreate,
-    session: Session = Depends(get_session),
+    session: RequestSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -30,7 +76,7 @@ def create_task(
     - **priority**: Optional. Task priority (Low/Medium/High)
     - **status**: Optional. Task status (Pending/Completed)
     """
-    logger.info(f"Creating new task: {task.title} for user: {current_user.username}")
+    logger.info("Creating new task: %s for user: %s", task.title, current_user.username)
     
     # db_task = Task(
     #     **task.dict(),
@@ -46,30 +92,308 @@ def create_task(
     )
     
     session.add(db_task)
-    session.commit()
-    logger.info(f"Task created successfully: ID {db_task.id}")
-    session.refresh(db_task)
+    event_broker.notify_after_commit(session, current_user.id)
+    await session.commit()
+    await response_cache.invalidate_user(current_user.id)
+    logger.info("Task created successfully: ID %s", db_task.id)
+    await session.refresh(db_task)
     
     return db_task
 
-@router.get("/", response_model=List[TaskResponse])
-def get_tasks(
+# Rows per multi-row INSERT; keeps each statement under SQLite's bind-parameter cap
+BULK_INSERT_CHUNK_SIZE = 1000
+
+def _bulk_response(results: List[TaskBulkItemResult]) -> TaskBulkResponse:
+    failed = sum(1 for r in results if r.status in (BulkItemStatusEnum.CONFLICT, BulkItemStatusEnum.NOT_FOUND))
+    return TaskBulkResponse(succeeded=len(results) - failed, failed=failed, results=results)
+
+@router.post("/bulk", response_model=TaskBulkResponse)
+async def bulk_create_tasks(
+    payload: TaskBulkCreate,
+    session: RequestSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Create many tasks in a single transaction.
+
+    Items whose title already exists for the user (or repeats an earlier item)
+    are reported as `conflict`; every other item is created.
+    """
+    logger.info("Bulk creating %s tasks for user: %s", len(payload.items), current_user.username)
+    
+    now = datetime.datetime.now()
+    results: List[Optional[TaskBulkItemResult]] = [None] * len(payload.items)
+    index_by_title = {}
+    rows = []
+    for index, item in enumerate(payload.items):
+        if item.title in index_by_title:
+            results[index] = TaskBulkItemResult(
+                index=index, status=BulkItemStatusEnum.CONFLICT, detail="Duplicate title in request"
+            )
+            continue
+        index_by_title[item.title] = index
+        rows.append({**item.model_dump(), "user_id": current_user.id, "created_at": now, "updated_at": now})
+    
+    # Multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING: rows that clash with
+    # uq_task_title_user_id are simply absent from the result
+    for chunk in chunked(rows, BULK_INSERT_CHUNK_SIZE):
+        stmt = (
+            dialect_insert(session, Task.__table__)
+            .values(chunk)
+            .on_conflict_do_nothing(index_elements=["title", "user_id"])
+            .returning(*Task.__table__.columns)
+        )
+        for row in (await session.execute(stmt)).mappings():
+            index = index_by_title[row["title"]]
+            results[index] = TaskBulkItemResult(
+                index=index, status=BulkItemStatusEnum.CREATED, id=row["id"], task=TaskResponse.model_validate(dict(row))
+            )
+    event_broker.notify_after_commit(session, current_user.id)
+    await session.commit()
+    await response_cache.invalidate_user(current_user.id)
+    
+    for title, index in index_by_title.items():
+        if results[index] is None:
+            results[index] = TaskBulkItemResult(
+                index=index, status=BulkItemStatusEnum.CONFLICT, detail="Task with this title already exists"
+            )
+    logger.info("Bulk create finished for user_id=%s", current_user.id)
+    return _bulk_response(results)
+
+@router.patch("/bulk", response_model=TaskBulkResponse)
+async def bulk_update_tasks(
+    payload: TaskBulkUpdate,
+    session: RequestSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Update many tasks in a single transaction.
+
+    Each item carries the task `id` plus only the fields to change. Unknown
+    ids are reported as `not_found`, title clashes as `conflict`.
+    """
+    logger.info("Bulk updating %s tasks for user: %s", len(payload.items), current_user.username)
+    
+    ids = {item.id for item in payload.items}
+    owned = (await session.exec(
+        select(Task.id, Task.title).where(Task.user_id == current_user.id, Task.id.in_(ids))
+    )).all()
+    title_by_id = dict(owned)
+    
+    new_titles = {item.title for item in payload.items if item.title is not None}
+    title_owner = {}
+    if new_titles:
+        title_owner = {title: task_id for task_id, title in (await session.exec(
+            select(Task.id, Task.title).where(Task.user_id == current_user.id, Task.title.in_(new_titles))
+        )).all()}
+    renamed_ids = {
+        item.id for item in payload.items
+        if item.title is not None and item.id in title_by_id and item.title != title_by_id[item.id]
+    }
+    
+    now = datetime.datetime.now()
+    results: List[TaskBulkItemResult] = []
+    params = []
+    # Renames onto a title another task in this batch gives up must run after it
+    deferred = {}
+    seen_ids = set()
+    claimed_titles = set()
+    for index, item in enumerate(payload.items):
+        if item.id not in title_by_id:
+            results.append(TaskBulkItemResult(index=index, status=BulkItemStatusEnum.NOT_FOUND, id=item.id, detail="Task not found"))
+            continue
+        if item.id in seen_ids:
+            results.append(TaskBulkItemResult(index=index, status=BulkItemStatusEnum.CONFLICT, id=item.id, detail="Duplicate id in request"))
+            continue
+        seen_ids.add(item.id)
+        owner = None
+        if item.id in renamed_ids:
+            owner = title_owner.get(item.title)
+            if item.title in claimed_titles or (owner is not None and owner not in renamed_ids):
+                results.append(TaskBulkItemResult(index=index, status=BulkItemStatusEnum.CONFLICT, id=item.id, detail="Task with this title already exists"))
+                continue
+            claimed_titles.add(item.title)
+        changes = {**item.model_dump(exclude_unset=True), "updated_at": now}
+        result = TaskBulkItemResult(index=index, status=BulkItemStatusEnum.UPDATED, id=item.id)
+        results.append(result)
+        if owner is not None:
+            deferred[item.id] = (owner, changes, result)
+        else:
+            params.append(changes)
+    
+    # A title is only given up if its owner's own rename went through; drop
+    # renames waiting on rejected ones, and any waiting on those in turn
+    accepted_renames = {r.id for r in results if r.status == BulkItemStatusEnum.UPDATED} & renamed_ids
+    blocked = [task_id for task_id, (owner, _, _) in deferred.items() if owner not in accepted_renames]
+    while blocked:
+        for task_id in blocked:
+            result = deferred.pop(task_id)[2]
+            result.status = BulkItemStatusEnum.CONFLICT
+            result.detail = "Task with this title already exists"
+            accepted_renames.discard(task_id)
+        blocked = [task_id for task_id, (owner, _, _) in deferred.items() if owner not in accepted_renames]
+    
+    ordered = []
+    while deferred:
+        ready = [task_id for task_id, (owner, _, _) in deferred.items() if owner not in deferred]
+        if not ready:
+            # Only cycles are left, e.g. two tasks swapping titles
+            for _, _, result in deferred.values():
+                result.status = BulkItemStatusEnum.CONFLICT
+                result.detail = "Title swaps within one request are not supported"
+            break
+        for task_id in ready:
+            ordered.append(deferred.pop(task_id)[1])
+    
+    if params:
+        # ORM bulk UPDATE by primary key: one executemany per distinct column set
+        await session.execute(update(Task), params)
+    for changes in ordered:
+        await session.execute(update(Task), [changes])
+    updated_ids = [r.id for r in results if r.status == BulkItemStatusEnum.UPDATED]
+    if updated_ids:
+        updated = (await session.exec(select(Task).where(Task.id.in_(updated_ids)))).all()
+        task_by_id = {task.id: TaskResponse.model_validate(task) for task in updated}
+        for result in results:
+            if result.status == BulkItemStatusEnum.UPDATED:
+                result.task = task_by_id[result.id]
+    event_broker.notify_after_commit(session, current_user.id)
+    await session.commit()
+    await response_cache.invalidate_user(current_user.id)
+    
+    logger.info("Bulk update finished for user_id=%s", current_user.id)
+    return _bulk_response(results)
+
+@router.delete("/bulk", response_model=TaskBulkResponse)
+async def bulk_delete_tasks(
+    payload: TaskBulkDelete,
+    session: RequestSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Delete many tasks by id in a single statement.
+    """
+    logger.info("Bulk deleting %s tasks for user: %s", len(payload.ids), current_user.username)
+    
+    stmt = (
+        delete(Task)
+        .where(Task.user_id == current_user.id, Task.id.in_(set(payload.ids)))
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted_ids = set((await session.execute(stmt)).scalars().all())
+    event_broker.notify_after_commit(session, current_user.id)
+    await session.commit()
+    await response_cache.invalidate_user(current_user.id)
+    
+    results = []
+    for index, task_id in enumerate(payload.ids):
+        if task_id in deleted_ids:
+            results.append(TaskBulkItemResult(index=index, status=BulkItemStatusEnum.DELETED, id=task_id))
+            # A repeated id counts once
+            deleted_ids.discard(task_id)
+        else:
+            results.append(TaskBulkItemResult(index=index, status=BulkItemStatusEnum.NOT_FOUND, id=task_id, detail="Task not found"))
+    logger.info("Bulk delete finished for user_id=%s", current_user.id)
+    return _bulk_response(results)
+
+# Columns that can drive keyset pagination, keyed by the public sort name
+SORT_COLUMNS = {
+    TaskSortEnum.ID: Task.id,
+    TaskSortEnum.DUE_DATE: Task.due_date,
+    TaskSortEnum.CREATED_AT: Task.created_at,
+}
+
+def build_task_query(
+    user_id: int,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    due_date: Optional[date] = None,
+    status: Optional[StatusEnum] = None,
+    priority: Optional[PriorityEnum] = None,
+    q: Optional[str] = None,
+    dialect: Optional[str] = None,
+):
+    """
+    Build the filtered task query shared by the list endpoints.
+
+    `dialect` selects the full-text implementation used for `q`.
+    """
+    query = select(Task).where(Task.user_id == user_id)
+    
+    # Apply filters if provided
+    if q:
+        query = apply_text_search(query, q, dialect)
+    if title:
+        query = query.where(substring_filter(Task.title, title))
+    if description:  
+        query = query.where(substring_filter(Task.description, description))
+    if due_date:     
+        query = query.where(Task.due_date == due_date)
+    if status:
+        query = query.where(Task.status == status)
+    if priority:
+        query = query.where(Task.priority == priority)
+    return query
+
+def paginate_task_query(query, sort_by: TaskSortEnum, skip: int = 0, limit: int = 50, after=None):
+    """
+    Order query by (sort_by, id) and apply either keyset or offset pagination.
+
+    `after` is the decoded (sort value, id) of the last row already seen.
+    """
+    sort_column = SORT_COLUMNS[sort_by]
+    if after is not None:
+        last_value, last_id = after
+        if sort_by == TaskSortEnum.ID:
+            query = query.where(Task.id > last_id)
+        else:
+            query = query.where(tuple_(sort_column, Task.id) > tuple_(last_value, last_id))
+    else:
+        query = query.offset(skip)
+    
+    if sort_by == TaskSortEnum.ID:
+        query = query.order_by(Task.id)
+    else:
+        query = query.order_by(sort_column, Task.id)
+    return query.limit(limit)
+
+@router.get("/", response_model=List[TaskResponse], dependencies=[Depends(use_read_replica)])
+async def get_tasks(
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
+    sort_by: TaskSortEnum = TaskSortEnum.ID,
+    q: Optional[str] = Query(None, description="Search title and description"),
     title: Optional[str] = None,
     description: Optional[str] = None,
     due_date: Optional[date] = None,
     status: Optional[StatusEnum] = None,
     priority: Optional[PriorityEnum] = None,
-    session: Session = Depends(get_session),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,status,due_date"),
+    if_none_match: Optional[str] = Header(None),
+    session: RequestSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get all tasks for the current user.
     
-    Supports filtering by title, status, and priority.
+    Supports filtering by title, status, and priority. `title` and `description`
+    match case-insensitive substrings; `q` searches both fields and can be
+    combined with `sort_by=relevance` to rank the best matches first.
+
+    Results are ordered by `sort_by` (then id). Pass the `X-Next-Cursor` response
+    header back as `cursor` to fetch the next page at constant cost; `skip` is
+    still honoured for older clients but gets slower on deep pages.
+
+    Responses carry an `ETag`; send it back in `If-None-Match` to get a
+    `304 Not Modified` while the page is unchanged.
+
+    `fields` limits both the columns read and the fields returned.
+
+    Pages are cached server-side until the user's next write.
     """
-    logger.info(f"Fetching tasks for user: {current_user.username} with filters: title={title}, status={status}, priority={priority}")
+    logger.info("Fetching tasks for user: %s with filters: title=%s, status=%s, priority=%s", current_user.username, title, status, priority)
 
     # query = {"user_id": str(current_user.id)}
     
@@ -82,77 +406,335 @@ def get_tasks(
         
     # tasks = await Task.find(query).skip(skip).limit(limit).to_list()
 
-    query = select(Task).where(Task.user_id == current_user.id)
+    try:
+        columns = response_columns(fields)
+    except UnknownFieldError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    keys = [column.key for column in columns]
     
-    # Apply filters if provided
-    if title:
-        query = query.where(Task.title.contains(title))
-    if description:  
-        query = query.where(Task.description.contains(description))
-    if due_date:     
-        query = query.where(Task.due_date == due_date)
-    if status:
-        query = query.where(Task.status == status)
-    if priority:
-        query = query.where(Task.priority == priority)
+    # Only successful responses are cached, so a hit needs no further checks
+    slot, cached = await response_cache.lookup(
+        current_user.id, "list", q, title, description, due_date, status, priority, sort_by, cursor, skip, limit, fields
+    )
+    if cached is not None:
+        headers, body = cached
+        if not_modified(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+    
+    dialect = dialect_name(session)
+    query = build_task_query(current_user.id, title, description, due_date, status, priority, q, dialect)
+    # Plain column rows are encoded straight to JSON below, skipping ORM
+    # instances and per-row TaskResponse validation. The ETag and cursor need
+    # id, updated_at and the sort key even when they are not requested.
+    required = [Task.id, Task.updated_at]
+    if sort_by != TaskSortEnum.RELEVANCE:
+        required.append(SORT_COLUMNS[sort_by])
+    query = query.with_only_columns(*with_required_columns(columns, required))
     
-    # Apply pagination
-    query = query.offset(skip).limit(limit)
+    if sort_by == TaskSortEnum.RELEVANCE:
+        # Ranked results page with skip/limit only: scores make poor cursor keys
+        if not q:
+            raise HTTPException(status_code=400, detail="sort_by=relevance requires q")
+        if cursor:
+            raise HTTPException(status_code=400, detail="cursor is not supported with sort_by=relevance")
+        query = query.order_by(relevance_order(q, dialect), Task.id).offset(skip).limit(limit)
+    else:
+        # Apply pagination
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor, sort_by)
+            except InvalidCursorError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+        query = paginate_task_query(query, sort_by, skip=skip, limit=limit, after=after)
     
-    tasks = session.exec(query).all()
-    logger.debug(f"Retrieved {len(tasks)} tasks for user_id={current_user.id}")
-    return tasks
+    tasks = (await session.execute(query)).all()
+    # Done with the database: hand the connection back before encoding
+    await session.release()
+    logger.debug("Retrieved %s tasks for user_id=%s", len(tasks), current_user.id)
+    
+    # The ETag only needs (id, updated_at), so an unchanged page is answered
+    # without serializing the response. A projection is a different
+    # representation, so it gets a different tag.
+    variant = ",".join(keys) if fields is not None else ""
+    headers = {"ETag": list_etag(((task.id, task.updated_at) for task in tasks), variant)}
+    if sort_by != TaskSortEnum.RELEVANCE and tasks and len(tasks) == limit:
+        last = tasks[-1]
+        headers["X-Next-Cursor"] = encode_cursor(sort_by, getattr(last, sort_by.value), last.id)
+    if not_modified(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    body = encode_rows(keys, tasks)
+    await response_cache.store(slot, headers, body, from_replica=session.info.get("read_from_replica", False))
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Columns written by GET /tasks/export, in output order
+EXPORT_COLUMNS = (
+    Task.id, Task.user_id, Task.title, Task.description, Task.due_date,
+    Task.priority, Task.status, Task.created_at, Task.updated_at,
+)
+EXPORT_BATCH_SIZE = 1000
 
-@router.get("/{task_id}", response_model=TaskResponse)
-def get_task(
+@router.get("/export", response_class=StreamingResponse)
+async def export_tasks(
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.NDJSON, alias="format"),
+    q: Optional[str] = Query(None, description="Search title and description"),
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    due_date: Optional[date] = None,
+    status: Optional[StatusEnum] = None,
+    priority: Optional[PriorityEnum] = None,
+    session: RequestSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Export all of the current user's tasks as NDJSON (one object per line) or CSV.
+
+    Accepts the same filters as `GET /tasks/`. Rows are ordered by id and
+    streamed as they are read, so exports of any size run in constant memory.
+    """
+    logger.info("Exporting tasks for user: %s as %s", current_user.username, export_format.value)
+    
+    query = build_task_query(current_user.id, title, description, due_date, status, priority, q, dialect_name(session))
+    query = query.with_only_columns(*EXPORT_COLUMNS).order_by(Task.id)
+    
+    return StreamingResponse(
+        stream_export(session.bind, query, export_format, EXPORT_BATCH_SIZE),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format.value}"'},
+    )
+
+@router.get("/events", response_class=StreamingResponse)
+async def task_events(
+    last_event_id: Optional[int] = Header(None),
+    session: RequestSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Server-sent events for changes to the current user's tasks, instead of
+    polling `GET /tasks/`.
+
+    Events are `created`, `updated` and `deleted`; each carries `task_id` and
+    the task as it is now (`null` once deleted). Reconnect with the last
+    event's `id` in `Last-Event-ID` to receive what was missed; without it
+    the stream starts at the next change. Streams whose client falls too far
+    behind end with a `dropped` event and should reconnect the same way.
+    """
+    logger.info("Opening task event stream for user: %s", current_user.username)
+    
+    if last_event_id is None:
+        last_event_id = (await session.execute(latest_event_id_query(current_user.id))).scalar()
+    elif last_event_id < (await session.execute(pruned_through_query(current_user.id))).scalar():
+        raise HTTPException(status_code=410, detail="Events since Last-Event-ID have been pruned; reload the tasks")
+    await session.release()
+    
+    return StreamingResponse(
+        stream_task_events(
+            session.bind, event_broker, current_user.id, last_event_id,
+            settings.EVENTS_BATCH_SIZE, settings.EVENTS_KEEPALIVE_SECONDS,
+        ),
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/changes", response_model=TaskChangesResponse, dependencies=[Depends(use_read_replica)])
+async def get_task_changes(
+    since: Optional[str] = Query(None, description="sync_token from the previous call; omit for a full snapshot"),
+    limit: int = Query(1000, ge=1, le=5000, description="Maximum change events read per call"),
+    session: RequestSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Tasks changed since a sync token, for clients that keep an offline copy.
+
+    Without `since` every task is returned along with a first `sync_token`.
+    With it, `changes` holds tasks created or updated since then, as they are
+    now, and `deleted` the ids of tasks removed since then. Apply both and
+    store the new `sync_token`; while `has_more` is true, call again.
+
+    Tokens are positions in the task event log, so clock skew between
+    servers or clients cannot lose changes. Changes older than the event
+    log's retention are gone: such tokens get `410 Gone`, after which the
+    client should start over without `since`.
+    """
+    logger.info("Fetching task changes for user: %s since %s", current_user.username, since)
+    
+    if since is None:
+        # Read the position before the tasks: a write committed in between is
+        # in the snapshot and sent again as a change, never missed
+        position = max(
+            (await session.execute(latest_event_id_query(current_user.id))).scalar(),
+            (await session.execute(pruned_through_query(current_user.id))).scalar(),
+        )
+        query = select(*TASK_RESPONSE_COLUMNS).where(Task.user_id == current_user.id).order_by(Task.id)
+        tasks = (await session.execute(query)).all()
+        await session.release()
+        body = {
+            "changes": [dict(zip(TASK_KEYS, task)) for task in tasks],
+            "deleted": [],
+            "sync_token": encode_sync_token(position),
+            "has_more": False,
+        }
+        return Response(content=orjson.dumps(body), media_type="application/json")
+    
+    try:
+        position = decode_sync_token(since)
+    except InvalidSyncTokenError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sync token: {e}")
+    pruned_through = (await session.execute(pruned_through_query(current_user.id))).scalar()
+    if position < pruned_through:
+        raise HTTPException(status_code=410, detail="Changes since this sync token have been pruned; resync without since")
+    rows = (await session.execute(events_query(current_user.id, position, limit))).all()
+    await session.release()
+    
+    # A task changed several times is reported once, as of its last event
+    latest = {}
+    for event_id, event_type, task_id, *task in rows:
+        latest.pop(task_id, None)
+        latest[task_id] = (event_type, task)
+        position = event_id
+    changes, deleted = [], []
+    for task_id, (event_type, task) in latest.items():
+        # A task deleted after this page has no row left to send yet
+        if event_type == TaskEventTypeEnum.DELETED or task[TASK_KEYS.index("id")] is None:
+            deleted.append(task_id)
+        else:
+            changes.append(dict(zip(TASK_KEYS, task)))
+    body = {
+        "changes": changes,
+        "deleted": deleted,
+        "sync_token": encode_sync_token(position),
+        "has_more": len(rows) == limit,
+    }
+    return Response(content=orjson.dumps(body), media_type="application/json")
+
+@router.get("/stats", response_model=TaskStatsResponse)
+async def get_task_stats(
+    session: RequestSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Task counts for dashboards: by status and priority, overdue, and due this week.
+
+    Computed by a single grouped query over the user's tasks.
+    """
+    logger.info("Computing task stats for user: %s", current_user.username)
+    
+    today = date.today()
+    week_end = today + datetime.timedelta(days=6 - today.weekday())
+    is_open = Task.status != StatusEnum.COMPLETED
+    query = (
+        select(
+            Task.status,
+            Task.priority,
+            func.count().label("count"),
+            func.sum(case((and_(is_open, Task.due_date < today), 1), else_=0)).label("overdue"),
+            func.sum(case((and_(is_open, Task.due_date.between(today, week_end)), 1), else_=0)).label("due_this_week"),
+        )
+        .where(Task.user_id == current_user.id)
+        .group_by(Task.status, Task.priority)
+    )
+    rows = (await session.execute(query)).all()
+    await session.release()
+    
+    # Every status and priority is reported, including empty ones
+    by_status_priority = {task_status: {task_priority: 0 for task_priority in PriorityEnum} for task_status in StatusEnum}
+    for row in rows:
+        by_status_priority[row.status][row.priority] = row.count
+    
+    return TaskStatsResponse(
+        as_of=today,
+        total=sum(row.count for row in rows),
+        by_status={task_status: sum(counts.values()) for task_status, counts in by_status_priority.items()},
+        by_priority={
+            task_priority: sum(counts[task_priority] for counts in by_status_priority.values())
+            for task_priority in PriorityEnum
+        },
+        by_status_priority=by_status_priority,
+        overdue=sum(row.overdue for row in rows),
+        due_this_week=sum(row.due_this_week for row in rows),
+    )
+
+@router.get("/{task_id}", response_model=TaskResponse, dependencies=[Depends(use_read_replica)])
+async def get_task(
     task_id: int,
-    session: Session = Depends(get_session),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,status,due_date"),
+    if_none_match: Optional[str] = Header(None),
+    session: RequestSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get a specific task by its ID.
+
+    Honours `If-None-Match` with `304 Not Modified`. `fields` limits the
+    fields returned; projected responses carry a weak `ETag`, which cannot be
+    used for `If-Match`.
     """
-    logger.info(f"Fetching task_id={task_id} for user_id={current_user.id}")
+    logger.info("Fetching task_id=%s for user_id=%s", task_id, current_user.id)
     
     #  task = await Task.find_one({
     #     "_id": task_id,
     #     "user_id": str(current_user.id)
     # })
 
-    task = session.exec(select(Task).where(Task.id == task_id, Task.user_id == current_user.id)).first()
+    try:
+        columns = response_columns(fields)
+    except UnknownFieldError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    keys = [column.key for column in columns]
+    
+    slot, cached = await response_cache.lookup(current_user.id, "detail", task_id, fields)
+    if cached is not None:
+        headers, body = cached
+        if not_modified(if_none_match, headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+    
+    query = select(Task).where(Task.id == task_id, Task.user_id == current_user.id)
+    query = query.with_only_columns(*with_required_columns(columns, [Task.id, Task.updated_at]))
+    task = (await session.execute(query)).first()
+    await session.release()
     
     if not task:
-        logger.warning(f"Task not found: task_id={task_id}, user_id={current_user.id}")
+        logger.warning("Task not found: task_id=%s, user_id=%s", task_id, current_user.id)
         raise HTTPException(status_code=404, detail="Task not found")
     
-    logger.debug(f"Retrieved task: {task.title} (task_id={task_id})")
+    logger.debug("Retrieved task_id=%s", task_id)
 
-    return task
+    etag = task_etag(task.id, task.updated_at)
+    if fields is not None:
+        etag = f"W/{etag}"
+    if not_modified(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    body = encode_row(keys, task)
+    await response_cache.store(slot, {"ETag": etag}, body, from_replica=session.info.get("read_from_replica", False))
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 @router.put("/{task_id}", response_model=TaskResponse)
-def update_task(
+async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    session: Session = Depends(get_session),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    session: RequestSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Update a specific task by its ID.
     
     Only provide the fields you want to update.
+
+    Send the task's `ETag` in `If-Match` to update only if nobody changed it
+    in the meantime; otherwise the request fails with `412 Precondition Failed`.
     """
-    logger.info(f"Updating task {task_id} for user: {current_user.username}")
+    logger.info("Updating task %s for user: %s", task_id, current_user.username)
     
     # task = await Task.find_one({
     #     "_id": task_id,
     #     "user_id": str(current_user.id)
     # })
     
-    db_task = session.exec(select(Task).where(Task.id == task_id, Task.user_id == current_user.id)).first()
-    
-    if not db_task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
     # update_data = task_update.dict(exclude_unset=True)
     # if update_data:
     #     await task.update({"$set": update_data})
@@ -163,29 +745,47 @@ def update_task(
     # Update only the provided fields
     task_data = task_update.dict(exclude_unset=True)
     
-    for key, value in task_data.items():
-        setattr(db_task, key, value)
-    
-    # Always update the updated_at timestamp
-    db_task.updated_at = datetime.datetime.now()
+    # One UPDATE ... RETURNING does the ownership check, the write and the
+    # read-back; the updated_at timestamp is always bumped
+    stmt = (
+        update(Task)
+        .where(Task.id == task_id, Task.user_id == current_user.id)
+        .values(**task_data, updated_at=datetime.datetime.now())
+        .returning(Task)
+        .execution_options(synchronize_session=False)
+    )
+    versions = if_match_versions(if_match, task_id) if if_match is not None else None
+    if versions is not None:
+        # Write only if the row is still a version the client validated
+        stmt = stmt.where(Task.updated_at.in_(versions))
     
-    session.add(db_task)
-    session.commit()
-    logger.info(f"Task {task_id} updated successfully")
-    session.refresh(db_task)
+    db_task = (await session.execute(stmt)).scalars().first()
+    if db_task is None:
+        # Nothing was written; only a failed precondition needs a second
+        # look to tell 412 from 404
+        if versions is not None and (await session.exec(
+            select(Task.id).where(Task.id == task_id, Task.user_id == current_user.id)
+        )).first() is not None:
+            raise HTTPException(status_code=412, detail="Task has been modified")
+        raise HTTPException(status_code=404, detail="Task not found")
+    event_broker.notify_after_commit(session, current_user.id)
+    await session.commit()
+    await response_cache.invalidate_user(current_user.id)
+    logger.info("Task %s updated successfully", task_id)
     
+    response.headers["ETag"] = task_etag(db_task.id, db_task.updated_at)
     return db_task
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     task_id: int,
-    session: Session = Depends(get_session),
+    session: RequestSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Delete a specific task by its ID.
     """
-    logger.info(f"Deleting task {task_id} for user: {current_user.username}")
+    logger.info("Deleting task %s for user: %s", task_id, current_user.username)
     
     # delete_result = await Task.find_one({
     #     "_id": task_id,
@@ -197,14 +797,21 @@ def delete_task(
     
     # logger.info(f"Task {task_id} deleted successfully")
     
-    db_task = session.exec(select(Task).where(Task.id == task_id, Task.user_id == current_user.id)).first()
+    stmt = (
+        delete(Task)
+        .where(Task.id == task_id, Task.user_id == current_user.id)
+        .returning(Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted_id = (await session.execute(stmt)).scalar()
     
-    if not db_task:
+    if deleted_id is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    session.delete(db_task)
-    session.commit()
-    logger.info(f"Task {task_id} deleted successfully")
+    event_broker.notify_after_commit(session, current_user.id)
+    await session.commit()
+    await response_cache.invalidate_user(current_user.id)
+    logger.info("Task %s deleted successfully", task_id)
     
     return None
 
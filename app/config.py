@@ -3,6 +3,17 @@ from dotenv import load_dotenv # type: ignore
 
 load_dotenv()
 
+# Async drivers used for each sync database URL scheme
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
 class Settings:
     PROJECT_NAME: str = "Task Management API"
     PROJECT_VERSION: str = "1.0.0"
@@ -16,18 +27,95 @@ class Settings:
     POSTGRES_SERVER: str = os.getenv("POSTGRES_SERVER", "localhost")
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "task_management")
-    DATABASE_URL: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
+    DATABASE_URL: str = os.getenv(
+        "DATABASE_URL",
+        f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}",
+    )
+    # Request handlers run on this async URL; DATABASE_URL stays for sync callers
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", async_database_url(DATABASE_URL))
+    
+    # Streaming read replicas, comma-separated. Replica-eligible reads go to one
+    # whose lag is within REPLICA_MAX_LAG_SECONDS, else to the primary.
+    DATABASE_REPLICA_URLS: str = os.getenv("DATABASE_REPLICA_URLS", "")
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+    REPLICA_CHECK_INTERVAL_SECONDS: float = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "2"))
     
+    # Connection pools, per engine and per process. DB_NULL_POOL opens a new
+    # connection per checkout, for running behind an external pooler.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_NULL_POOL: bool = os.getenv("DB_NULL_POOL", "False").lower() in ("true", "1", "t", "yes")
+    # Ping connections idle at least this long on checkout; 0 pings every
+    # checkout, a negative value never pings
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = float(os.getenv("DB_POOL_PRE_PING_IDLE_SECONDS", "30"))
+    # Open DB_POOL_SIZE connections at startup
+    DB_POOL_WARMUP: bool = os.getenv("DB_POOL_WARMUP", "True").lower() in ("true", "1", "t", "yes")
+    # PgBouncer transaction pooling: no reuse of server-side prepared statements
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "False").lower() in ("true", "1", "t", "yes")
+
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Password hashing: bcrypt cost factor and the bounded worker pool it runs on
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+    # Authenticated principal cache (see app/core/principal_cache.py). Entries
+    # are evicted only in the process that changed the user, and only for ORM
+    # flushes: on other workers, or after a Core update(User), a deactivated or
+    # deleted user or an old password stays authenticated for up to the TTL,
+    # so keep it short.
+    PRINCIPAL_CACHE_MAX_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "5"))
+
+    # Token revocation: "memory" (single replica) or "database" (shared by all
+    # replicas through the revoked_tokens table, see app/core/revocation.py)
+    REVOCATION_BACKEND: str = os.getenv("REVOCATION_BACKEND", "memory")
+    REVOCATION_SYNC_INTERVAL_SECONDS: float = float(os.getenv("REVOCATION_SYNC_INTERVAL_SECONDS", "1"))
+    REVOCATION_REBUILD_INTERVAL_SECONDS: float = float(os.getenv("REVOCATION_REBUILD_INTERVAL_SECONDS", "300"))
+    REVOCATION_BLOOM_CAPACITY: int = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+    REVOCATION_BLOOM_ERROR_RATE: float = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+
     DEBUG: bool = os.getenv("DEBUG", "False").lower() in ("true", "1", "t", "yes")
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     LOG_FILE: str = "logs/app.log"
     LOG_MAX_SIZE: int = 10 * 1024 * 1024  # 10 MB
     LOG_BACKUP_COUNT: int = 5
+    # Structured JSON lines; set to false for the plain LOG_FORMAT text
+    LOG_JSON: bool = os.getenv("LOG_JSON", "True").lower() in ("true", "1", "t", "yes")
+    # Report each request's SQL statement count and time in a Server-Timing header
+    SERVER_TIMING: bool = os.getenv("SERVER_TIMING", "False").lower() in ("true", "1", "t", "yes")
+
+    # Cached GET /tasks/ and /tasks/{id} responses (see app/core/response_cache.py):
+    # "none", "redis" (shared through REDIS_URL) or "memory", which is only
+    # correct when a single process serves the API: one replica, one worker
+    RESPONSE_CACHE_BACKEND: str = os.getenv("RESPONSE_CACHE_BACKEND", "none")
+    RESPONSE_CACHE_MAX_BYTES: int = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+    RESPONSE_CACHE_TTL_SECONDS: float = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # Task change feed (GET /tasks/events): "memory" (single replica) or
+    # "postgres" (LISTEN/NOTIFY fan-out to every replica)
+    EVENTS_BACKEND: str = os.getenv("EVENTS_BACKEND", "memory")
+    # Unread change notifications per stream before it is dropped as too slow
+    EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+    EVENTS_BATCH_SIZE: int = int(os.getenv("EVENTS_BATCH_SIZE", "500"))
+    EVENTS_KEEPALIVE_SECONDS: float = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+    # How long task_events keeps changes; clients offline for longer get 410
+    # from GET /tasks/changes and resync from a fresh snapshot
+    EVENTS_RETENTION_DAYS: int = int(os.getenv("EVENTS_RETENTION_DAYS", "30"))
+    EVENTS_PRUNE_INTERVAL_SECONDS: float = float(os.getenv("EVENTS_PRUNE_INTERVAL_SECONDS", "3600"))
+
+    # Records waiting for the logging thread; beyond this they are dropped
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Fraction of INFO/DEBUG records kept per logger, e.g. "app.api.tasks=0.1,app.core.security=0.01"
+    LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "")
 
 settings = Settings()
 
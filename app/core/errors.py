@@ -1,7 +1,6 @@
 from fastapi import Request, status
 from fastapi.exceptions import RequestValidationError, HTTPException
 import logging
-import traceback
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from typing import Union, Dict, Any
@@ -13,8 +12,8 @@ class ErrorHandlers:
     @staticmethod
     async def integrity_error_handler(request: Request, exc: IntegrityError):
         error_location = f"{request.method} {request.url.path}"
-        logger.error(f"Database integrity error at {error_location}: {str(exc)}")
-        logger.debug(f"Integrity error details: {traceback.format_exc()}")
+        logger.error("Database integrity error at %s: %s", error_location, exc)
+        logger.debug("Integrity error details", exc_info=exc)
         
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,8 +24,8 @@ class ErrorHandlers:
     async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError):
         # Handle other database-related errors
         error_location = f"{request.method} {request.url.path}"
-        logger.error(f"Database error at {error_location}: {str(exc)}")
-        logger.debug(f"Database error details: {traceback.format_exc()}")
+        logger.error("Database error at %s: %s", error_location, exc)
+        logger.debug("Database error details", exc_info=exc)
         
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -36,7 +35,7 @@ class ErrorHandlers:
     @staticmethod
     async def validation_error_handler(request: Request, exc: RequestValidationError):
         error_location = f"{request.method} {request.url.path}"
-        logger.error(f"Validation error at {error_location}: {str(exc)}")
+        logger.error("Validation error at %s: %s", error_location, exc)
         
         error_details = []
         for error in exc.errors():
@@ -57,7 +56,7 @@ class ErrorHandlers:
     @staticmethod
     async def http_exception_handler(request: Request, exc: HTTPException):
         error_location = f"{request.method} {request.url.path}"
-        logger.warning(f"HTTP exception at {error_location}: {exc.status_code} - {exc.detail}")
+        logger.warning("HTTP exception at %s: %s - %s", error_location, exc.status_code, exc.detail)
         
         return JSONResponse(
             status_code=exc.status_code,
@@ -77,10 +76,10 @@ class ErrorHandlers:
         error_id = str(uuid.uuid4())
         
         logger.critical(
-            f"Uncaught exception at {error_location} [Error ID: {error_id}]: {str(exc)}"
+            "Uncaught exception at %s [Error ID: %s]: %s", error_location, error_id, exc
         )
-        logger.error(f"Request details: {request.client.host} - {request.headers.get('user-agent', 'Unknown')}")
-        logger.debug(f"Exception traceback: {traceback.format_exc()}")
+        logger.error("Request details: %s - %s", request.client.host, request.headers.get('user-agent', 'Unknown'))
+        logger.debug("Exception traceback", exc_info=exc)
         
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,291 @@
+import asyncio
+import datetime
+import logging
+from collections import defaultdict
+from typing import AsyncIterator, Dict, Iterable, Set
+
+import orjson
+from sqlalchemy import and_, delete, event, func, literal, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session as OrmSession
+
+from app.config import settings
+from app.core.metrics import TASK_EVENT_SUBSCRIBERS, TASK_EVENT_SUBSCRIBERS_DROPPED
+from app.models.enums import TaskEventTypeEnum
+from app.models.task import Task
+from app.models.task_event import TaskEvent, TaskEventRetention
+from app.utils.serialization import TASK_RESPONSE_COLUMNS
+from app.utils.sql import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# Channel the tasks trigger notifies with the owner's user id
+NOTIFY_CHANNEL = "task_events"
+
+TASK_KEYS = [column.key for column in TASK_RESPONSE_COLUMNS]
+
+
+class Subscription:
+    """
+    One event stream's doorbell. Notifications only say "this user's tasks
+    changed"; the stream reads the events themselves from task_events.
+
+    The queue is bounded: a stream that stops draining it (because its client
+    reads too slowly) is dropped rather than buffered for.
+    """
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def notify(self) -> bool:
+        """Ring the doorbell; False if the queue is full and the stream must be dropped."""
+        try:
+            self._queue.put_nowait(None)
+            return True
+        except asyncio.QueueFull:
+            self.dropped = True
+            return False
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait for a notification, True unless timeout passed first."""
+        try:
+            await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        # One read covers every change rung in the meantime
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        return True
+
+
+class EventBroker:
+    """Tracks the event streams open in this process, by user."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, self.queue_size)
+        self._subscribers[user_id].add(subscription)
+        TASK_EVENT_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None and subscription in subscribers:
+            subscribers.discard(subscription)
+            TASK_EVENT_SUBSCRIBERS.dec()
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def dispatch(self, user_id: int) -> None:
+        """Wake the user's streams, dropping any that have fallen too far behind."""
+        for subscription in list(self._subscribers.get(user_id, ())):
+            if not subscription.notify():
+                self.unsubscribe(subscription)
+                TASK_EVENT_SUBSCRIBERS_DROPPED.inc()
+                logger.warning("Dropped slow task event stream for user_id=%s", user_id)
+
+    def dispatch_all(self) -> None:
+        for user_id in list(self._subscribers):
+            self.dispatch(user_id)
+
+    def notify_after_commit(self, session, user_id: int) -> None:
+        """Wake user_id's streams once session commits its task changes."""
+        session.info.setdefault("task_event_users", set()).add(user_id)
+
+    def committed(self, user_ids: Iterable[int]) -> None:
+        ...
+
+    async def start(self) -> None:
+        ...
+
+    async def stop(self) -> None:
+        ...
+
+
+class InMemoryEventBroker(EventBroker):
+    """Single process: commits in this process wake its streams directly."""
+
+    def committed(self, user_ids: Iterable[int]) -> None:
+        for user_id in user_ids:
+            self.dispatch(user_id)
+
+
+class PostgresEventBroker(EventBroker):
+    """
+    Fan-out across replicas: the tasks trigger NOTIFYs on commit and every
+    replica LISTENs on a dedicated connection, so commits made anywhere,
+    including this process, arrive the same way.
+    """
+
+    def __init__(self, queue_size: int, database_url: str, reconnect_delay: float = 1.0):
+        super().__init__(queue_size)
+        # asyncpg takes a plain postgresql:// DSN
+        self._dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.reconnect_delay = reconnect_delay
+        self._task = None
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            self.dispatch(int(payload))
+        except ValueError:
+            logger.warning("Ignoring malformed task event notification: %r", payload)
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        while True:
+            try:
+                connection = await asyncpg.connect(self._dsn)
+            except Exception as e:
+                logger.warning("Task event listener could not connect: %s", e)
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            try:
+                await connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+                # Notifications sent while disconnected are gone; every stream
+                # rereads task_events so nothing committed in between is missed
+                self.dispatch_all()
+                await lost.wait()
+                logger.warning("Task event listener connection lost; reconnecting")
+            finally:
+                if not connection.is_closed():
+                    await connection.close()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def create_event_broker(backend: str) -> EventBroker:
+    if backend == "memory":
+        return InMemoryEventBroker(settings.EVENTS_QUEUE_SIZE)
+    if backend == "postgres":
+        return PostgresEventBroker(settings.EVENTS_QUEUE_SIZE, settings.ASYNC_DATABASE_URL)
+    raise ValueError(f"Unknown task event backend: {backend}")
+
+
+event_broker = create_event_broker(settings.EVENTS_BACKEND)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _dispatch_after_commit(session):
+    user_ids = session.info.pop("task_event_users", None)
+    if user_ids:
+        event_broker.committed(user_ids)
+
+
+@event.listens_for(OrmSession, "after_soft_rollback")
+def _discard_pending_dispatch(session, previous_transaction):
+    session.info.pop("task_event_users", None)
+
+
+def latest_event_id_query(user_id: int):
+    return select(func.coalesce(func.max(TaskEvent.id), 0)).where(TaskEvent.user_id == user_id)
+
+
+def pruned_through_query(user_id: int):
+    return select(func.coalesce(func.max(TaskEventRetention.pruned_through), 0)).where(TaskEventRetention.user_id == user_id)
+
+
+async def prune_task_events(session_factory, retention: datetime.timedelta) -> int:
+    """
+    Delete events older than retention and advance the retention watermark;
+    returns the number of events deleted.
+    """
+    now = datetime.datetime.now()
+    async with session_factory() as session:
+        through = (await session.execute(
+            select(func.max(TaskEvent.id)).where(TaskEvent.created_at < now - retention)
+        )).scalar()
+        if through is None:
+            return 0
+        # Record each affected user's last pruned event before the rows go,
+        # never lowering it: a concurrent pruner may have got further already
+        insert = dialect_insert(session, TaskEventRetention.__table__).from_select(
+            ["user_id", "pruned_through", "pruned_at"],
+            select(TaskEvent.user_id, func.max(TaskEvent.id), literal(now)).where(TaskEvent.id <= through).group_by(TaskEvent.user_id),
+        )
+        await session.execute(insert.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={"pruned_through": insert.excluded.pruned_through, "pruned_at": insert.excluded.pruned_at},
+            where=TaskEventRetention.pruned_through < insert.excluded.pruned_through,
+        ))
+        deleted = (await session.execute(delete(TaskEvent).where(TaskEvent.id <= through))).rowcount
+        await session.commit()
+    logger.info("Pruned %s task events through id %s", deleted, through)
+    return deleted
+
+
+async def prune_task_events_periodically(session_factory, retention: datetime.timedelta, interval: float) -> None:
+    while True:
+        try:
+            await prune_task_events(session_factory, retention)
+        except Exception as e:
+            logger.error("Pruning task events failed: %s", e)
+        await asyncio.sleep(interval)
+
+
+def events_query(user_id: int, after_id: int, limit: int):
+    """The user's events after after_id, each with the task's current row if it still exists."""
+    return (
+        select(TaskEvent.id, TaskEvent.type, TaskEvent.task_id, *TASK_RESPONSE_COLUMNS)
+        .select_from(TaskEvent)
+        .outerjoin(Task, and_(Task.id == TaskEvent.task_id, Task.user_id == TaskEvent.user_id))
+        .where(TaskEvent.user_id == user_id, TaskEvent.id > after_id)
+        .order_by(TaskEvent.id)
+        .limit(limit)
+    )
+
+
+def format_event(row) -> bytes:
+    """Encode an events_query row as a server-sent event."""
+    event_id, event_type, task_id, *task = row
+    # A deleted task's id can be reused by SQLite; never attach the newcomer
+    has_task = event_type != TaskEventTypeEnum.DELETED and task[TASK_KEYS.index("id")] is not None
+    data = orjson.dumps({"task_id": task_id, "task": dict(zip(TASK_KEYS, task)) if has_task else None})
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event_type.value.encode(), data)
+
+
+async def stream_task_events(
+    engine, broker: EventBroker, user_id: int, after_id: int, batch_size: int, keepalive: float,
+) -> AsyncIterator[bytes]:
+    """
+    Server-sent events for user_id's task changes after event after_id.
+
+    Subscribes before the first read so no change slips between catching up
+    and waiting. Each read uses its own short-lived connection, since the
+    stream outlives the request's session.
+    """
+    subscription = broker.subscribe(user_id)
+    try:
+        while True:
+            if subscription.dropped:
+                yield b"event: dropped\ndata: {}\n\n"
+                return
+            async with engine.connect() as conn:
+                rows = (await conn.execute(events_query(user_id, after_id, batch_size))).all()
+            for row in rows:
+                yield format_event(row)
+                after_id = row[0]
+            if len(rows) == batch_size:
+                continue
+            if not await subscription.wait(keepalive):
+                yield b": keep-alive\n\n"
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HashingPoolBusyError(RuntimeError):
+    """Raised when the hashing pool already has max_pending jobs in flight."""
+
+
+class PasswordHashingPool:
+    """
+    Bounded worker pool for bcrypt work.
+
+    bcrypt releases the GIL while hashing, so a thread pool keeps it off the
+    event loop without the pickling overhead of a process pool. Admission is
+    capped at max_pending jobs (running plus queued); beyond that callers get
+    HashingPoolBusyError straight away instead of waiting in an unbounded queue.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                logger.warning("Password hashing pool saturated (%s jobs pending)", self._pending)
+                raise HashingPoolBusyError("Password hashing pool is saturated")
+            self._pending += 1
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the job finishes, not when the caller stops waiting:
+        # a cancelled request leaves a running bcrypt job behind
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+hashing_pool = PasswordHashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
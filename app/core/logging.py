@@ -1,40 +1,168 @@
+import atexit
+import copy
+import datetime
 import logging
+import queue
+import random
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+import orjson
+
 from app.config import settings
+from app.core.metrics import LOG_RECORDS_DROPPED
 
 # Create logs directory if it doesn't exist
-log_dir = Path("logs")
+log_dir = Path(settings.LOG_FILE).parent
 log_dir.mkdir(exist_ok=True)
 
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_exception_formatter = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any fields passed via `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Rendered already, by DroppingQueueHandler.prepare
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of INFO and lower records from selected loggers.
+
+    rates maps logger name prefixes to the fraction kept; the longest matching
+    prefix wins. WARNING and above always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, Optional[float]] = {}
+
+    def _rate(self, name: str) -> Optional[float]:
+        if name not in self._resolved:
+            matches = [prefix for prefix in self.rates if name == prefix or name.startswith(prefix + ".")]
+            self._resolved[name] = self.rates[max(matches, key=len)] if matches else None
+        return self._resolved[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self._rate(record.name)
+        return rate is None or random.random() < rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue that drops records when it is full
+    instead of blocking the caller, counting what it dropped.
+
+    The message is interpolated and any traceback rendered on the caller, as
+    QueueHandler does, so the record holds the state at the call rather than
+    references to mutable args (dicts, ORM instances that could lazy-load on
+    the listener thread). Formatting into the output line is left to the
+    listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Other handlers may still see the original record
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse "logger=rate,logger=rate" into a dict."""
+    rates = {}
+    for part in value.split(","):
+        name, _, rate = part.partition("=")
+        if name.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+_listener: Optional[QueueListener] = None
+
+
 # Configure logging
 def setup_logging():
-    log_format = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
-    
-    # Root logger
+    """
+    Route all logging through a bounded in-memory queue drained by a
+    background thread, which formats records and writes them to stdout and
+    the rotating log file. Safe to call more than once.
+    """
+    global _listener
     root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO if not settings.DEBUG else logging.DEBUG)
-    
+    if _listener is not None:
+        return root_logger
+
+    if settings.LOG_JSON:
+        log_format = JsonFormatter()
+    else:
+        log_format = logging.Formatter(settings.LOG_FORMAT)
+
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(log_format)
-    root_logger.addHandler(console_handler)
-    
+
     # File handler
     file_handler = RotatingFileHandler(
-        "logs/app.log",
-        maxBytes=10485760,  # 10MB
-        backupCount=5,
+        settings.LOG_FILE,
+        maxBytes=settings.LOG_MAX_SIZE,
+        backupCount=settings.LOG_BACKUP_COUNT,
         encoding="utf-8"
     )
     file_handler.setFormatter(log_format)
-    root_logger.addHandler(file_handler)
-    
+
+    # Root logger only enqueues; the listener thread does the blocking I/O
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(settings.LOG_SAMPLE_RATES)))
+    root_logger.setLevel(logging.DEBUG if settings.DEBUG else settings.LOG_LEVEL)
+    root_logger.addHandler(queue_handler)
+
+    _listener = QueueListener(queue_handler.queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(_listener.stop)
+
     # Set logging levels for third-party libraries
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
-    
-    return root_logger
\ No newline at end of file
+
+    return root_logger
@@ -0,0 +1,241 @@
+import contextvars
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21, 50, 100)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time to handle an HTTP request", ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled", ["method"],
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request", ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Time spent executing SQL per HTTP request", ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Time to execute a single SQL statement",
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_READ_ROUTING = Counter(
+    "db_read_routing_total", "Replica-eligible reads by the database that served them", ["target"],
+)
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds", "Last measured replication lag (+Inf when unreachable)", ["replica"],
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "auth_password_hash_seconds", "Time for a bcrypt hash or verify, including queueing", ["operation"],
+    buckets=(0.01, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0),
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "auth_password_hash_rejected_total", "bcrypt jobs refused because the hashing pool was saturated",
+)
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Response cache lookups", ["endpoint", "result"],
+)
+RESPONSE_CACHE_EVICTIONS = Counter(
+    "response_cache_evictions_total", "Responses evicted from the in-process cache to stay within its size limit",
+)
+RESPONSE_CACHE_BYTES = Gauge(
+    "response_cache_bytes", "Size of the responses held by the in-process cache",
+)
+TASK_EVENT_SUBSCRIBERS = Gauge(
+    "task_event_subscribers", "Open task event streams in this process",
+)
+TASK_EVENT_SUBSCRIBERS_DROPPED = Counter(
+    "task_event_subscribers_dropped_total", "Task event streams disconnected for falling behind",
+)
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total", "Log records dropped because the logging queue was full",
+)
+
+
+@dataclass
+class RequestDbStats:
+    """SQL activity attributed to the current request."""
+    queries: int = 0
+    db_time: float = 0.0
+
+
+_request_db_stats: contextvars.ContextVar[Optional[RequestDbStats]] = contextvars.ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def current_request_db_stats() -> Optional[RequestDbStats]:
+    """Stats for the request being handled, or None outside a request."""
+    return _request_db_stats.get()
+
+
+# Registered on Engine itself so every engine is covered, including ones created
+# after import. SQLAlchemy's async layer runs these hooks in a greenlet that
+# shares the calling task's context, so the request's stats are reachable.
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_times")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_query_timer(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_times"):
+        connection.info["query_start_times"].pop()
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records how long each checkout waited, which
+    includes opening a new connection when the pool has to grow.
+    """
+
+    metrics_label = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.metrics_label).observe(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool; keep its label
+        pool = super().recreate()
+        pool.metrics_label = self.metrics_label
+        return pool
+
+
+class PoolCollector:
+    """Reads connection pool occupancy from registered engines at scrape time."""
+
+    def __init__(self):
+        self._engines = {}
+
+    def add(self, name: str, engine) -> None:
+        self._engines[name] = engine
+
+    def collect(self):
+        metrics = {
+            "size": GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"]),
+            "checkedout": GaugeMetricFamily("db_pool_checked_out", "Connections currently checked out", labels=["engine"]),
+            "checkedin": GaugeMetricFamily("db_pool_checked_in", "Idle connections in the pool", labels=["engine"]),
+            "overflow": GaugeMetricFamily("db_pool_overflow", "Connections open beyond the pool size", labels=["engine"]),
+        }
+        for name, engine in self._engines.items():
+            pool = engine.pool
+            for method, family in metrics.items():
+                # Pools without queueing (NullPool, StaticPool) have no occupancy to report
+                if hasattr(pool, method):
+                    family.add_metric([name], getattr(pool, method)())
+        yield from metrics.values()
+
+
+pool_collector = PoolCollector()
+REGISTRY.register(pool_collector)
+
+
+def instrument_engine(engine, name: str) -> None:
+    """Export pool occupancy for engine (sync or async) under the given label."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if isinstance(sync_engine.pool, TimedAsyncAdaptedQueuePool):
+        sync_engine.pool.metrics_label = name
+    pool_collector.add(name, sync_engine)
+
+
+def server_timing(stats: RequestDbStats) -> str:
+    """Server-Timing header value describing the SQL run so far."""
+    return f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"'
+
+
+def render_metrics():
+    """Body and content type for the /metrics endpoint."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route request counts, latency and the
+    SQL executed while handling each request.
+
+    Routes are labelled by their template (e.g. /tasks/{task_id}) to keep
+    label cardinality bounded; requests matching no route share one label.
+
+    With SERVER_TIMING enabled, responses also report the statements run
+    before the headers were sent in a Server-Timing header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = RequestDbStats()
+        token = _request_db_stats.set(stats)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(stats).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.labels(method).inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_PROGRESS.labels(method).dec()
+            _request_db_stats.reset(token)
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.labels(method, route_label, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method, route_label).observe(elapsed)
+            DB_QUERIES_PER_REQUEST.labels(method, route_label).observe(stats.queries)
+            DB_TIME_PER_REQUEST.labels(method, route_label).observe(stats.db_time)
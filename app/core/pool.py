@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from uuid import uuid4
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+
+from app.config import settings
+from app.core.metrics import TimedAsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+# libpq TCP keepalives, so dead peers are noticed on long-idle connections
+PSYCOPG2_KEEPALIVES = {
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 5,
+}
+
+# PgBouncer in transaction mode hands each transaction to any server
+# connection, so statements must not rely on ones prepared earlier
+ASYNCPG_PGBOUNCER_ARGS = {
+    "statement_cache_size": 0,
+    "prepared_statement_cache_size": 0,
+    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+}
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
+
+
+def _pool_options(url: str, poolclass=None) -> dict:
+    url = make_url(url)
+    if _is_memory_sqlite(url):
+        # Each connection to :memory: is a separate, empty database, so every
+        # checkout has to share the one connection
+        options = {"poolclass": StaticPool}
+        if url.get_driver_name() == "pysqlite":
+            options["connect_args"] = {"check_same_thread": False}
+        return options
+    if settings.DB_NULL_POOL:
+        # A new connection per checkout; the external pooler does the pooling
+        return {"poolclass": NullPool}
+    if not issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+        # The sizing arguments below only apply to a QueuePool
+        return {}
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        # Otherwise install_idle_pre_ping only pings connections left idle
+        "pool_pre_ping": settings.DB_POOL_PRE_PING_IDLE_SECONDS == 0,
+    }
+    if poolclass is not None:
+        options["poolclass"] = poolclass
+    return options
+
+
+def sync_engine_options(url: str) -> dict:
+    """create_engine() arguments for url, from the DB_* settings."""
+    options = _pool_options(url)
+    if make_url(url).get_driver_name() == "psycopg2":
+        options["connect_args"] = dict(PSYCOPG2_KEEPALIVES)
+    return options
+
+
+def async_engine_options(url: str) -> dict:
+    """create_async_engine() arguments for url, from the DB_* settings."""
+    options = _pool_options(url, TimedAsyncAdaptedQueuePool)
+    if settings.DB_PGBOUNCER and make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = dict(ASYNCPG_PGBOUNCER_ARGS)
+    return options
+
+
+def install_idle_pre_ping(engine, idle_seconds: float) -> None:
+    """
+    Ping connections on checkout only when they sat in the pool for at least
+    idle_seconds; a connection that fails the ping is replaced.
+
+    Connections in steady use skip the extra round trip that pool_pre_ping
+    adds to every checkout.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if idle_seconds <= 0 or not isinstance(sync_engine.pool, QueuePool):
+        return
+    dialect = sync_engine.dialect
+
+    @event.listens_for(sync_engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.pop("checked_in_at", None)
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # The pool discards this connection and checks out another
+            raise exc.DisconnectionError(f"idle connection failed ping: {e}") from e
+
+
+async def warm_up_pool(engine) -> None:
+    """Open pool_size connections up front so the first requests don't pay for it."""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    try:
+        async with AsyncExitStack() as stack:
+            await asyncio.gather(*(stack.enter_async_context(engine.connect()) for _ in range(pool.size())))
+    except Exception as e:
+        logger.warning("Connection pool warm-up failed: %s", e)
+    else:
+        logger.info("Opened %s pooled connections", pool.checkedin())
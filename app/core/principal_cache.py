@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as OrmSession, object_session
+
+from app.config import settings
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Attributes whose change must evict a cached principal
+_CREDENTIAL_FIELDS = ("username", "hashed_password", "is_active")
+
+
+class PrincipalCache:
+    """
+    Bounded LRU cache of authenticated users keyed by token subject.
+
+    Entries are plain column snapshots rather than ORM instances, so a cached
+    principal is never tied to the session that loaded it. Each lookup hands
+    back a fresh, transient User built from the snapshot.
+
+    Credential changes evict entries only in this process and only when made
+    through ORM flushes; everywhere else they take effect once the entry's
+    TTL runs out.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, subject: str) -> Optional[User]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[subject]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            snapshot = entry[1]
+        return User(**snapshot)
+
+    def set(self, subject: str, user: User) -> None:
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        snapshot = {column: getattr(user, column) for column in User.__table__.columns.keys()}
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[subject] = (expires_at, snapshot)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, subject: str) -> None:
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def _affected_subjects(user: User) -> set:
+    state = inspect(user)
+    subjects = {user.username}
+    # A rename must also evict the entry cached under the old username
+    subjects.update(state.attrs.username.history.deleted or ())
+    return {subject for subject in subjects if subject}
+
+
+@event.listens_for(User, "after_update")
+def _evict_on_credentials_change(mapper, connection, target: User):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in _CREDENTIAL_FIELDS):
+        return
+    subjects = _affected_subjects(target)
+    for subject in subjects:
+        principal_cache.invalidate(subject)
+    # Evict again once the change is visible to other transactions, in case a
+    # concurrent request re-cached the old row in the meantime
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("principal_cache_evictions", set()).update(subjects)
+    logger.debug("Evicted cached principals after credential change: %s", subjects)
+
+
+@event.listens_for(User, "after_delete")
+def _evict_on_delete(mapper, connection, target: User):
+    for subject in _affected_subjects(target):
+        principal_cache.invalidate(subject)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _evict_after_commit(session):
+    for subject in session.info.pop("principal_cache_evictions", ()):
+        principal_cache.invalidate(subject)
+
+
+@event.listens_for(OrmSession, "after_soft_rollback")
+def _discard_pending_evictions(session, previous_transaction):
+    session.info.pop("principal_cache_evictions", None)
@@ -0,0 +1,132 @@
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics import DB_READ_ROUTING, DB_REPLICA_LAG
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica's replay is behind the primary. An idle primary sends no
+# new WAL, so a replica that has replayed everything it received counts as current.
+LAG_QUERIES = {
+    "postgresql": text(
+        "SELECT CASE WHEN NOT pg_is_in_recovery() "
+        "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    ),
+}
+
+
+async def measure_lag(engine: AsyncEngine) -> float:
+    """Replication lag of the database behind engine, in seconds."""
+    query = LAG_QUERIES.get(engine.dialect.name)
+    async with engine.connect() as conn:
+        if query is None:
+            # No replication state to read (e.g. SQLite stand-ins): only check it answers
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+        return float((await conn.execute(query)).scalar() or 0.0)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: AsyncEngine
+    # Seconds behind the primary at the last check; None when unreachable
+    lag: Optional[float] = None
+    # time.monotonic() of the last check
+    checked_at: float = 0.0
+
+
+class ReplicaSet:
+    """
+    Read replicas and their last measured replication lag.
+
+    refresh() measures every replica; run() does so every check_interval.
+    choose() hands out replicas whose lag is within max_lag, round-robin, and
+    returns None (read from the primary) when none qualify, including when
+    measurements have gone stale because the checker stopped.
+    """
+
+    def __init__(
+        self,
+        replicas: List[Replica],
+        max_lag: float,
+        check_interval: float,
+        measure: Callable[[AsyncEngine], Awaitable[float]] = measure_lag,
+    ):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._measure = measure
+        self._next = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    async def refresh(self) -> None:
+        for replica in self.replicas:
+            try:
+                replica.lag = await self._measure(replica.engine)
+            except Exception as e:
+                if replica.lag is not None:
+                    logger.warning("Replica %s is unreachable: %s", replica.name, e)
+                replica.lag = None
+            replica.checked_at = time.monotonic()
+            DB_REPLICA_LAG.labels(replica.name).set(float("inf") if replica.lag is None else replica.lag)
+
+    def usable(self) -> List[Replica]:
+        """Replicas recently measured within max_lag."""
+        # Measurements missing several checks in a row no longer say anything
+        fresh_after = time.monotonic() - 3 * self.check_interval
+        return [
+            replica for replica in self.replicas
+            if replica.lag is not None and replica.lag <= self.max_lag and replica.checked_at >= fresh_after
+        ]
+
+    def choose(self) -> Optional[Replica]:
+        """Replica to serve the next read from, or None to use the primary."""
+        if not self.replicas:
+            return None
+        usable = self.usable()
+        if not usable:
+            DB_READ_ROUTING.labels("primary").inc()
+            return None
+        replica = usable[next(self._next) % len(usable)]
+        DB_READ_ROUTING.labels(replica.name).inc()
+        return replica
+
+    def status(self) -> List[dict]:
+        usable = self.usable()
+        return [
+            {"name": replica.name, "lag_seconds": replica.lag, "usable": replica in usable}
+            for replica in self.replicas
+        ]
+
+    async def run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        """Start measuring lag in the background; a no-op without replicas."""
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
@@ -0,0 +1,243 @@
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+from app.config import settings
+from app.core.metrics import RESPONSE_CACHE_BYTES, RESPONSE_CACHE_EVICTIONS, RESPONSE_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCacheBackend(ABC):
+    """
+    Storage for serialized responses and the per-user generation counters
+    that scope them.
+
+    Cache keys embed the owner's generation at the time of the read, so
+    bumping the generation orphans every entry for that user at once; the
+    orphans age out of the LRU or expire.
+    """
+
+    @abstractmethod
+    async def generation(self, user_id: int) -> Tuple[int, float]:
+        """(counter, time.time() of the last bump) for user_id."""
+
+    @abstractmethod
+    async def bump(self, user_id: int) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes) -> None:
+        ...
+
+    async def clear(self) -> None:
+        ...
+
+
+class MemoryResponseCacheBackend(ResponseCacheBackend):
+    """
+    LRU bounded by the total size of the cached bodies.
+
+    Per process: only correct when a single process serves the API, i.e. one
+    replica running one uvicorn worker. Any other process handling a write
+    bumps only its own generations, and this one keeps serving stale bodies
+    until they expire.
+
+    Generations come from one process-wide counter, and a user's is dropped
+    once its last bump is older than the TTL. Users without one read the
+    highest counter dropped so far: never lower than a dropped generation of
+    theirs, so no entry stored before their last write can match again.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        # Oldest bump first
+        self._generations: "OrderedDict[int, Tuple[int, float]]" = OrderedDict()
+        self._counter = 0
+        self._floor: Tuple[int, float] = (0, 0.0)
+        self.size_bytes = 0
+
+    async def generation(self, user_id: int) -> Tuple[int, float]:
+        return self._generations.get(user_id, self._floor)
+
+    async def bump(self, user_id: int) -> None:
+        now = time.time()
+        self._counter += 1
+        self._generations.pop(user_id, None)
+        self._generations[user_id] = (self._counter, now)
+        while self._generations:
+            oldest_user, (counter, bumped_at) = next(iter(self._generations.items()))
+            if bumped_at > now - self.ttl_seconds:
+                break
+            del self._generations[oldest_user]
+            self._floor = (max(self._floor[0], counter), max(self._floor[1], bumped_at))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: bytes) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self.size_bytes += len(value)
+        while self.size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            RESPONSE_CACHE_EVICTIONS.inc()
+        RESPONSE_CACHE_BYTES.set(self.size_bytes)
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self.size_bytes -= len(value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._generations.clear()
+        self._counter = 0
+        self._floor = (0, 0.0)
+        self.size_bytes = 0
+        RESPONSE_CACHE_BYTES.set(0)
+
+
+class RedisResponseCacheBackend(ResponseCacheBackend):
+    """
+    Redis shared by every replica; entries expire after ttl_seconds and
+    Redis' own maxmemory policy bounds their total size.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float, client=None):
+        if client is None:
+            # Optional dependency, only needed for this backend
+            import redis.asyncio as redis
+
+            client = redis.from_url(url)
+        self._redis = client
+        self.ttl_seconds = ttl_seconds
+
+    async def generation(self, user_id: int) -> Tuple[int, float]:
+        counter, bumped_at = await self._redis.hmget(f"rc:gen:{user_id}", "n", "t")
+        return int(counter or 0), float(bumped_at or 0.0)
+
+    async def bump(self, user_id: int) -> None:
+        key = f"rc:gen:{user_id}"
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(key, "n", 1)
+            pipe.hset(key, "t", time.time())
+            await pipe.execute()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self._redis.set(key, value, px=int(self.ttl_seconds * 1000))
+
+
+@dataclass
+class CacheSlot:
+    """Where a response for one request would be cached."""
+    key: str
+    endpoint: str
+    bumped_at: float
+
+
+def _pack(headers: Dict[str, str], body: bytes) -> bytes:
+    return orjson.dumps(headers) + b"\n" + body
+
+
+def _unpack(value: bytes) -> Tuple[Dict[str, str], bytes]:
+    headers, _, body = value.partition(b"\n")
+    return orjson.loads(headers), body
+
+
+class ResponseCache:
+    """
+    Serialized task responses keyed by owner, owner generation and request
+    parameters. Writes call invalidate_user() after committing.
+
+    Backend failures degrade to cache misses rather than failing requests.
+    """
+
+    def __init__(self, backend: Optional[ResponseCacheBackend], max_entry_bytes: int, replica_max_lag: float):
+        self.backend = backend
+        self.max_entry_bytes = max_entry_bytes
+        self.replica_max_lag = replica_max_lag
+
+    async def lookup(self, user_id: int, endpoint: str, *params) -> Tuple[Optional[CacheSlot], Optional[Tuple[Dict[str, str], bytes]]]:
+        """
+        The slot for this request and the cached (headers, body), if any.
+        The slot is None when caching is off or the backend is unavailable.
+        """
+        if self.backend is None:
+            return None, None
+        try:
+            # Read the generation before the data: a write committed after
+            # this point bumps it, orphaning whatever this request stores
+            counter, bumped_at = await self.backend.generation(user_id)
+            digest = hashlib.blake2b(repr(params).encode(), digest_size=16).hexdigest()
+            slot = CacheSlot(f"rc:{user_id}:{counter}:{endpoint}:{digest}", endpoint, bumped_at)
+            value = await self.backend.get(slot.key)
+        except Exception as e:
+            logger.warning("Response cache lookup failed: %s", e)
+            return None, None
+        RESPONSE_CACHE_REQUESTS.labels(endpoint, "miss" if value is None else "hit").inc()
+        return slot, None if value is None else _unpack(value)
+
+    async def store(self, slot: Optional[CacheSlot], headers: Dict[str, str], body: bytes, from_replica: bool = False) -> None:
+        if slot is None or len(body) > self.max_entry_bytes:
+            return
+        # A replica may not have replayed the write behind the latest bump yet
+        if from_replica and time.time() - slot.bumped_at < self.replica_max_lag:
+            return
+        try:
+            await self.backend.set(slot.key, _pack(headers, body))
+        except Exception as e:
+            logger.warning("Response cache store failed: %s", e)
+
+    async def invalidate_user(self, user_id: int) -> None:
+        if self.backend is None:
+            return
+        try:
+            await self.backend.bump(user_id)
+        except Exception as e:
+            # Entries still expire after RESPONSE_CACHE_TTL_SECONDS
+            logger.error("Response cache invalidation failed for user_id=%s: %s", user_id, e)
+
+    async def clear(self) -> None:
+        if self.backend is not None:
+            await self.backend.clear()
+
+
+def create_response_cache(backend: str) -> ResponseCache:
+    if backend == "memory":
+        store = MemoryResponseCacheBackend(settings.RESPONSE_CACHE_MAX_BYTES, settings.RESPONSE_CACHE_TTL_SECONDS)
+    elif backend == "redis":
+        store = RedisResponseCacheBackend(settings.REDIS_URL, settings.RESPONSE_CACHE_TTL_SECONDS)
+    elif backend == "none":
+        store = None
+    else:
+        raise ValueError(f"Unknown response cache backend: {backend}")
+    return ResponseCache(store, settings.RESPONSE_CACHE_MAX_ENTRY_BYTES, settings.REPLICA_MAX_LAG_SECONDS)
+
+
+response_cache = create_response_cache(settings.RESPONSE_CACHE_BACKEND)
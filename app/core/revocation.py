@@ -0,0 +1,254 @@
+import asyncio
+import datetime
+import hashlib
+import heapq
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.revoked_token import RevokedToken
+from app.utils.sql import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationStore(ABC):
+    """
+    Record of access tokens revoked before they expire, keyed by their jti claim.
+
+    Entries only need to outlive the token itself: once exp has passed the
+    token is rejected by signature validation anyway.
+    """
+
+    @abstractmethod
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoke the token with this jti until expires_at (epoch seconds)."""
+
+    @abstractmethod
+    async def is_revoked(self, jti: str) -> bool:
+        """True when the token with this jti has been revoked."""
+
+    async def start(self) -> None:
+        ...
+
+    async def stop(self) -> None:
+        ...
+
+
+class InMemoryRevocationStore(TokenRevocationStore):
+    """
+    Per-process store: a dict for O(1) lookups plus a heap ordered by expiry,
+    so entries are dropped as soon as their token would have expired.
+
+    Only suitable for a single replica, as revocations are not shared.
+    """
+
+    def __init__(self):
+        self._expiry: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def _purge(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._heap)
+            if self._expiry.get(jti) == expires_at:
+                del self._expiry[jti]
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        now = time.time()
+        self._purge(now)
+        if expires_at <= now:
+            return
+        self._expiry[jti] = expires_at
+        heapq.heappush(self._heap, (expires_at, jti))
+
+    async def is_revoked(self, jti: str) -> bool:
+        expires_at = self._expiry.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over strings: no false negatives, and false
+    positives at roughly error_rate while it holds at most capacity items.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        # Kirsch-Mitzenmacher: k positions from two independent hashes
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def _utc_datetime(timestamp: float) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).replace(tzinfo=None)
+
+
+class DatabaseRevocationStore(TokenRevocationStore):
+    """
+    Store shared by all replicas through the revoked_tokens table.
+
+    Each replica keeps a bloom filter of the revoked jtis in front of the
+    table, so tokens that were never revoked (nearly all of them) are accepted
+    without a query. Only bloom hits, i.e. revoked tokens and the occasional
+    false positive, are confirmed with a primary-key lookup.
+
+    A background task started by start() picks up other replicas'
+    revocations by fetching rows added since the last sync, every
+    sync_interval; a token revoked elsewhere can therefore stay usable on
+    this replica for that long. Every rebuild_interval it rebuilds the filter
+    from scratch after pruning expired rows, which also sheds their bits.
+    Requests only ever read the current filter.
+    """
+
+    # Rows below the last seen id that are re-read on every sync, to catch
+    # inserts that committed after a later id had already become visible
+    SYNC_ID_LOOKBACK = 100
+
+    def __init__(
+        self,
+        session_factory,
+        sync_interval: float = 1.0,
+        rebuild_interval: float = 300.0,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+    ):
+        self.session_factory = session_factory
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._last_id = 0
+        # jtis revoked here while a rebuild is reading the table
+        self._revoked_during_rebuild: Optional[List[str]] = None
+        self._task = None
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        async with self.session_factory() as session:
+            stmt = dialect_insert(session, RevokedToken.__table__).values(
+                jti=jti, expires_at=_utc_datetime(expires_at)
+            ).on_conflict_do_nothing(index_elements=["jti"])
+            await session.execute(stmt)
+            await session.commit()
+        self._bloom.add(jti)
+        if self._revoked_during_rebuild is not None:
+            # The rebuild's scan may have missed it; carried over on the swap
+            self._revoked_during_rebuild.append(jti)
+
+    async def is_revoked(self, jti: str) -> bool:
+        if jti not in self._bloom:
+            return False
+        async with self.session_factory() as session:
+            result = await session.execute(select(RevokedToken.id).where(RevokedToken.jti == jti))
+            return result.first() is not None
+
+    async def sync(self, rebuild: bool = False) -> None:
+        """Bring the bloom filter up to date with the table. Only the background task calls this."""
+        async with self.session_factory() as session:
+            if rebuild:
+                await self._rebuild(session)
+                return
+            rows = (await session.execute(
+                select(RevokedToken.id, RevokedToken.jti)
+                .where(RevokedToken.id > self._last_id - self.SYNC_ID_LOOKBACK)
+                .order_by(RevokedToken.id)
+            )).all()
+        for row_id, jti in rows:
+            self._bloom.add(jti)
+            self._last_id = max(self._last_id, row_id)
+
+    async def _rebuild(self, session) -> None:
+        cutoff = datetime.datetime.utcnow()
+        await session.execute(delete(RevokedToken).where(RevokedToken.expires_at < cutoff))
+        await session.commit()
+        self._revoked_during_rebuild = []
+        try:
+            count = (await session.execute(select(func.count()).select_from(RevokedToken))).scalar()
+            bloom = BloomFilter(max(self.capacity, 2 * count), self.error_rate)
+            last_id = self._last_id
+            result = await session.stream(select(RevokedToken.id, RevokedToken.jti))
+            async for row_id, jti in result:
+                bloom.add(jti)
+                last_id = max(last_id, row_id)
+            # No await from here to the swap, so no revoke() can slip between
+            for jti in self._revoked_during_rebuild:
+                bloom.add(jti)
+            self._bloom = bloom
+            self._last_id = last_id
+        finally:
+            self._revoked_during_rebuild = None
+        logger.info("Rebuilt token revocation filter with %s entries", count)
+
+    async def _run(self) -> None:
+        next_rebuild = time.monotonic() + self.rebuild_interval
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            rebuild = time.monotonic() >= next_rebuild
+            try:
+                await self.sync(rebuild=rebuild)
+            except Exception as e:
+                logger.error("Token revocation sync failed: %s", e)
+                continue
+            if rebuild:
+                next_rebuild = time.monotonic() + self.rebuild_interval
+
+    async def start(self) -> None:
+        """Load the filter, then keep it in sync in the background."""
+        if self._task is not None:
+            return
+        try:
+            await self.sync(rebuild=True)
+        except Exception as e:
+            # The background task catches up once the database is reachable
+            logger.error("Loading the token revocation filter failed: %s", e)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def create_revocation_store(backend: str) -> TokenRevocationStore:
+    if backend == "memory":
+        return InMemoryRevocationStore()
+    if backend == "database":
+        return DatabaseRevocationStore(
+            async_session_maker,
+            sync_interval=settings.REVOCATION_SYNC_INTERVAL_SECONDS,
+            rebuild_interval=settings.REVOCATION_REBUILD_INTERVAL_SECONDS,
+            capacity=settings.REVOCATION_BLOOM_CAPACITY,
+            error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+        )
+    raise ValueError(f"Unknown token revocation backend: {backend}")
+
+
+revocation_store = create_revocation_store(settings.REVOCATION_BACKEND)
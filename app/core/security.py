@@ -1,19 +1,33 @@
 import logging
+import time
+import uuid
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from app.config import settings
 from app.schemas.user import TokenData
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.user import User
-from app.database import get_session
+from app.database import get_async_session
+from app.core.principal_cache import principal_cache
+from app.core.hashing import HashingPoolBusyError, hashing_pool
+from app.core.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_REJECTED
+from app.core.revocation import revocation_store
 
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max pin the cost factor, so hashes made with any other cost need an update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def verify_password(plain_password, hashed_password):
@@ -25,14 +39,48 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+def _verify_and_update(plain_password, hashed_password):
+    result, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+    if not result:
+        logger.warning("Failed password verification attempt")
+    return result, new_hash
+
+async def _run_in_hashing_pool(operation, func, *args):
+    started = time.perf_counter()
+    try:
+        result = await hashing_pool.run(func, *args)
+    except HashingPoolBusyError:
+        PASSWORD_HASH_REJECTED.inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many authentication requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - started)
+    return result
+
+async def verify_password_async(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the hashing pool.
+
+    Returns:
+        tuple: (is_valid, new_hash) where new_hash is set when the stored hash
+        uses a different cost factor and should be replaced
+    """
+    return await _run_in_hashing_pool("verify", _verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    return await _run_in_hashing_pool("hash", get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    # jti identifies the token for revocation on logout
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)):
+async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -49,19 +97,29 @@ async def get_current_user(token: str = Depends(oauth2_scheme), session: Session
         logger.warning("Invalid JWT token")
         raise credentials_exception
     
+    # Tokens issued before jti was introduced cannot be revoked; they expire
+    # within ACCESS_TOKEN_EXPIRE_MINUTES
+    jti = payload.get("jti")
+    if jti is not None and await revocation_store.is_revoked(jti):
+        logger.warning("Revoked token presented for user: %s", token_data.username)
+        raise credentials_exception
+    
     # user = await User.find_one({"username": token_data.username})
-    user = session.exec(select(User).where(User.username == token_data.username)).first()
+    user = principal_cache.get(token_data.username)
     if user is None:
-        logger.warning(f"User not found: {token_data.username}")
-        raise credentials_exception
+        user = (await session.exec(select(User).where(User.username == token_data.username))).first()
+        if user is None:
+            logger.warning("User not found: %s", token_data.username)
+            raise credentials_exception
+        principal_cache.set(token_data.username, user)
     if not user.is_active:
-        logger.warning(f"Inactive user attempted login: {user.username}")
+        logger.warning("Inactive user attempted login: %s", user.username)
         raise HTTPException(status_code=400, detail="Inactive user")
-    logger.info(f"Successfully authenticated user: {user.username}")
+    logger.info("Successfully authenticated user: %s", user.username)
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_active:
-        logger.warning(f"Inactive user attempt to access: {current_user.username}")
+        logger.warning("Inactive user attempt to access: %s", current_user.username)
         raise HTTPException(status_code=403, detail="Inactive user, Account is deactivated")
     return current_user
@@ -1,24 +1,95 @@
+from fastapi import Depends
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import Select
 from sqlalchemy.engine import URL
-from .config import settings
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from .config import async_database_url, settings
+from .core.metrics import instrument_engine
+from .core.pool import async_engine_options, install_idle_pre_ping, sync_engine_options
+from .core.replicas import Replica, ReplicaSet
+from .utils.sql import check_dialect_supported
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sync engine: used for startup DDL, scripts, and as a fallback for any code
+# that still needs a blocking Session
 connection_url = settings.DATABASE_URL
-engine = create_engine(
-    connection_url,
-        pool_size=5,               # Set connection pool size
-    max_overflow=10,           # Maximum overflow connections
-    pool_timeout=30,           # Connection timeout in seconds
-    pool_pre_ping=True,        # Enable connection health checks
-    pool_recycle=1800,         # Recycle connections after 30 minutes
-    connect_args={
-        "keepalives": 1,
-        "keepalives_idle": 30,
-        "keepalives_interval": 10,
-        "keepalives_count": 5
-    })
+engine = create_engine(connection_url, **sync_engine_options(connection_url))
+
+# Async engine: serves every request handler without tying up threadpool workers
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, **async_engine_options(settings.ASYNC_DATABASE_URL))
+# Fail at startup, not on the first bulk write
+check_dialect_supported(async_engine)
+
+# Read replicas; lag is measured in the background once the app starts
+replica_urls = [async_database_url(url.strip()) for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+replica_set = ReplicaSet(
+    [
+        Replica(f"replica{i}", create_async_engine(url, **async_engine_options(url)))
+        for i, url in enumerate(replica_urls)
+    ],
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_CHECK_INTERVAL_SECONDS,
+)
+
+# Pool occupancy is exported on /metrics
+instrument_engine(async_engine, "primary")
+instrument_engine(engine, "primary_sync")
+for replica in replica_set.replicas:
+    instrument_engine(replica.engine, replica.name)
+
+for pooled_engine in [engine, async_engine] + [replica.engine for replica in replica_set.replicas]:
+    install_idle_pre_ping(pooled_engine, settings.DB_POOL_PRE_PING_IDLE_SECONDS)
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a read replica once a request opts in (see
+    use_read_replica) and a replica is within REPLICA_MAX_LAG_SECONDS.
+
+    Writes, SELECT ... FOR UPDATE and anything that is not a plain SELECT go
+    to the primary. After the first of those every statement does, so a
+    request always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_replica") and not self.info.get("wrote"):
+            if self._flushing or (clause is not None and not (isinstance(clause, Select) and clause._for_update_arg is None)):
+                self.info["wrote"] = True
+            elif clause is not None:
+                replica = replica_set.choose()
+                if replica is not None:
+                    self.info["read_from_replica"] = True
+                    return replica.engine.sync_engine
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+class RequestSession(AsyncSession):
+    """
+    AsyncSession scoped to one request.
+
+    Like any Session it checks out a connection only when it runs its first
+    statement. Handlers call release() once they have read what they need, so
+    the connection returns to the pool before slow non-database work (password
+    hashing, response encoding) rather than when the request ends. The session
+    stays usable: a later statement checks out a connection again.
+    """
+
+    sync_session_class = RoutingSession
+
+    async def release(self) -> None:
+        """End the current read-only transaction and return its connection."""
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("release() would commit pending changes; commit them explicitly")
+        if self.in_transaction():
+            # With expire_on_commit=False this keeps loaded objects usable
+            await self.commit()
+
+# expire_on_commit=False: async sessions cannot lazy-load expired attributes,
+# and handlers still read the objects they just committed
+async_session_maker = async_sessionmaker(
+    async_engine, class_=RequestSession, expire_on_commit=False
+)
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
@@ -29,3 +100,17 @@ def get_session():
         yield session
     logger.debug("Creating new database session")
 
+async def get_async_session():
+    # Dependencies share one instance per request (FastAPI caches it), so
+    # get_current_user and the handler use the same session and connection
+    async with async_session_maker() as session:
+        yield session
+
+async def use_read_replica(session: RequestSession = Depends(get_async_session)):
+    """
+    Route dependency letting the request's reads go to a read replica.
+
+    Add it to a route's `dependencies`: those run before its parameters, so
+    the authentication lookup is routed as well.
+    """
+    session.info["read_replica"] = True
@@ -1,18 +1,26 @@
+import asyncio
+import datetime
 import logging
 from app.core.logging import setup_logging
 from fastapi import FastAPI, Depends, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from fastapi.exceptions import RequestValidationError, HTTPException
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database import create_db_and_tables, get_session
+from app.database import async_engine, async_session_maker, create_db_and_tables, get_async_session, replica_set, use_read_replica
 # from app.mongodbsetup import init_mongodb, close_mongodb_connection
 from app.api import auth, tasks
 from app.config import settings
 from app.core.errors import ErrorHandlers
+from app.core.hashing import hashing_pool
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.pool import warm_up_pool
+from app.core.events import event_broker, prune_task_events_periodically
+from app.core.revocation import revocation_store
 from contextlib import asynccontextmanager
 
 logger = setup_logging()
@@ -24,10 +32,33 @@ async def lifespan(app: FastAPI):
         create_db_and_tables()
         logger.info("Database tables created successfully")
     except Exception as e:
-        logger.error(f"Failed to create database tables: {str(e)}")
+        logger.error("Failed to create database tables: %s", e)
         # Don't raise the exception - allow app to start even if tables exist
+    if settings.DB_POOL_WARMUP:
+        for pooled_engine in [async_engine] + [replica.engine for replica in replica_set.replicas]:
+            await warm_up_pool(pooled_engine)
+    # Reads stay on the primary until a replica's lag has been measured
+    await replica_set.refresh()
+    replica_set.start()
+    await event_broker.start()
+    await revocation_store.start()
+    pruner = asyncio.create_task(prune_task_events_periodically(
+        async_session_maker,
+        datetime.timedelta(days=settings.EVENTS_RETENTION_DAYS),
+        settings.EVENTS_PRUNE_INTERVAL_SECONDS,
+    ))
     yield
     logger.info("Shutting down application")
+    pruner.cancel()
+    try:
+        await pruner
+    except asyncio.CancelledError:
+        pass
+    await revocation_store.stop()
+    await event_broker.stop()
+    await replica_set.stop()
+    await async_engine.dispose()
+    hashing_pool.shutdown()
 
 app = FastAPI(title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION, lifespan=lifespan)
 
@@ -51,6 +82,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it wraps the CORS middleware and sees every request
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router)
 app.include_router(tasks.router)
 
@@ -82,12 +116,22 @@ app.openapi = custom_openapi
 def read_root():
     return {"message": "Welcome to the Task Management API", "version": settings.PROJECT_VERSION}
 
-@app.get("/health", tags=["Health"], status_code=status.HTTP_200_OK)
-async def health_check(session: Session = Depends(get_session)):
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus metrics: per-route request counts and latency, SQL per request,
+    connection pool occupancy and wait time, and password hashing timings.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/health", tags=["Health"], status_code=status.HTTP_200_OK, dependencies=[Depends(use_read_replica)])
+async def health_check(session: AsyncSession = Depends(get_async_session)):
     """
     Check the health of the application and its dependencies.
+    The database check reads from a replica when one is usable.
     Returns:
-        dict: Health check results including database status and app version
+        dict: Health check results including database status, replica lag and app version
     """
     health_status = {
         "status": "healthy",
@@ -100,13 +144,13 @@ async def health_check(session: Session = Depends(get_session)):
 
     try:
         # Test database connection
-        session.exec(select(1)).first()
+        (await session.exec(select(1))).first()
         db_status = "connected"
         error = None
     except Exception as e:
         db_status = "disconnected"
         error = str(e)
-        logger.error(f"Database health check failed: {error}")
+        logger.error("Database health check failed: %s", error)
         return JSONResponse(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             content={
@@ -123,7 +167,8 @@ async def health_check(session: Session = Depends(get_session)):
         "status": "healthy",
         "database": {
             "status": db_status,
-            "error": error
+            "error": error,
+            "replicas": replica_set.status()
         },
         "version": settings.PROJECT_VERSION
     }
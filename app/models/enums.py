@@ -9,3 +9,17 @@ class StatusEnum(str, PyEnum):
     PENDING = "Pending"
     COMPLETED = "Completed"
 
+class TaskSortEnum(str, PyEnum):
+    ID = "id"
+    DUE_DATE = "due_date"
+    CREATED_AT = "created_at"
+    RELEVANCE = "relevance"
+
+class ExportFormatEnum(str, PyEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+class TaskEventTypeEnum(str, PyEnum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+import datetime
+
+
+class RevokedToken(SQLModel, table=True):
+    """
+    Access tokens revoked before their expiry, shared by every API replica.
+
+    The autoincrement id lets replicas fetch only the revocations added since
+    they last synced; rows can be pruned once expires_at has passed, because
+    the token is rejected as expired from then on.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    jti: str = Field(unique=True, index=True, max_length=64)
+    expires_at: datetime.datetime = Field(index=True)
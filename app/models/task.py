@@ -5,7 +5,7 @@ from typing import Optional
 import datetime
 from datetime import date
 from app.models.enums import PriorityEnum, StatusEnum
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import DDL, Index, UniqueConstraint, event, text
 
 # class Task(Document):
 #     title: str
@@ -25,10 +25,38 @@ from sqlalchemy import UniqueConstraint
 #             "user_id"
 #         ]
 
+# Full-text document for ranked search; queries must use this exact expression
+# for Postgres to match it to ix_tasks_search_vector
+SEARCH_VECTOR_SQL = "to_tsvector('simple'::regconfig, coalesce(title, '') || ' ' || coalesce(description, ''))"
+
 class Task(SQLModel, table=True):
     __tablename__ = "tasks"
     __table_args__ = (
         UniqueConstraint("title", "user_id", name="uq_task_title_user_id"),
+        # Keyset pagination indexes: one per sortable key, with id as tie-breaker
+        Index("ix_tasks_user_id_id", "user_id", "id"),
+        Index("ix_tasks_user_id_due_date_id", "user_id", "due_date", "id"),
+        Index("ix_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Equality filters from GET /tasks/ lead, due_date serves ranges and sorts
+        Index("ix_tasks_user_id_status_due_date", "user_id", "status", "due_date"),
+        Index("ix_tasks_user_id_priority_due_date", "user_id", "priority", "due_date"),
+        # Open work by due date (overdue and upcoming lists) without completed rows
+        Index(
+            "ix_tasks_user_id_due_date_pending", "user_id", "due_date",
+            postgresql_where=text("status = 'PENDING'"),
+            sqlite_where=text("status = 'PENDING'"),
+        ),
+        # Postgres search indexes: trigram GIN for case-insensitive substring
+        # filters, and a tsvector GIN for ranked q= search
+        Index(
+            "ix_tasks_title_trgm", "title",
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_tasks_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_tasks_search_vector", text(SEARCH_VECTOR_SQL), postgresql_using="gin").ddl_if(dialect="postgresql"),
     )
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(index=True, description="Task title - must be unique per user")
@@ -42,3 +70,29 @@ class Task(SQLModel, table=True):
     user_id: int = Field(foreign_key="users.id")
     user: Optional["User"] = Relationship(back_populates="tasks")  # Use string literal for forward reference
 
+
+
+# pg_trgm provides the gin_trgm_ops operator class used above
+event.listen(
+    SQLModel.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+# SQLite stand-in for the Postgres search indexes: an external-content FTS5
+# table kept in sync with tasks by triggers
+for statement in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(title, description, content='tasks', content_rowid='id')",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+):
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Task.__table__, "before_drop", DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"))
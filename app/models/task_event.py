@@ -0,0 +1,92 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+import datetime
+from app.models.enums import TaskEventTypeEnum
+from sqlalchemy import DDL, Index, event
+
+
+class TaskEvent(SQLModel, table=True):
+    """
+    Append-only log of task changes, written by triggers on the tasks table
+    so every write path is captured without extra round trips.
+
+    The autoincrement id orders a user's events and is the resume token
+    clients send back as Last-Event-ID.
+    """
+    __tablename__ = "task_events"
+    __table_args__ = (
+        Index("ix_task_events_user_id_id", "user_id", "id"),
+        # Pruning may empty the table; SQLite must not hand out old ids again
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int
+    # No foreign key: deleted tasks keep their events
+    task_id: int
+    type: TaskEventTypeEnum
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.now, index=True)
+
+
+class TaskEventRetention(SQLModel, table=True):
+    """
+    How far each user's task_events have been pruned: pruned_through is the
+    user's last pruned event, so positions below it can no longer be caught
+    up from the log. Per user, so other users' events never expire a client
+    that has missed nothing.
+    """
+    __tablename__ = "task_event_retention"
+
+    user_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    pruned_through: int = Field(default=0)
+    pruned_at: Optional[datetime.datetime] = Field(default=None)
+
+
+# Postgres: one row-level trigger that logs the change and wakes every
+# replica's listeners through NOTIFY, which is delivered only on commit and
+# collapses repeated payloads within a transaction to one notification.
+# Ids come from a sequence at insert time, so two transactions could commit
+# their events out of id order and a reader past the later id would skip the
+# earlier one; the per-user transaction lock makes each user's events commit
+# in id order.
+_POSTGRES_DDL = (
+    """CREATE OR REPLACE FUNCTION record_task_event() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            PERFORM pg_advisory_xact_lock(1952543595, OLD.user_id);
+            INSERT INTO task_events (user_id, task_id, type, created_at) VALUES (OLD.user_id, OLD.id, 'DELETED', now());
+            PERFORM pg_notify('task_events', OLD.user_id::text);
+            RETURN OLD;
+        END IF;
+        PERFORM pg_advisory_xact_lock(1952543595, NEW.user_id);
+        INSERT INTO task_events (user_id, task_id, type, created_at)
+        VALUES (NEW.user_id, NEW.id, CASE TG_OP WHEN 'INSERT' THEN 'CREATED' ELSE 'UPDATED' END::taskeventtypeenum, now());
+        PERFORM pg_notify('task_events', NEW.user_id::text);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS tasks_record_event ON tasks",
+    """CREATE TRIGGER tasks_record_event AFTER INSERT OR UPDATE OR DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION record_task_event()""",
+)
+
+# SQLite stand-in: the same log without notifications. SQLite runs one
+# writer at a time, so ids already follow commit order. Timestamps are local
+# time, like the datetime.now() defaults of the models.
+_SQLITE_DDL = (
+    """CREATE TRIGGER IF NOT EXISTS tasks_event_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO task_events (user_id, task_id, type, created_at) VALUES (new.user_id, new.id, 'CREATED', datetime('now', 'localtime'));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_event_au AFTER UPDATE ON tasks BEGIN
+        INSERT INTO task_events (user_id, task_id, type, created_at) VALUES (new.user_id, new.id, 'UPDATED', datetime('now', 'localtime'));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_event_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO task_events (user_id, task_id, type, created_at) VALUES (old.user_id, old.id, 'DELETED', datetime('now', 'localtime'));
+    END""",
+)
+
+# After the whole metadata is created, since the triggers need both tables
+for statement in _POSTGRES_DDL:
+    event.listen(SQLModel.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in _SQLITE_DDL:
+    event.listen(SQLModel.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
@@ -21,7 +21,7 @@ async def init_mongodb():
         
         logger.info("Successfully connected to MongoDB")
     except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {str(e)}")
+        logger.error("Failed to connect to MongoDB: %s", e)
         raise
 
 async def close_mongodb_connection():
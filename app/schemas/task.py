@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, validator
 from datetime import date, timedelta
-from typing import Optional
+from typing import Dict, List, Optional
+from enum import Enum
 import datetime
 from app.models.task import PriorityEnum, StatusEnum
 
@@ -100,3 +101,59 @@ class TaskResponse(TaskBase):
                 "updated_at": "2024-03-13T10:00:00"
             }
         }
+
+# Upper bound on items accepted by a single bulk request
+BULK_MAX_ITEMS = 5000
+
+class BulkItemStatusEnum(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    CONFLICT = "conflict"
+    NOT_FOUND = "not_found"
+
+class TaskBulkCreate(BaseModel):
+    items: List[TaskCreate] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+class TaskBulkUpdateItem(TaskUpdate):
+    id: int = Field(..., description="ID of the task to update")
+
+class TaskBulkUpdate(BaseModel):
+    items: List[TaskBulkUpdateItem] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+class TaskBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+class TaskBulkItemResult(BaseModel):
+    """Outcome of one item in a bulk request, in request order."""
+    index: int = Field(..., description="Position of the item in the request")
+    status: BulkItemStatusEnum
+    id: Optional[int] = Field(None, description="Task ID, when known")
+    task: Optional[TaskResponse] = None
+    detail: Optional[str] = None
+
+class TaskBulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[TaskBulkItemResult]
+
+class TaskChangesResponse(BaseModel):
+    changes: List[TaskResponse] = Field(..., description="Tasks created or updated since the token, as they are now")
+    deleted: List[int] = Field(..., description="IDs of tasks deleted since the token")
+    sync_token: str = Field(..., description="Pass back as `since` to fetch the next changes")
+    has_more: bool = Field(..., description="More changes are waiting; call again right away")
+
+class TaskStatsResponse(BaseModel):
+    """
+    Task counts for the current user.
+
+    Open tasks are those not completed. `due_this_week` counts open tasks due
+    from `as_of` through the end of the week (Sunday).
+    """
+    as_of: date
+    total: int
+    by_status: Dict[StatusEnum, int]
+    by_priority: Dict[PriorityEnum, int]
+    by_status_priority: Dict[StatusEnum, Dict[PriorityEnum, int]]
+    overdue: int
+    due_this_week: int
@@ -0,0 +1,77 @@
+import datetime
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _micros(timestamp: datetime.datetime) -> int:
+    return (timestamp.replace(tzinfo=None) - _EPOCH) // _MICROSECOND
+
+
+def task_etag(task_id: int, updated_at: datetime.datetime) -> str:
+    """
+    Strong ETag for a single task. Every write bumps updated_at, so
+    (id, updated_at) identifies one version of the representation.
+    """
+    return f'"{task_id}-{_micros(updated_at):x}"'
+
+
+def parse_task_etag(etag: str) -> Optional[Tuple[int, datetime.datetime]]:
+    """
+    Recover (task_id, updated_at) from a task ETag, or None if it is not one.
+    """
+    try:
+        task_id, micros = etag.strip().strip('"').split("-")
+        return int(task_id), _EPOCH + int(micros, 16) * _MICROSECOND
+    except ValueError:
+        return None
+
+
+def list_etag(versions: Iterable[Tuple[int, datetime.datetime]], variant: str = "") -> str:
+    """
+    Strong ETag for a page of tasks, from each row's (id, updated_at).
+
+    variant distinguishes different representations of the same rows, such
+    as field projections.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if variant:
+        digest.update(f"{variant}|".encode())
+    for task_id, updated_at in versions:
+        digest.update(f"{task_id}:{_micros(updated_at)};".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def _header_etags(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def not_modified(header: Optional[str], etag: str) -> bool:
+    """
+    True when an If-None-Match header matches etag, i.e. the client's copy is
+    current. Uses weak comparison, as RFC 9110 requires for this header.
+    """
+    if not header:
+        return False
+    tags = _header_etags(header)
+    opaque = etag.removeprefix("W/")
+    return "*" in tags or any(tag.removeprefix("W/") == opaque for tag in tags)
+
+
+def if_match_versions(header: str, task_id: int) -> Optional[List[datetime.datetime]]:
+    """
+    updated_at values an If-Match header accepts for task_id, or None when it
+    accepts any version ("*"). Weak or foreign tags are ignored, since If-Match
+    uses strong comparison.
+    """
+    tags = _header_etags(header)
+    if "*" in tags:
+        return None
+    versions = []
+    for tag in tags:
+        parsed = parse_task_etag(tag)
+        if parsed is not None and parsed[0] == task_id:
+            versions.append(parsed[1])
+    return versions
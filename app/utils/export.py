@@ -0,0 +1,56 @@
+import csv
+import datetime
+import io
+import logging
+from enum import Enum
+from typing import Any, AsyncIterator, Union
+
+from app.models.enums import ExportFormatEnum
+from app.utils.serialization import encode_row_lines
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    ExportFormatEnum.NDJSON: "application/x-ndjson",
+    ExportFormatEnum.CSV: "text/csv",
+}
+
+
+def _csv_value(value: Any) -> Any:
+    # Same representation as the JSON responses: enum values and ISO 8601 dates
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_export(engine, query, export_format: ExportFormatEnum, batch_size: int) -> AsyncIterator[Union[str, bytes]]:
+    """
+    Run query on its own connection and yield it encoded as NDJSON or CSV.
+
+    Rows come from a server-side cursor in batches of batch_size, so memory
+    stays flat however many rows match. The connection is opened here rather
+    than taken from the request session because the body is streamed after
+    request-scoped dependencies have been closed.
+    """
+    async with engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=batch_size))
+        keys = list(result.keys())
+        if export_format == ExportFormatEnum.CSV:
+            yield _csv_chunk([keys])
+        exported = 0
+        async for rows in result.partitions():
+            exported += len(rows)
+            if export_format == ExportFormatEnum.CSV:
+                yield _csv_chunk(rows)
+            else:
+                yield encode_row_lines(keys, rows)
+    logger.info("Exported %s rows as %s", exported, export_format.value)
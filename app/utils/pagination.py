@@ -0,0 +1,74 @@
+import base64
+import binascii
+import datetime
+import json
+from datetime import date
+from typing import Any, Tuple
+
+from app.models.enums import TaskSortEnum
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+# How each sort key is turned into JSON and back
+_SORT_KEY_PARSERS = {
+    TaskSortEnum.ID: int,
+    TaskSortEnum.DUE_DATE: date.fromisoformat,
+    TaskSortEnum.CREATED_AT: datetime.datetime.fromisoformat,
+}
+
+
+def encode_cursor(sort_by: TaskSortEnum, sort_value: Any, task_id: int) -> str:
+    """
+    Build an opaque cursor pointing just past the row (sort_value, task_id).
+    """
+    if isinstance(sort_value, (date, datetime.datetime)):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps({"s": sort_by.value, "v": sort_value, "id": task_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: TaskSortEnum) -> Tuple[Any, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        tuple: (sort_value, task_id) of the last row of the previous page
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort_by.value:
+            raise InvalidCursorError("Cursor was issued for a different sort order")
+        return _SORT_KEY_PARSERS[sort_by](payload["v"]), int(payload["id"])
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Malformed cursor") from e
+
+
+class InvalidSyncTokenError(ValueError):
+    """Raised when a sync token cannot be decoded."""
+
+
+def encode_sync_token(event_id: int) -> str:
+    """
+    Build an opaque sync token for the position just after task event
+    event_id. Positions come from the event log, not from clocks.
+    """
+    payload = json.dumps({"e": event_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> int:
+    """Decode a token produced by encode_sync_token into its event id."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        event_id = int(json.loads(base64.urlsafe_b64decode(padded.encode()))["e"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise InvalidSyncTokenError("Malformed sync token") from e
+    if event_id < 0:
+        raise InvalidSyncTokenError("Malformed sync token")
+    return event_id
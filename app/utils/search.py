@@ -0,0 +1,63 @@
+import re
+
+from sqlalchemy import column, desc, func, literal_column, or_, select, table
+
+from app.models.task import SEARCH_VECTOR_SQL, Task
+
+# Shadow of the SQLite FTS5 table created alongside tasks
+_tasks_fts = table("tasks_fts", column("rowid"), column("rank"))
+
+_TSQUERY_CONFIG = literal_column("'simple'::regconfig")
+_SEARCH_VECTOR = literal_column(SEARCH_VECTOR_SQL)
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def substring_filter(column_, term: str):
+    """
+    Case-insensitive substring match. On Postgres ILIKE is served by the
+    pg_trgm GIN indexes; LIKE wildcards in the term are escaped.
+    """
+    return column_.icontains(term, autoescape=True)
+
+
+def _fts5_query(q: str) -> str:
+    # Quote every word and make it a prefix match, so user input can never be
+    # parsed as FTS5 query syntax
+    return " ".join(f'"{word}"*' for word in _WORD.findall(q))
+
+
+def apply_text_search(query, q: str, dialect: str):
+    """
+    Restrict query to tasks whose title or description matches q, either as a
+    full-text match or as a case-insensitive substring.
+    """
+    substring = or_(substring_filter(Task.title, q), substring_filter(Task.description, q))
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery(_TSQUERY_CONFIG, q)
+        return query.where(or_(_SEARCH_VECTOR.op("@@")(tsquery), substring))
+    if dialect == "sqlite":
+        fts_query = _fts5_query(q)
+        if fts_query:
+            matches = select(_tasks_fts.c.rowid).where(literal_column("tasks_fts").op("MATCH")(fts_query))
+            return query.where(or_(Task.id.in_(matches), substring))
+    return query.where(substring)
+
+
+def relevance_order(q: str, dialect: str):
+    """
+    ORDER BY expression ranking the best matches for q first.
+    """
+    if dialect == "postgresql":
+        return desc(func.ts_rank(_SEARCH_VECTOR, func.websearch_to_tsquery(_TSQUERY_CONFIG, q)))
+    if dialect == "sqlite":
+        fts_query = _fts5_query(q)
+        if fts_query:
+            # FTS5 rank is bm25(), where lower is better; non-matches sort last
+            rank = (
+                select(_tasks_fts.c.rank)
+                .where(literal_column("tasks_fts").op("MATCH")(fts_query), _tasks_fts.c.rowid == Task.id)
+                .scalar_subquery()
+            )
+            return func.coalesce(rank, 0.0)
+    # No ranking available: exact title matches first
+    return desc(func.lower(Task.title) == q.lower())
@@ -0,0 +1,73 @@
+from typing import Iterable, List, Optional, Sequence
+
+import orjson
+
+from app.models.task import Task
+
+# TaskResponse's fields as columns, in the model's field order. Selecting
+# these and encoding the rows directly gives the same JSON as validating
+# Task objects into TaskResponse, without building a model per row.
+TASK_RESPONSE_COLUMNS = (
+    Task.title, Task.description, Task.due_date, Task.priority, Task.status,
+    Task.id, Task.user_id, Task.created_at, Task.updated_at,
+)
+
+TASK_RESPONSE_FIELDS = {column.key: column for column in TASK_RESPONSE_COLUMNS}
+
+
+class UnknownFieldError(ValueError):
+    pass
+
+
+def response_columns(fields: Optional[str]) -> List:
+    """
+    Columns for a comma-separated `fields=` projection, in TaskResponse order.
+    All response columns when fields is None.
+    """
+    if fields is None:
+        return list(TASK_RESPONSE_COLUMNS)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - TASK_RESPONSE_FIELDS.keys()
+    if unknown:
+        raise UnknownFieldError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(TASK_RESPONSE_FIELDS)}"
+        )
+    if not requested:
+        raise UnknownFieldError("fields must name at least one field")
+    return [column for column in TASK_RESPONSE_COLUMNS if column.key in requested]
+
+
+def with_required_columns(columns: Sequence, required: Iterable) -> List:
+    """
+    columns followed by any of required not already among them.
+
+    Rows selected this way can be encoded with only the keys of columns:
+    encoding zips keys with row values, so the trailing extras are left out.
+    """
+    keys = {column.key for column in columns}
+    extra = []
+    for column in required:
+        if column.key not in keys:
+            keys.add(column.key)
+            extra.append(column)
+    return [*columns, *extra]
+
+
+def encode_row(keys: Sequence[str], row: Sequence) -> bytes:
+    """Encode a single result row as a JSON object."""
+    return orjson.dumps(dict(zip(keys, row)))
+
+
+def encode_rows(keys: Sequence[str], rows: Iterable[Sequence]) -> bytes:
+    """
+    Encode result rows as a JSON array of objects with orjson.
+
+    orjson writes dates and datetimes in ISO 8601 and enums by value, the same
+    representation pydantic produces for the response models.
+    """
+    return orjson.dumps([dict(zip(keys, row)) for row in rows])
+
+
+def encode_row_lines(keys: Sequence[str], rows: Iterable[Sequence]) -> bytes:
+    """Encode result rows as newline-delimited JSON objects."""
+    return b"".join(orjson.dumps(dict(zip(keys, row))) + b"\n" for row in rows)
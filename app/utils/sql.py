@@ -0,0 +1,36 @@
+from typing import Iterator, List, Sequence, TypeVar
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+T = TypeVar("T")
+
+# Dialect-specific INSERT constructs (they add ON CONFLICT support)
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+def dialect_name(session) -> str:
+    """Name of the dialect the session is bound to, e.g. 'postgresql' or 'sqlite'."""
+    return session.get_bind().dialect.name
+
+def check_dialect_supported(engine) -> None:
+    """
+    Raise ValueError unless the engine's dialect supports the ON CONFLICT
+    inserts the write paths rely on. Called when the engines are created.
+    """
+    name = engine.dialect.name
+    if name not in _DIALECT_INSERTS:
+        raise ValueError(f"Unsupported database: {name} (expected one of {', '.join(_DIALECT_INSERTS)})")
+
+def dialect_insert(session, table):
+    """
+    INSERT construct for the session's dialect, supporting on_conflict_do_nothing().
+    The engine was checked by check_dialect_supported() at startup.
+    """
+    return _DIALECT_INSERTS[dialect_name(session)](table)
+
+def chunked(items: Sequence[T], size: int) -> Iterator[List[T]]:
+    """Split items into lists of at most size elements."""
+    for start in range(0, len(items), size):
+        yield list(items[start:start + size])
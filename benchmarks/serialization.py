@@ -0,0 +1,114 @@
+"""
+Per-row cost of serializing a GET /tasks/ page.
+
+Compares the two response paths on an in-memory SQLite database:
+
+  orm+pydantic  SELECT Task entities, validate them into TaskResponse and
+                encode the result the way FastAPI does (the old path)
+  columns+orjson  SELECT the TaskResponse columns as tuples and encode them
+                with orjson (app.utils.serialization, the current path)
+
+Both the query and the encoding are timed, and encoding is also timed on its
+own. Run from the repository root:
+
+    python -m benchmarks.serialization --rows 500 --repeat 50
+"""
+import argparse
+import datetime
+import json
+import statistics
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models.enums import PriorityEnum, StatusEnum
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.task import TaskResponse
+from app.utils.serialization import TASK_RESPONSE_COLUMNS, encode_rows
+
+RESPONSE_ADAPTER = TypeAdapter(List[TaskResponse])
+
+
+def seed(engine, rows: int) -> int:
+    now = datetime.datetime.now()
+    with Session(engine) as session:
+        user = User(email="bench@example.com", username="bench", hashed_password="x")
+        session.add(user)
+        session.commit()
+        session.add_all(
+            Task(
+                title=f"Benchmark task {i}",
+                description="Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4,
+                due_date=datetime.date.today() + datetime.timedelta(days=1 + i % 300),
+                priority=list(PriorityEnum)[i % 3],
+                status=list(StatusEnum)[i % 2],
+                created_at=now,
+                updated_at=now,
+                user_id=user.id,
+            )
+            for i in range(rows)
+        )
+        session.commit()
+        return user.id
+
+
+def pydantic_encode(tasks) -> bytes:
+    # What FastAPI does with a List[TaskResponse] response_model
+    models = RESPONSE_ADAPTER.validate_python(tasks, from_attributes=True)
+    content = RESPONSE_ADAPTER.dump_python(models, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def orm_pydantic(engine, user_id: int, rows: int, encode_only: bool):
+    with Session(engine) as session:
+        started = time.perf_counter()
+        tasks = session.exec(select(Task).where(Task.user_id == user_id).order_by(Task.id).limit(rows)).all()
+        if encode_only:
+            started = time.perf_counter()
+        pydantic_encode(tasks)
+        return time.perf_counter() - started
+
+
+def columns_orjson(engine, user_id: int, rows: int, encode_only: bool):
+    query = select(Task).where(Task.user_id == user_id).order_by(Task.id).limit(rows)
+    query = query.with_only_columns(*TASK_RESPONSE_COLUMNS)
+    with Session(engine) as session:
+        started = time.perf_counter()
+        result = session.execute(query)
+        keys = list(result.keys())
+        tasks = result.all()
+        if encode_only:
+            started = time.perf_counter()
+        encode_rows(keys, tasks)
+        return time.perf_counter() - started
+
+
+def measure(path, engine, user_id: int, rows: int, repeat: int, encode_only: bool) -> float:
+    path(engine, user_id, rows, encode_only)  # warm-up
+    samples = [path(engine, user_id, rows, encode_only) for _ in range(repeat)]
+    return statistics.median(samples) / rows * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=50, help="timed iterations per path")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    user_id = seed(engine, args.rows)
+
+    print(f"{args.rows} rows per page, median of {args.repeat} runs (microseconds per row)")
+    print(f"{'path':<16}{'query+encode':>14}{'encode only':>14}")
+    for name, path in (("orm+pydantic", orm_pydantic), ("columns+orjson", columns_orjson)):
+        total = measure(path, engine, user_id, args.rows, args.repeat, encode_only=False)
+        encode = measure(path, engine, user_id, args.rows, args.repeat, encode_only=True)
+        print(f"{name:<16}{total:>14.2f}{encode:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,98 +1,996 @@
+"""
+MongoDB -> PostgreSQL migrator.
+
+Each collection is split into _id ranges that are migrated in parallel. Every
+range runs as its own pipeline: a reader thread streams documents in _id
+order, a transform thread turns batches into rows, and the writer bulk-loads
+them, with bounded queues between the stages so a slow writer throttles the
+reader instead of buffering the collection in memory.
+
+Each batch is written in the same transaction as its range's checkpoint (the
+last _id loaded), so a crashed run resumes exactly where it stopped. Drop the
+migration_checkpoints table to start over.
+
+users and tasks load into the application's tables, which must exist; users
+first, since tasks reference them through the id map. Other collections load
+as JSON documents into (id, data, created_at, updated_at) tables.
+
+Sources: MongoDB, or a directory of JSON dumps (mongoexport output) for local
+runs. Sinks: PostgreSQL via COPY, or SQLite as a local stand-in.
+
+The PostgreSQL sink sets session_replication_role = replica on its
+connections, which switches off user triggers for them, so the load neither
+logs every task in task_events nor NOTIFYs listeners about it. That setting
+needs a superuser (or, from PostgreSQL 15, a role granted SET on it), and it
+also skips foreign key checks; owners are resolved through the id map, so
+tasks only ever reference migrated users.
+"""
+import datetime
+import io
+import json
+import logging
 import os
+import queue
+import sqlite3
+import threading
 import time
-import logging
-from concurrent.futures import ThreadPoolExecutor
-from typing import Dict, List, Any
-import pymongo
-from pymongo import MongoClient
-import psycopg2
-from psycopg2.extras import execute_values
-from datetime import datetime
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.models.enums import PriorityEnum, StatusEnum
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class DataMigrator:
-    def __init__(self, mongo_uri: str, pg_config: Dict[str, str], batch_size: int = 1000):
-        self.mongo_uri = mongo_uri
-        self.pg_config = pg_config
-        self.batch_size = batch_size
-        self.mongo_client = None
-        self.pg_conn = None
-
-    def connect(self):
-        # Connect to MongoDB with optimal settings
-        self.mongo_client = MongoClient(
-            self.mongo_uri,
-            maxPoolSize=50,
-            waitQueueMultiple=10,
-            retryWrites=True,
-            retryReads=True,
-            w='majority'
+CHECKPOINT_TABLE = "migration_checkpoints"
+ID_MAP_TABLE = "migration_id_map"
+
+
+class PipelineAborted(Exception):
+    """Another stage failed; this one stops without an error of its own."""
+
+
+# Sources
+
+
+class Source(ABC):
+    """Documents of a collection, readable by _id range in _id order."""
+
+    @abstractmethod
+    def count(self, collection: str) -> int:
+        """Documents in collection."""
+
+    @abstractmethod
+    def split(self, collection: str, partitions: int) -> List[Any]:
+        """Up to partitions - 1 ascending _id values splitting the collection evenly."""
+
+    @abstractmethod
+    def read(self, collection: str, lo: Any, hi: Any, after: Any, batch_size: int) -> Iterator[List[Dict]]:
+        """
+        Batches of documents with lo <= _id < hi (None: unbounded), or
+        after < _id < hi once after is set, in _id order.
+        """
+
+    def encode_id(self, value: Any) -> Optional[str]:
+        return None if value is None else json.dumps(value)
+
+    def decode_id(self, value: Optional[str]) -> Any:
+        return None if value is None else json.loads(value)
+
+    def close(self) -> None:
+        ...
+
+
+class MongoSource(Source):
+    def __init__(self, uri: str, db_name: str, pool_size: int = 10):
+        from pymongo import MongoClient
+
+        self.client = MongoClient(uri, maxPoolSize=pool_size, retryReads=True)
+        self.db = self.client[db_name]
+
+    def count(self, collection: str) -> int:
+        # Only feeds progress and ETA, so the metadata count will do
+        return self.db[collection].estimated_document_count()
+
+    def split(self, collection: str, partitions: int) -> List[Any]:
+        total = self.db[collection].estimated_document_count()
+        bounds = []
+        for i in range(1, partitions):
+            # Walks the _id index only, once per boundary
+            doc = next(self.db[collection].find({}, {"_id": 1}).sort("_id", 1).skip(total * i // partitions).limit(1), None)
+            if doc is not None and (not bounds or doc["_id"] > bounds[-1]):
+                bounds.append(doc["_id"])
+        return bounds
+
+    def read(self, collection: str, lo: Any, hi: Any, after: Any, batch_size: int) -> Iterator[List[Dict]]:
+        query: Dict[str, Any] = {}
+        if after is not None:
+            query["$gt"] = after
+        elif lo is not None:
+            query["$gte"] = lo
+        if hi is not None:
+            query["$lt"] = hi
+        # One cursor for the whole range, consumed batch by batch
+        cursor = self.db[collection].find({"_id": query} if query else {}, batch_size=batch_size).sort("_id", 1)
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def encode_id(self, value: Any) -> Optional[str]:
+        from bson import json_util
+
+        return None if value is None else json_util.dumps(value)
+
+    def decode_id(self, value: Optional[str]) -> Any:
+        from bson import json_util
+
+        return None if value is None else json_util.loads(value)
+
+    def close(self):
+        self.client.close()
+
+
+def _extended_json(value: Dict) -> Any:
+    """object_hook for the MongoDB extended JSON that mongoexport writes."""
+    if len(value) == 1:
+        if "$oid" in value:
+            return value["$oid"]
+        if "$numberLong" in value:
+            return int(value["$numberLong"])
+        if "$date" in value:
+            date = value["$date"]
+            if isinstance(date, int):
+                return datetime.datetime.fromtimestamp(date / 1000, datetime.timezone.utc).replace(tzinfo=None)
+            return datetime.datetime.fromisoformat(date.replace("Z", "+00:00")).replace(tzinfo=None)
+    return value
+
+
+class JsonDumpSource(Source):
+    """
+    <directory>/<collection>.json files, either newline-delimited documents
+    (mongoexport's default) or one JSON array. ObjectIds become their hex
+    strings. Each file is loaded whole and sorted by _id.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._collections: Dict[str, Tuple[List[Any], List[Dict]]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, collection: str) -> Tuple[List[Any], List[Dict]]:
+        with self._lock:
+            if collection not in self._collections:
+                with open(os.path.join(self.directory, f"{collection}.json")) as f:
+                    text = f.read()
+                if text.lstrip().startswith("["):
+                    docs = json.loads(text, object_hook=_extended_json)
+                else:
+                    docs = [json.loads(line, object_hook=_extended_json) for line in text.splitlines() if line.strip()]
+                docs.sort(key=lambda doc: doc["_id"])
+                self._collections[collection] = ([doc["_id"] for doc in docs], docs)
+            return self._collections[collection]
+
+    def count(self, collection: str) -> int:
+        return len(self._load(collection)[1])
+
+    def split(self, collection: str, partitions: int) -> List[Any]:
+        ids, _ = self._load(collection)
+        bounds = []
+        for i in range(1, partitions):
+            index = len(ids) * i // partitions
+            if index < len(ids) and (not bounds or ids[index] > bounds[-1]):
+                bounds.append(ids[index])
+        return bounds
+
+    def read(self, collection: str, lo: Any, hi: Any, after: Any, batch_size: int) -> Iterator[List[Dict]]:
+        ids, docs = self._load(collection)
+        if after is not None:
+            start = bisect_left(ids, after)
+            if start < len(ids) and ids[start] == after:
+                start += 1
+        else:
+            start = 0 if lo is None else bisect_left(ids, lo)
+        end = len(ids) if hi is None else bisect_left(ids, hi)
+        for offset in range(start, end, batch_size):
+            yield docs[offset:min(offset + batch_size, end)]
+
+
+# Targets and sinks
+
+
+@dataclass
+class Target:
+    """
+    A table to load: its columns, the conflict key, and the columns an upsert
+    refreshes (none: existing rows are kept).
+    """
+    table: str
+    columns: Sequence[str]
+    key: Sequence[str]
+    update: Sequence[str] = ()
+    # Only rows for which this holds are updated on conflict
+    update_where: Optional[str] = None
+    # Column definitions, for tables the migrator creates itself
+    create: Optional[str] = None
+    # Column whose sequence has to be moved past explicitly loaded ids
+    serial: Optional[str] = None
+    # Merge order, so parallel writers take row locks in the same order
+    order: Sequence[str] = ()
+
+    def on_conflict(self) -> str:
+        clause = f"ON CONFLICT ({', '.join(self.key)}) DO "
+        if not self.update:
+            return clause + "NOTHING"
+        clause += "UPDATE SET " + ", ".join(f"{column} = EXCLUDED.{column}" for column in self.update)
+        if self.update_where:
+            clause += f" WHERE {self.update_where}"
+        return clause
+
+
+@dataclass
+class Partition:
+    collection: str
+    index: int
+    lo: Any
+    hi: Any
+    after: Any = None
+    rows: int = 0
+    done: bool = False
+
+
+@dataclass
+class Batch:
+    """Transformed rows of one batch of documents, ready to write."""
+    rows: List[tuple]
+    # Documents read, including any skipped by the transform
+    count: int
+    last_id: str
+    # New (mongo _id, integer id) assignments to persist with the rows
+    ids: List[Tuple[str, int]]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+class SinkConnection(ABC):
+    """One writer's connection; every write commits together with its checkpoint."""
+
+    placeholder = "%s"
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def _cursor(self):
+        return self.conn.cursor()
+
+    def ensure_target(self, target: Target) -> None:
+        if target.create:
+            self._cursor().execute(f"CREATE TABLE IF NOT EXISTS {target.table} ({target.create})")
+            self.conn.commit()
+
+    def ensure_schema(self) -> None:
+        """The migrator's own bookkeeping tables."""
+        cur = self._cursor()
+        cur.execute(
+            f"""CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+                collection TEXT NOT NULL,
+                part INTEGER NOT NULL,
+                lo TEXT,
+                hi TEXT,
+                last_id TEXT,
+                loaded BIGINT NOT NULL DEFAULT 0,
+                done BOOLEAN NOT NULL DEFAULT FALSE,
+                updated_at TIMESTAMP,
+                PRIMARY KEY (collection, part)
+            )"""
+        )
+        cur.execute(
+            f"""CREATE TABLE IF NOT EXISTS {ID_MAP_TABLE} (
+                collection TEXT NOT NULL,
+                mongo_id TEXT NOT NULL,
+                id BIGINT NOT NULL,
+                PRIMARY KEY (collection, mongo_id)
+            )"""
+        )
+        self.conn.commit()
+
+    def load_id_map(self, collection: str) -> Dict[str, int]:
+        cur = self._cursor()
+        cur.execute(f"SELECT mongo_id, id FROM {ID_MAP_TABLE} WHERE collection = {self.placeholder}", (collection,))
+        return dict(cur.fetchall())
+
+    def load_users(self) -> List[Tuple[int, str, str]]:
+        """(id, email, username) of every row already in users."""
+        cur = self._cursor()
+        cur.execute("SELECT id, email, username FROM users")
+        return cur.fetchall()
+
+    def max_id(self, table: str) -> int:
+        cur = self._cursor()
+        cur.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+        return cur.fetchone()[0]
+
+    def load_partitions(self, collection: str) -> List[Tuple[int, Optional[str], Optional[str], Optional[str], int, bool]]:
+        cur = self._cursor()
+        cur.execute(
+            f"SELECT part, lo, hi, last_id, loaded, done FROM {CHECKPOINT_TABLE} WHERE collection = {self.placeholder} ORDER BY part",
+            (collection,),
+        )
+        return [(index, lo, hi, last_id, rows, bool(done)) for index, lo, hi, last_id, rows, done in cur.fetchall()]
+
+    def save_partitions(self, collection: str, bounds: List[Tuple[Optional[str], Optional[str]]]) -> None:
+        p = self.placeholder
+        cur = self._cursor()
+        for index, (lo, hi) in enumerate(bounds):
+            cur.execute(
+                f"INSERT INTO {CHECKPOINT_TABLE} (collection, part, lo, hi) VALUES ({p}, {p}, {p}, {p})",
+                (collection, index, lo, hi),
+            )
+        self.conn.commit()
+
+    def _save_checkpoint(self, cur, partition: Partition, last_id: Optional[str], count: int, done: bool = False) -> None:
+        p = self.placeholder
+        cur.execute(
+            f"""UPDATE {CHECKPOINT_TABLE}
+                SET last_id = COALESCE({p}, last_id), loaded = loaded + {p}, done = {p}, updated_at = {p}
+                WHERE collection = {p} AND part = {p}""",
+            (last_id, count, done, datetime.datetime.now().isoformat(" "), partition.collection, partition.index),
+        )
+
+    @abstractmethod
+    def write_batch(self, target: Target, batch: Batch, partition: Partition) -> None:
+        """Load batch's rows and id assignments, and advance partition's checkpoint, in one transaction."""
+
+    def finish_partition(self, partition: Partition) -> None:
+        self._save_checkpoint(self._cursor(), partition, None, 0, done=True)
+        self.conn.commit()
+
+    def finish_target(self, target: Target) -> None:
+        ...
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is not None:
+            self.conn.rollback()
+        self.close()
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return (
+        str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def copy_buffer(rows: List[tuple]) -> io.StringIO:
+    """Rows in COPY's text format."""
+    return io.StringIO("".join("\t".join(_copy_value(value) for value in row) + "\n" for row in rows))
+
+
+class PostgresConnection(SinkConnection):
+    def __init__(self, conn):
+        super().__init__(conn)
+        self._staging = set()
+
+    def write_batch(self, target: Target, batch: Batch, partition: Partition) -> None:
+        columns = ", ".join(target.columns)
+        staging = f"staging_{target.table}"
+        with self.conn.cursor() as cur:
+            if staging not in self._staging:
+                # Just the loaded columns, without the target's constraints
+                cur.execute(
+                    f"CREATE TEMP TABLE {staging} ON COMMIT DELETE ROWS AS SELECT {columns} FROM {target.table} WITH NO DATA"
+                )
+                self._staging.add(staging)
+            # COPY can't upsert, so load a staging table and merge from it
+            cur.copy_expert(f"COPY {staging} ({columns}) FROM STDIN", copy_buffer(batch.rows))
+            order = f" ORDER BY {', '.join(target.order)}" if target.order else ""
+            cur.execute(f"INSERT INTO {target.table} ({columns}) SELECT {columns} FROM {staging}{order} {target.on_conflict()}")
+            if batch.ids:
+                cur.copy_expert(
+                    f"COPY {ID_MAP_TABLE} (collection, mongo_id, id) FROM STDIN",
+                    copy_buffer([(partition.collection, mongo_id, new_id) for mongo_id, new_id in batch.ids]),
+                )
+            self._save_checkpoint(cur, partition, batch.last_id, batch.count)
+        self.conn.commit()
+
+    def finish_target(self, target: Target) -> None:
+        if target.serial is None:
+            return
+        with self.conn.cursor() as cur:
+            cur.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE(MAX({target.serial}), 0) + 1, false) FROM {target.table}",
+                (target.table, target.serial),
+            )
+        self.conn.commit()
+
+
+class SQLiteConnection(SinkConnection):
+    placeholder = "?"
+
+    def write_batch(self, target: Target, batch: Batch, partition: Partition) -> None:
+        columns = ", ".join(target.columns)
+        values = ", ".join("?" for _ in target.columns)
+        cur = self.conn.cursor()
+        cur.executemany(
+            f"INSERT INTO {target.table} ({columns}) VALUES ({values}) {target.on_conflict()}",
+            # Timestamps in the format SQLAlchemy writes, so they compare as text
+            [
+                tuple(value.strftime("%Y-%m-%d %H:%M:%S.%f") if isinstance(value, datetime.datetime) else value for value in row)
+                for row in batch.rows
+            ],
         )
-        
-        # Connect to PostgreSQL with optimal settings
-        self.pg_conn = psycopg2.connect(
+        cur.executemany(
+            f"INSERT INTO {ID_MAP_TABLE} (collection, mongo_id, id) VALUES (?, ?, ?)",
+            [(partition.collection, mongo_id, new_id) for mongo_id, new_id in batch.ids],
+        )
+        self._save_checkpoint(cur, partition, batch.last_id, batch.count)
+        self.conn.commit()
+
+
+class Sink(ABC):
+    """Where rows are loaded; each writer opens its own connection."""
+
+    @abstractmethod
+    def connect(self) -> SinkConnection:
+        """A new connection, closed by its context manager."""
+
+
+class PostgresSink(Sink):
+    def __init__(self, pg_config: Dict[str, str]):
+        self.pg_config = pg_config
+
+    def connect(self) -> SinkConnection:
+        import psycopg2
+
+        conn = psycopg2.connect(
             **self.pg_config,
             keepalives=1,
             keepalives_idle=30,
             keepalives_interval=10,
             keepalives_count=5
         )
-        self.pg_conn.set_session(autocommit=False)
-
-    def migrate_collection(self, db_name: str, collection_name: str):
-        start_time = time.time()
-        collection = self.mongo_client[db_name][collection_name]
-        total_docs = collection.count_documents({})
-        
-        logger.info(f"Starting migration of {total_docs} documents")
-        
-        cursor = collection.find({}, batch_size=self.batch_size)
-        processed = 0
-        
-        with self.pg_conn.cursor() as cur:
-            while True:
-                batch = list(cursor.limit(self.batch_size))
-                if not batch:
-                    break
-                
-                # Transform batch
-                transformed_data = [self.transform_document(doc) for doc in batch]
-                
-                # Insert batch using execute_values for better performance
-                insert_query = f"""
-                    INSERT INTO {collection_name} (id, data, created_at, updated_at)
-                    VALUES %s
-                    ON CONFLICT (id) DO UPDATE
-                    SET data = EXCLUDED.data,
-                        updated_at = EXCLUDED.updated_at;
-                """
-                
-                execute_values(cur, insert_query, transformed_data)
-                self.pg_conn.commit()
-                
-                processed += len(batch)
-                elapsed = time.time() - start_time
-                rate = processed / elapsed
-                
-                logger.info(
-                    f"Processed {processed}/{total_docs} documents "
-                    f"({(processed/total_docs)*100:.2f}%) "
-                    f"at {rate:.2f} docs/sec"
-                )
+        conn.set_session(autocommit=False)
+        with conn.cursor() as cur:
+            # No task_events rows or NOTIFYs for loaded rows, see the module docstring
+            cur.execute("SET session_replication_role = replica")
+        conn.commit()
+        return PostgresConnection(conn)
+
+
+class SQLiteSink(Sink):
+    """Local stand-in for PostgreSQL. SQLite serializes the writers."""
 
-    @staticmethod
-    def transform_document(doc: Dict) -> tuple:
-        return (
-            str(doc['_id']),
-            psycopg2.extras.Json(doc),
-            doc.get('createdAt', datetime.utcnow()),
-            doc.get('updatedAt', datetime.utcnow())
+    def __init__(self, path: str):
+        self.path = path
+
+    def connect(self) -> SinkConnection:
+        conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return SQLiteConnection(conn)
+
+
+# Pipeline
+
+
+class Progress:
+    """Rows loaded for one collection, logged with rate and ETA at most every interval seconds."""
+
+    def __init__(self, collection: str, total: int, already_loaded: int = 0, interval: float = 5.0):
+        self.collection = collection
+        self.total = total
+        self.already_loaded = already_loaded
+        self.loaded = 0
+        self.interval = interval
+        self.started = time.monotonic()
+        self._logged = self.started
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.loaded / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> Optional[float]:
+        rate = self.rate
+        if rate == 0:
+            return None
+        return max(self.total - self.already_loaded - self.loaded, 0) / rate
+
+    def add(self, count: int) -> None:
+        with self._lock:
+            self.loaded += count
+            now = time.monotonic()
+            if now - self._logged < self.interval:
+                return
+            self._logged = now
+        self.log()
+
+    def log(self) -> None:
+        done = self.already_loaded + self.loaded
+        eta = self.eta()
+        logger.info(
+            "%s: %s/%s documents (%.1f%%) at %.0f docs/sec, ETA %s",
+            self.collection, done, self.total, 100.0 * done / self.total if self.total else 100.0,
+            self.rate, "unknown" if eta is None else f"{eta:.0f}s",
         )
 
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.2)
+            return
+        except queue.Full:
+            pass
+    raise PipelineAborted()
+
+
+def _get(q: queue.Queue, stop: threading.Event) -> Any:
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.2)
+        except queue.Empty:
+            pass
+    raise PipelineAborted()
+
+
+_DONE = object()
+
+
+# Transforms
+#
+# Each works a batch at a time and a column at a time: every field is pulled
+# out of the whole batch in one comprehension, with lookups resolved once per
+# batch rather than once per document, and rows are only assembled at the end.
+
+
+class IdMap:
+    """
+    Mongo _id -> integer primary key for one collection. Ids are assigned
+    here, past both the table's and the map's highest, and persisted in
+    migration_id_map with the rows that use them.
+    """
+
+    def __init__(self, ids: Dict[str, int], start: int):
+        self._ids = ids
+        self._next = max([start, *ids.values()]) + 1
+        self._lock = threading.Lock()
+
+    def get(self, mongo_id: str) -> Optional[int]:
+        return self._ids.get(mongo_id)
+
+    def assign(self, mongo_ids: List[str]) -> Tuple[List[int], List[Tuple[str, int]]]:
+        """Ids for mongo_ids, and the assignments that are new."""
+        new = []
+        with self._lock:
+            for mongo_id in mongo_ids:
+                if mongo_id not in self._ids:
+                    self._ids[mongo_id] = self._next
+                    new.append((mongo_id, self._next))
+                    self._next += 1
+            return [self._ids[mongo_id] for mongo_id in mongo_ids], new
+
+    def alias(self, mongo_id: str, id_: int) -> Tuple[str, int]:
+        """Map mongo_id onto an id that already belongs to another document or row."""
+        with self._lock:
+            self._ids[mongo_id] = id_
+        return mongo_id, id_
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+def _enum_lookup(enum) -> Dict[str, str]:
+    """
+    Every accepted spelling of enum's members -> the member name, which is
+    what SQLAlchemy stores: exact names and values, plus their lowercase
+    forms with "_" or "-" read as spaces.
+    """
+    lookup = {}
+    for member in enum:
+        for spelling in (member.name, member.value):
+            lookup[spelling] = member.name
+            lookup[spelling.lower().replace("_", " ")] = member.name
+    return lookup
+
+
+PRIORITIES = _enum_lookup(PriorityEnum)
+STATUSES = _enum_lookup(StatusEnum)
+
+
+def coerce_enum(values: List[Any], lookup: Dict[str, str], default: str) -> Tuple[List[str], int]:
+    """Member names for a column of raw values, and how many fell back to default."""
+    names = [lookup.get(value) for value in values]
+    unknown = 0
+    for i, name in enumerate(names):
+        if name is None:
+            name = lookup.get(str(values[i]).strip().lower().replace("_", " ").replace("-", " "))
+            if name is None:
+                name = default
+                unknown += 1
+            names[i] = name
+    return names, unknown
+
+
+def _datetime(value: Any, default: datetime.datetime) -> datetime.datetime:
+    if isinstance(value, datetime.datetime):
+        return value.replace(tzinfo=None) if value.tzinfo else value
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+        except ValueError:
+            pass
+    return default
+
+
+def _date(value: Any) -> Optional[datetime.date]:
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value[:10])
+        except ValueError:
+            pass
+    return None
+
+
+class Transform(ABC):
+    """Turns batches of one collection's documents into rows of target."""
+
+    target: Target
+
+    def __init__(self):
+        # Documents left out, by reason; shared by the partitions' threads
+        self.skipped: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def skip(self, reason: str, count: int) -> None:
+        if count:
+            with self._lock:
+                self.skipped[reason] = self.skipped.get(reason, 0) + count
+
+    @abstractmethod
+    def __call__(self, docs: List[Dict]) -> Tuple[List[tuple], List[Tuple[str, int]]]:
+        """The batch's rows and any new id assignments."""
+
+
+class DocumentTransform(Transform):
+    """Any collection, as JSON documents keyed by their _id."""
+
+    def __init__(self, collection: str):
+        super().__init__()
+        self.target = Target(
+            table=collection,
+            columns=("id", "data", "created_at", "updated_at"),
+            key=("id",),
+            update=("data", "updated_at"),
+            create="id TEXT PRIMARY KEY, data JSONB, created_at TIMESTAMP, updated_at TIMESTAMP",
+        )
+
+    def __call__(self, docs: List[Dict]) -> Tuple[List[tuple], List[Tuple[str, int]]]:
+        now = datetime.datetime.utcnow()
+        return [
+            (
+                str(doc['_id']),
+                json.dumps(doc, default=_json_default),
+                doc.get('createdAt', now),
+                doc.get('updatedAt', now)
+            )
+            for doc in docs
+        ], []
+
+
+class UserTransform(Transform):
+    """
+    users documents into the users table, assigning each an integer id.
+    Mongo never enforced unique emails or usernames, so a document whose
+    email or username is already taken, by an earlier document or an existing
+    row, is merged into that user: its _id maps to the same id, so its tasks
+    follow. One whose email and username belong to two different users is
+    skipped.
+    """
+
+    target = Target(
+        table="users",
+        columns=("id", "email", "username", "hashed_password", "is_active", "created_at"),
+        key=("id",),
+        serial="id",
+    )
+
+    def __init__(self, id_map: IdMap, existing: List[Tuple[int, str, str]]):
+        super().__init__()
+        self.id_map = id_map
+        # ("email" | "username", value) -> id of the user holding it
+        self._claims: Dict[Tuple[str, str], int] = {}
+        for user_id, email, username in existing:
+            self._claims[("email", email)] = user_id
+            self._claims[("username", username)] = user_id
+        # Rows this run assigned, by id. A merged document's batch writes its
+        # user's row too (a no-op if already there), so the id it maps to
+        # exists even if the job stops before that row's own batch commits.
+        self._rows: Dict[int, tuple] = {}
+        self._claims_lock = threading.Lock()
+
+    def __call__(self, docs: List[Dict]) -> Tuple[List[tuple], List[Tuple[str, int]]]:
+        # Users the table can't hold get no id, so their tasks are skipped too
+        valid = [doc for doc in docs if doc.get("email") and doc.get("username") and doc.get("hashed_password")]
+        self.skip("missing email, username or password", len(docs) - len(valid))
+        now = datetime.datetime.now()
+        mongo_ids = [str(doc["_id"]) for doc in valid]
+        emails = [doc["email"] for doc in valid]
+        usernames = [doc["username"] for doc in valid]
+        passwords = [doc["hashed_password"] for doc in valid]
+        active = [bool(doc.get("is_active", True)) for doc in valid]
+        created = [_datetime(doc.get("created_at", doc.get("createdAt")), now) for doc in valid]
+
+        # By id: a batch can merge several documents into one user
+        rows: Dict[int, tuple] = {}
+        new = []
+        merged = conflicting = 0
+        with self._claims_lock:
+            for mongo_id, email, username, row in zip(mongo_ids, emails, usernames, zip(passwords, active, created)):
+                owners = {self._claims.get(("email", email)), self._claims.get(("username", username))}
+                owners -= {None, self.id_map.get(mongo_id)}
+                if len(owners) > 1:
+                    conflicting += 1
+                    continue
+                if owners:
+                    user_id = owners.pop()
+                    new.append(self.id_map.alias(mongo_id, user_id))
+                    merged += 1
+                    if user_id in self._rows:
+                        rows[user_id] = self._rows[user_id]
+                    continue
+                [user_id], assigned = self.id_map.assign([mongo_id])
+                new.extend(assigned)
+                rows[user_id] = self._rows[user_id] = (user_id, email, username, *row)
+                self._claims[("email", email)] = user_id
+                self._claims[("username", username)] = user_id
+        self.skip("duplicate email or username, merged into the existing user", merged)
+        self.skip("email and username belong to different users", conflicting)
+        return list(rows.values()), new
+
+
+class TaskTransform(Transform):
+    """
+    tasks documents into the tasks table. Owners are resolved through the
+    users id map. Mongo never enforced uq_task_title_user_id, so duplicate
+    (title, owner) pairs collapse to the most recently updated task.
+    """
+
+    target = Target(
+        table="tasks",
+        columns=("title", "description", "due_date", "priority", "status", "created_at", "updated_at", "user_id"),
+        key=("title", "user_id"),
+        update=("description", "due_date", "priority", "status", "created_at", "updated_at"),
+        update_where="tasks.updated_at < EXCLUDED.updated_at",
+        order=("user_id", "title"),
+    )
+
+    def __init__(self, user_ids: IdMap):
+        super().__init__()
+        self.user_ids = user_ids
+
+    def __call__(self, docs: List[Dict]) -> Tuple[List[tuple], List[Tuple[str, int]]]:
+        now = datetime.datetime.now()
+        owner_id = self.user_ids.get
+        owners = [owner_id(str(doc.get("user_id"))) for doc in docs]
+        titles = [doc.get("title") for doc in docs]
+        due_dates = [_date(doc.get("due_date")) for doc in docs]
+        priorities, unknown_priorities = coerce_enum([doc.get("priority", "Medium") for doc in docs], PRIORITIES, PriorityEnum.MEDIUM.name)
+        statuses, unknown_statuses = coerce_enum([doc.get("status", "Pending") for doc in docs], STATUSES, StatusEnum.PENDING.name)
+        self.skip("unknown priority, loaded as Medium", unknown_priorities)
+        self.skip("unknown status, loaded as Pending", unknown_statuses)
+        created = [_datetime(doc.get("created_at", doc.get("createdAt")), now) for doc in docs]
+        updated = [_datetime(doc.get("updated_at", doc.get("updatedAt")), now) for doc in docs]
+
+        # Newest task per (title, owner) in the batch; a single INSERT can't
+        # touch the same conflicting row twice
+        latest: Dict[Tuple[str, int], tuple] = {}
+        missing_owner = missing_fields = 0
+        for row in zip(titles, [doc.get("description") for doc in docs], due_dates, priorities, statuses, created, updated, owners):
+            if row[7] is None:
+                missing_owner += 1
+            elif not row[0] or row[2] is None:
+                missing_fields += 1
+            else:
+                key = (row[0], row[7])
+                if key not in latest or latest[key][6] < row[6]:
+                    latest[key] = row
+        self.skip("owner not migrated", missing_owner)
+        self.skip("missing title or due_date", missing_fields)
+        self.skip("duplicate title for owner", len(docs) - missing_owner - missing_fields - len(latest))
+        return list(latest.values()), []
+
+
+class DataMigrator:
+    def __init__(self, source: Source, sink: Sink, batch_size: int = 1000, workers: int = 4, queue_size: int = 4):
+        self.source = source
+        self.sink = sink
+        self.batch_size = batch_size
+        self.workers = workers
+        # Batches buffered between stages, per partition
+        self.queue_size = queue_size
+        self._id_maps: Dict[str, IdMap] = {}
+
+    def _id_map(self, conn: SinkConnection, collection: str, table: str) -> IdMap:
+        # Loaded once and shared, so tasks resolve owners migrated by this run or an earlier one
+        if collection not in self._id_maps:
+            self._id_maps[collection] = IdMap(conn.load_id_map(collection), conn.max_id(table))
+        return self._id_maps[collection]
+
+    def transform(self, conn: SinkConnection, collection: str) -> Transform:
+        if collection == "users":
+            return UserTransform(self._id_map(conn, "users", "users"), conn.load_users())
+        if collection == "tasks":
+            return TaskTransform(self._id_map(conn, "users", "users"))
+        return DocumentTransform(collection)
+
+    def _partitions(self, conn: SinkConnection, collection: str) -> List[Partition]:
+        saved = conn.load_partitions(collection)
+        if not saved:
+            # Boundaries are stored on the first run so a resumed run reuses them
+            bounds = [None] + self.source.split(collection, self.workers) + [None]
+            conn.save_partitions(collection, [
+                (self.source.encode_id(lo), self.source.encode_id(hi)) for lo, hi in zip(bounds, bounds[1:])
+            ])
+            saved = conn.load_partitions(collection)
+        decode = self.source.decode_id
+        return [
+            Partition(collection, index, decode(lo), decode(hi), decode(last_id), rows, done)
+            for index, lo, hi, last_id, rows, done in saved
+        ]
+
+    def migrate_collection(self, collection: str) -> Progress:
+        with self.sink.connect() as conn:
+            conn.ensure_schema()
+            transform = self.transform(conn, collection)
+            conn.ensure_target(transform.target)
+            partitions = self._partitions(conn, collection)
+        pending = [partition for partition in partitions if not partition.done]
+        progress = Progress(collection, self.source.count(collection), sum(partition.rows for partition in partitions))
+        logger.info(
+            "Migrating %s: %s documents in %s partitions, %s to go",
+            collection, progress.total, len(partitions), len(pending),
+        )
+
+        stop = threading.Event()
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._migrate_partition, partition, transform, progress, stop) for partition in pending]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except PipelineAborted:
+                    pass
+                except BaseException as e:
+                    # Wind the other partitions down; their checkpoints hold
+                    errors.append(e)
+                    stop.set()
+        if errors:
+            raise errors[0]
+        with self.sink.connect() as conn:
+            conn.finish_target(transform.target)
+        progress.log()
+        logger.info(
+            "Migrated %s: %s documents in %.1fs (%.0f docs/sec)",
+            collection, progress.loaded, time.monotonic() - progress.started, progress.rate,
+        )
+        for reason, count in sorted(transform.skipped.items()):
+            logger.warning("%s: %s documents %s", collection, count, reason)
+        return progress
+
+    def _migrate_partition(self, partition: Partition, transform: Transform, progress: Progress, stop: threading.Event) -> None:
+        read_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        write_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        errors: List[BaseException] = []
+
+        def stage(body):
+            def run():
+                try:
+                    body()
+                except PipelineAborted:
+                    pass
+                except BaseException as e:
+                    errors.append(e)
+                    stop.set()
+            return threading.Thread(target=run, daemon=True)
+
+        def read():
+            batches = self.source.read(partition.collection, partition.lo, partition.hi, partition.after, self.batch_size)
+            for batch in batches:
+                _put(read_queue, batch, stop)
+            _put(read_queue, _DONE, stop)
+
+        def convert():
+            while (docs := _get(read_queue, stop)) is not _DONE:
+                rows, ids = transform(docs)
+                _put(write_queue, Batch(rows, len(docs), self.source.encode_id(docs[-1]["_id"]), ids), stop)
+            _put(write_queue, _DONE, stop)
+
+        threads = [stage(read), stage(convert)]
+        for thread in threads:
+            thread.start()
+        try:
+            with self.sink.connect() as conn:
+                while (batch := _get(write_queue, stop)) is not _DONE:
+                    conn.write_batch(transform.target, batch, partition)
+                    progress.add(batch.count)
+                conn.finish_partition(partition)
+        except PipelineAborted:
+            pass
+        except BaseException:
+            stop.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+        if stop.is_set():
+            raise PipelineAborted()
+
+    def migrate(self, collections: Sequence[str]) -> Dict[str, Progress]:
+        return {collection: self.migrate_collection(collection) for collection in collections}
+
     def close(self):
-        if self.mongo_client:
-            self.mongo_client.close()
-        if self.pg_conn:
-            self.pg_conn.close()
\ No newline at end of file
+        self.source.close()
+
+
+def main():
+    workers = int(os.getenv("MIGRATION_WORKERS", "4"))
+    if os.getenv("MIGRATION_DUMP_DIR"):
+        source = JsonDumpSource(os.environ["MIGRATION_DUMP_DIR"])
+    else:
+        source = MongoSource(os.environ["MONGO_URI"], os.getenv("MONGO_DB", "task_management"), pool_size=workers * 2)
+    if os.getenv("MIGRATION_SQLITE_PATH"):
+        sink = SQLiteSink(os.environ["MIGRATION_SQLITE_PATH"])
+    else:
+        sink = PostgresSink({
+            "host": os.environ["PG_HOST"],
+            "dbname": os.environ["PG_DB"],
+            "user": os.environ["PG_USER"],
+            "password": os.environ["PG_PASSWORD"],
+            "port": os.getenv("PG_PORT", "5432"),
+        })
+    migrator = DataMigrator(
+        source,
+        sink,
+        batch_size=int(os.getenv("MIGRATION_BATCH_SIZE", "1000")),
+        workers=workers,
+        queue_size=int(os.getenv("MIGRATION_QUEUE_SIZE", "4")),
+    )
+    try:
+        migrator.migrate([name.strip() for name in os.getenv("MIGRATION_COLLECTIONS", "users,tasks").split(",") if name.strip()])
+    finally:
+        migrator.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,26 @@
+import asyncio
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlmodel import Session, SQLModel, create_engine
 from sqlmodel.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 import os
 from typing import Generator, Dict
 
 from app.main import app
-from app.database import get_session
+from app.database import RequestSession, get_async_session, get_session
 from app.models.user import User
 from app.core.security import get_password_hash
+from app.core.principal_cache import principal_cache
+from app.core.response_cache import response_cache
 from app.config import settings
 
 # Test database URL
 TEST_DATABASE_URL = "sqlite:///./test.db"
+TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
 @pytest.fixture(name="session")
 def session_fixture():
@@ -26,15 +34,51 @@ def session_fixture():
         yield session
     SQLModel.metadata.drop_all(engine)
 
+@pytest.fixture(name="async_engine")
+def async_engine_fixture(session: Session):
+    # Same database file as the sync fixture; NullPool because every
+    # TestClient request runs on its own event loop
+    return create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+
+@pytest.fixture(name="sql_statements")
+def sql_statements_fixture(async_engine):
+    """
+    Context manager collecting the SQL the app's async engine runs while it
+    is open: `with sql_statements() as statements: ...`
+    """
+    @contextmanager
+    def record_statements():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    return record_statements
+
 @pytest.fixture(name="client")
-def client_fixture(session: Session):
+def client_fixture(session: Session, async_engine):
     def get_session_override():
         return session
 
+    async def get_async_session_override():
+        async with RequestSession(async_engine, expire_on_commit=False) as async_session:
+            yield async_session
+
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_async_session] = get_async_session_override
+    principal_cache.clear()
+    # User ids restart with every test database
+    asyncio.run(response_cache.clear())
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
+    principal_cache.clear()
 
 @pytest.fixture(name="test_user")
 def test_user_fixture(session: Session) -> Dict[str, str]:
@@ -52,4 +96,16 @@ def test_user_fixture(session: Session) -> Dict[str, str]:
     session.add(db_user)
     session.commit()
     
-    return user_data
\ No newline at end of file
+    return user_data
+
+@pytest.fixture(name="auth_headers")
+def auth_headers_fixture(client: TestClient, test_user: Dict[str, str]) -> Dict[str, str]:
+    response = client.post(
+        "/token",
+        data={
+            "username": test_user["username"],
+            "password": test_user["password"]
+        }
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -1,8 +1,18 @@
+import asyncio
+import threading
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlmodel import Session, select
 import pytest
 from datetime import datetime
 
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.core.hashing import PasswordHashingPool, hashing_pool
+from app.core.principal_cache import principal_cache
+from app.core.security import pwd_context
+from app.models.user import User
+
 def test_register_user(client: TestClient):
     response = client.post(
         "/register",
@@ -53,4 +63,86 @@ def test_login_invalid_credentials(client: TestClient):
             "password": "wrongpass"
         }
     )
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+def test_warm_principal_cache_skips_user_lookup(client: TestClient, sql_statements, auth_headers):
+    principal_cache.clear()
+    assert client.get("/users/me", headers=auth_headers).status_code == 200
+    assert principal_cache.stats()["misses"] == 1
+
+    with sql_statements() as statements:
+        response = client.get("/users/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == "testuser"
+    assert statements == []
+    assert principal_cache.stats()["hits"] == 1
+
+def test_principal_cache_evicted_on_deactivation(client: TestClient, session: Session, auth_headers):
+    assert client.get("/users/me", headers=auth_headers).status_code == 200
+    assert principal_cache.get("testuser") is not None
+
+    user = session.exec(select(User).where(User.username == "testuser")).one()
+    user.is_active = False
+    session.add(user)
+    session.commit()
+
+    assert principal_cache.get("testuser") is None
+    response = client.get("/users/me", headers=auth_headers)
+    assert response.status_code == 400
+
+def test_login_rehashes_password_with_stale_cost(client: TestClient, session: Session):
+    stale_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    session.add(User(
+        email="legacy@example.com",
+        username="legacy_user",
+        hashed_password=stale_context.hash("legacypass123")
+    ))
+    session.commit()
+
+    response = client.post(
+        "/token",
+        data={"username": "legacy_user", "password": "legacypass123"}
+    )
+    assert response.status_code == 200
+
+    session.expire_all()
+    user = session.exec(select(User).where(User.username == "legacy_user")).one()
+    assert pwd_context.identify(user.hashed_password) == "bcrypt"
+    assert f"${settings.BCRYPT_ROUNDS:02d}$" in user.hashed_password
+    assert not pwd_context.needs_update(user.hashed_password)
+
+def test_login_rejected_when_hashing_pool_saturated(client: TestClient, test_user, monkeypatch):
+    monkeypatch.setattr(hashing_pool, "max_pending", 0)
+    response = client.post(
+        "/token",
+        data={
+            "username": test_user["username"],
+            "password": test_user["password"]
+        }
+    )
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+def test_hashing_pool_counts_jobs_until_they_finish():
+    pool = PasswordHashingPool(max_workers=1, max_pending=2)
+    release = threading.Event()
+
+    async def scenario():
+        job = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        job.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await job
+        # The cancelled caller is gone but its job is still running
+        assert pool.pending == 1
+        release.set()
+        for _ in range(100):
+            if pool.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.pending == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
@@ -0,0 +1,119 @@
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+
+def task_payload(title: str) -> dict:
+    return {
+        "title": title,
+        "due_date": (date.today() + timedelta(days=3)).isoformat(),
+        "priority": "High",
+    }
+
+def test_bulk_create_reports_each_item(client: TestClient, auth_headers: dict):
+    client.post("/tasks/", json=task_payload("Existing"), headers=auth_headers)
+
+    response = client.post(
+        "/tasks/bulk",
+        json={"items": [task_payload("One"), task_payload("Existing"), task_payload("Two"), task_payload("One")]},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["created", "conflict", "created", "conflict"]
+    assert data["succeeded"] == 2
+    assert data["failed"] == 2
+    assert data["results"][0]["task"]["title"] == "One"
+    assert data["results"][0]["task"]["priority"] == "High"
+
+    titles = {task["title"] for task in client.get("/tasks/", headers=auth_headers).json()}
+    assert titles == {"Existing", "One", "Two"}
+
+def test_bulk_create_uses_multi_row_insert(client: TestClient, auth_headers: dict, sql_statements):
+    items = [task_payload(f"Imported {i}") for i in range(1500)]
+    with sql_statements() as statements:
+        response = client.post("/tasks/bulk", json={"items": items}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["succeeded"] == 1500
+    inserts = [statement for statement in statements if statement.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 2
+
+def test_bulk_update(client: TestClient, auth_headers: dict):
+    created = client.post(
+        "/tasks/bulk",
+        json={"items": [task_payload("A"), task_payload("B"), task_payload("C")]},
+        headers=auth_headers
+    ).json()["results"]
+    a, b, c = (r["id"] for r in created)
+
+    response = client.patch(
+        "/tasks/bulk",
+        json={"items": [
+            {"id": a, "status": "Completed"},
+            {"id": b, "title": "C"},
+            {"id": c, "title": "C2"},
+            {"id": 999999, "status": "Completed"},
+        ]},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["updated", "updated", "updated", "not_found"]
+    assert results[0]["task"]["status"] == "Completed"
+    assert results[0]["task"]["title"] == "A"
+    assert results[1]["task"]["title"] == "C"
+
+    response = client.patch(
+        "/tasks/bulk",
+        json={"items": [{"id": a, "title": "C"}]},
+        headers=auth_headers
+    )
+    assert response.json()["results"][0]["status"] == "conflict"
+
+def test_bulk_delete(client: TestClient, auth_headers: dict):
+    created = client.post(
+        "/tasks/bulk",
+        json={"items": [task_payload("X"), task_payload("Y")]},
+        headers=auth_headers
+    ).json()["results"]
+    x, y = (r["id"] for r in created)
+
+    response = client.request("DELETE", "/tasks/bulk", json={"ids": [x, 424242]}, headers=auth_headers)
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["deleted", "not_found"]
+
+    remaining = [task["id"] for task in client.get("/tasks/", headers=auth_headers).json()]
+    assert remaining == [y]
+
+def test_bulk_update_rejects_title_swap(client: TestClient, auth_headers: dict):
+    created = client.post(
+        "/tasks/bulk",
+        json={"items": [task_payload("Left"), task_payload("Right")]},
+        headers=auth_headers
+    ).json()["results"]
+    left, right = (r["id"] for r in created)
+
+    response = client.patch(
+        "/tasks/bulk",
+        json={"items": [{"id": left, "title": "Right"}, {"id": right, "title": "Left"}]},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["conflict", "conflict"]
+
+def test_bulk_update_rejects_renames_onto_titles_not_given_up(client: TestClient, auth_headers: dict):
+    created = client.post(
+        "/tasks/bulk",
+        json={"items": [task_payload("a"), task_payload("b"), task_payload("c")]},
+        headers=auth_headers
+    ).json()["results"]
+    a, b, c = (r["id"] for r in created)
+
+    # c can't take "b", so it keeps "c" and a can't take that either
+    response = client.patch(
+        "/tasks/bulk",
+        json={"items": [{"id": c, "title": "b"}, {"id": a, "title": "c"}, {"id": b, "status": "Completed"}]},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["conflict", "conflict", "updated"]
+    titles = sorted(task["title"] for task in client.get("/tasks/", headers=auth_headers).json())
+    assert titles == ["a", "b", "c"]
@@ -1,9 +1,13 @@
 import asyncio
+import threading
 import pytest
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
 from fastapi.testclient import TestClient
 from datetime import date, timedelta
 
+from app.main import app
+
 @pytest.mark.asyncio
 async def test_concurrent_task_creation(auth_headers: dict):
     async with AsyncClient(base_url="http://test") as ac:
@@ -20,4 +24,48 @@ async def test_concurrent_task_creation(auth_headers: dict):
             tasks.append(task)
         
         responses = await asyncio.gather(*tasks)
-        assert all(r.status_code == 201 for r in responses)
\ No newline at end of file
+        assert all(r.status_code == 201 for r in responses)
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_run_on_event_loop(client: TestClient, auth_headers: dict, async_engine):
+    # Handlers are async end to end: their queries go through the async
+    # engine on the loop's thread, and the loop keeps running other work
+    # while they are in flight instead of blocking on them
+    loop_thread = threading.get_ident()
+    ticks = 0
+    started = {}
+    threads = set()
+    overlapped = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        threads.add(threading.get_ident())
+        started[id(context)] = ticks
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        if ticks > started.pop(id(context)):
+            overlapped.append(statement)
+
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal ticks
+        while not done.is_set():
+            ticks += 1
+            await asyncio.sleep(0)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", after)
+    try:
+        ticking = asyncio.create_task(ticker())
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            responses = await asyncio.gather(
+                *[ac.get("/tasks/", headers=auth_headers) for _ in range(50)]
+            )
+        done.set()
+        await ticking
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before)
+        event.remove(async_engine.sync_engine, "after_cursor_execute", after)
+    assert all(r.status_code == 200 for r in responses)
+    assert threads == {loop_thread}
+    assert overlapped
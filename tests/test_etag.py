@@ -0,0 +1,68 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+
+@pytest.fixture
+def task_id(client: TestClient, auth_headers: dict) -> int:
+    response = client.post(
+        "/tasks/",
+        json={
+            "title": "Cached Task",
+            "due_date": (date.today() + timedelta(days=1)).isoformat()
+        },
+        headers=auth_headers
+    )
+    return response.json()["id"]
+
+def test_task_conditional_get(client: TestClient, auth_headers: dict, task_id: int):
+    response = client.get(f"/tasks/{task_id}", headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get(f"/tasks/{task_id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    client.put(f"/tasks/{task_id}", json={"description": "changed"}, headers=auth_headers)
+    response = client.get(f"/tasks/{task_id}", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_task_list_conditional_get(client: TestClient, auth_headers: dict, task_id: int):
+    response = client.get("/tasks/", headers=auth_headers)
+    etag = response.headers["ETag"]
+
+    response = client.get("/tasks/", headers={**auth_headers, "If-None-Match": f'W/{etag}, "other"'})
+    assert response.status_code == 304
+
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+    response = client.get("/tasks/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == []
+
+def test_update_with_if_match(client: TestClient, auth_headers: dict, task_id: int):
+    etag = client.get(f"/tasks/{task_id}", headers=auth_headers).headers["ETag"]
+
+    response = client.put(
+        f"/tasks/{task_id}",
+        json={"description": "first writer"},
+        headers={**auth_headers, "If-Match": etag}
+    )
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).headers["ETag"] == new_etag
+
+    # A second writer holding the old version loses
+    response = client.put(
+        f"/tasks/{task_id}",
+        json={"description": "second writer"},
+        headers={**auth_headers, "If-Match": etag}
+    )
+    assert response.status_code == 412
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["description"] == "first writer"
+
+def test_update_if_match_unknown_task(client: TestClient, auth_headers: dict):
+    response = client.put("/tasks/999999", json={"description": "x"}, headers={**auth_headers, "If-Match": '"1-0"'})
+    assert response.status_code == 404
@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+
+from app.api import tasks as tasks_api
+
+def create_tasks(client: TestClient, auth_headers: dict, count: int):
+    items = [
+        {
+            "title": f"Export {i}",
+            "description": f"Row {i}, with a comma",
+            "due_date": (date.today() + timedelta(days=1 + i % 30)).isoformat(),
+            "priority": "High" if i % 2 else "Low",
+            "status": "Completed" if i % 3 == 0 else "Pending",
+        }
+        for i in range(count)
+    ]
+    response = client.post("/tasks/bulk", json={"items": items}, headers=auth_headers)
+    assert response.json()["succeeded"] == count
+
+def test_export_ndjson(client: TestClient, auth_headers: dict, monkeypatch):
+    # Small batches so the export spans several cursor fetches
+    monkeypatch.setattr(tasks_api, "EXPORT_BATCH_SIZE", 7)
+    create_tasks(client, auth_headers, 50)
+
+    response = client.get("/tasks/export", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="tasks.ndjson"' in response.headers["content-disposition"]
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 50
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+    # Rows match what the detail endpoint returns
+    first = client.get(f"/tasks/{rows[0]['id']}", headers=auth_headers).json()
+    assert rows[0] == first
+
+def test_export_csv_with_filters(client: TestClient, auth_headers: dict):
+    create_tasks(client, auth_headers, 30)
+
+    response = client.get(
+        "/tasks/export",
+        params={"format": "csv", "status": "Completed", "priority": "High"},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+
+    reader = csv.DictReader(io.StringIO(response.text))
+    rows = list(reader)
+    assert reader.fieldnames[:3] == ["id", "user_id", "title"]
+    expected = [i for i in range(30) if i % 3 == 0 and i % 2]
+    assert [row["title"] for row in rows] == [f"Export {i}" for i in expected]
+    assert all(row["description"].endswith(", with a comma") for row in rows)
+    assert {(row["status"], row["priority"]) for row in rows} == {("Completed", "High")}
+
+def test_export_is_scoped_to_user(client: TestClient, auth_headers: dict):
+    create_tasks(client, auth_headers, 5)
+    client.post("/register", json={"email": "other@example.com", "username": "otheruser", "password": "otherpassword"})
+    token = client.post("/token", data={"username": "otheruser", "password": "otherpassword"}).json()["access_token"]
+
+    response = client.get("/tasks/export", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.text == ""
+
+def test_export_rejects_unknown_format(client: TestClient, auth_headers: dict):
+    response = client.get("/tasks/export", params={"format": "xml"}, headers=auth_headers)
+    assert response.status_code == 422
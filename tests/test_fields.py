@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+
+def create_tasks(client: TestClient, auth_headers: dict, count: int):
+    for i in range(count):
+        client.post(
+            "/tasks/",
+            json={
+                "title": f"Projected {i}",
+                "description": "A long description " * 20,
+                "due_date": (date.today() + timedelta(days=count - i)).isoformat(),
+            },
+            headers=auth_headers
+        )
+
+def test_list_fields_narrow_select_and_response(client: TestClient, auth_headers: dict, sql_statements):
+    create_tasks(client, auth_headers, 3)
+    with sql_statements() as statements:
+        response = client.get("/tasks/", params={"fields": "id,title,status,due_date"}, headers=auth_headers)
+    selects = [statement for statement in statements if "FROM tasks" in statement]
+    assert response.status_code == 200
+    tasks = response.json()
+    assert len(tasks) == 3
+    assert all(set(task) == {"id", "title", "status", "due_date"} for task in tasks)
+    assert len(selects) == 1
+    assert "description" not in selects[0].split("FROM")[0]
+
+def test_list_fields_keep_cursor_and_etag(client: TestClient, auth_headers: dict):
+    create_tasks(client, auth_headers, 4)
+
+    # due_date is not requested but still drives the cursor
+    params = {"fields": "title", "sort_by": "due_date", "limit": 2}
+    first = client.get("/tasks/", params=params, headers=auth_headers)
+    assert first.json() == [{"title": "Projected 3"}, {"title": "Projected 2"}]
+    second = client.get("/tasks/", params={**params, "cursor": first.headers["X-Next-Cursor"]}, headers=auth_headers)
+    assert second.json() == [{"title": "Projected 1"}, {"title": "Projected 0"}]
+
+    full = client.get("/tasks/", params={"sort_by": "due_date", "limit": 2}, headers=auth_headers)
+    assert full.headers["ETag"] != first.headers["ETag"]
+    response = client.get("/tasks/", params=params, headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+
+def test_detail_fields(client: TestClient, auth_headers: dict):
+    create_tasks(client, auth_headers, 1)
+    task_id = client.get("/tasks/", headers=auth_headers).json()[0]["id"]
+
+    response = client.get(f"/tasks/{task_id}", params={"fields": "title,priority"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json() == {"title": "Projected 0", "priority": "Medium"}
+    etag = response.headers["ETag"]
+    assert etag.startswith("W/")
+
+    response = client.get(f"/tasks/{task_id}", params={"fields": "title,priority"}, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Weak tags are not accepted for If-Match
+    response = client.put(f"/tasks/{task_id}", json={"status": "Completed"}, headers={**auth_headers, "If-Match": etag})
+    assert response.status_code == 412
+
+def test_unknown_fields_rejected(client: TestClient, auth_headers: dict):
+    response = client.get("/tasks/", params={"fields": "id,secret"}, headers=auth_headers)
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+    response = client.get("/tasks/1", params={"fields": ","}, headers=auth_headers)
+    assert response.status_code == 400
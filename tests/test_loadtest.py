@@ -0,0 +1,45 @@
+import argparse
+import pytest
+
+from benchmarks.loadtest import VirtualUser, compare_results, parse_mix, percentile, split_users, summarize
+
+def results(p95: float, rps: float, errors: int = 0) -> dict:
+    stats = {"requests": 1000, "errors": errors, "rps": rps, "mean_ms": 5.0, "p50_ms": 4.0, "p95_ms": p95, "p99_ms": p95 * 2}
+    return {"total": stats, "operations": {"list": dict(stats)}}
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 99) == 0.0
+    assert percentile([7.0], 50) == 7.0
+
+def test_summarize():
+    stats = summarize([0.001 * i for i in range(1, 101)], errors=2, elapsed=10)
+    assert stats["requests"] == 100
+    assert stats["rps"] == 10.0
+    assert stats["p95_ms"] == 95.0
+    assert stats["errors"] == 2
+
+def test_parse_mix():
+    assert parse_mix("list=3,create") == {"list": 3.0, "create": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("list=1,explode=2")
+
+def test_compare_results_flags_regressions():
+    baseline = results(p95=10.0, rps=500)
+    assert compare_results(baseline, results(p95=10.5, rps=480), threshold=0.1) == []
+
+    regressions = compare_results(baseline, results(p95=12.0, rps=400, errors=50), threshold=0.1)
+    assert "list: p95_ms 10.0 -> 12.0" in regressions
+    assert "total: rps 500 -> 400" in regressions
+    assert any("error rate" in regression for regression in regressions)
+
+def test_split_users_partitions_task_ids():
+    users = [VirtualUser("a", {}, list(range(10))), VirtualUser("b", {}, list(range(100, 104)))]
+    workers = split_users(users, concurrency=5)
+    assert [w.username for w in workers] == ["a", "b", "a", "b", "a"]
+    a_ids = [task_id for w in workers if w.username == "a" for task_id in w.task_ids]
+    assert sorted(a_ids) == list(range(10))
+    assert workers[1].task_ids + workers[3].task_ids == [100, 102, 101, 103]
@@ -0,0 +1,72 @@
+import json
+import logging
+import queue
+import sys
+
+from prometheus_client import REGISTRY
+
+from app.core.logging import DroppingQueueHandler, JsonFormatter, SamplingFilter, parse_sample_rates, setup_logging
+
+def make_record(name: str = "app.api.tasks", level: int = logging.INFO, msg: str = "Task %s updated", args=(1,), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_queue_handler_drops_when_full():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    dropped_before = REGISTRY.get_sample_value("log_records_dropped_total") or 0
+    for _ in range(5):
+        handler.handle(make_record())
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    assert REGISTRY.get_sample_value("log_records_dropped_total") == dropped_before + 3
+
+def test_queue_handler_snapshots_the_message_at_the_call():
+    handler = DroppingQueueHandler(queue.Queue())
+    changes = {"status": "Pending"}
+    handler.handle(make_record(msg="Changes %s", args=(changes,)))
+    changes["status"] = "Completed"
+    record = handler.queue.get_nowait()
+    assert record.getMessage() == "Changes {'status': 'Pending'}"
+    assert record.args is None
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        handler.handle(logging.LogRecord("app", logging.ERROR, __file__, 1, "failed", (), sys.exc_info()))
+    record = handler.queue.get_nowait()
+    # No traceback objects cross to the listener thread
+    assert record.exc_info is None
+    assert "ValueError: boom" in json.loads(JsonFormatter().format(record))["exc_info"]
+
+def test_sampling_filter():
+    sampler = SamplingFilter(parse_sample_rates("app.api=1,app.api.tasks=0"))
+    assert not sampler.filter(make_record("app.api.tasks"))
+    assert not sampler.filter(make_record("app.api.tasks.child", level=logging.DEBUG))
+    assert sampler.filter(make_record("app.api.tasks", level=logging.WARNING))
+    assert sampler.filter(make_record("app.api.auth"))
+    assert sampler.filter(make_record("app.api_other"))
+    assert sampler.filter(make_record("uvicorn"))
+
+def test_json_formatter():
+    record = make_record(request_id="abc123")
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.api.tasks"
+    assert entry["message"] == "Task 1 updated"
+    assert entry["request_id"] == "abc123"
+    assert entry["timestamp"].endswith("+00:00")
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("app", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+    entry = json.loads(JsonFormatter().format(record))
+    assert "ValueError: boom" in entry["exc_info"]
+
+def test_setup_logging_is_idempotent():
+    root = setup_logging()
+    handlers = list(root.handlers)
+    assert setup_logging() is root
+    assert root.handlers == handlers
+    assert sum(isinstance(handler, DroppingQueueHandler) for handler in root.handlers) == 1
@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def test_route_metrics(client: TestClient, auth_headers: dict):
+    task_id = client.post(
+        "/tasks/",
+        json={"title": "Measured", "due_date": (date.today() + timedelta(days=1)).isoformat()},
+        headers=auth_headers
+    ).json()["id"]
+    # Warm the principal cache so the request below only runs its own query
+    client.get("/users/me", headers=auth_headers)
+
+    route = {"method": "GET", "route": "/tasks/{task_id}"}
+    requests_before = sample("http_requests_total", status="200", **route)
+    latency_before = sample("http_request_duration_seconds_count", **route)
+    queries_before = sample("db_queries_per_request_sum", **route)
+    db_time_before = sample("db_time_per_request_seconds_sum", **route)
+
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).status_code == 200
+
+    assert sample("http_requests_total", status="200", **route) == requests_before + 1
+    assert sample("http_request_duration_seconds_count", **route) == latency_before + 1
+    assert sample("db_queries_per_request_sum", **route) == queries_before + 1
+    assert sample("db_time_per_request_seconds_sum", **route) > db_time_before
+
+def test_unmatched_routes_share_a_label(client: TestClient):
+    before = sample("http_requests_total", method="GET", route="unmatched", status="404")
+    client.get("/no/such/path/1")
+    client.get("/no/such/path/2")
+    assert sample("http_requests_total", method="GET", route="unmatched", status="404") == before + 2
+
+def test_metrics_endpoint(client: TestClient, test_user: dict):
+    hashes_before = sample("auth_password_hash_seconds_count", operation="verify")
+    client.post("/token", data={"username": test_user["username"], "password": test_user["password"]})
+    assert sample("auth_password_hash_seconds_count", operation="verify") == hashes_before + 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'db_pool_size{engine="primary"} 5.0' in body
+    assert 'db_pool_checked_out{engine="primary"}' in body
+    assert "db_pool_checkout_wait_seconds" in body
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="POST",route="/token"}' in body
@@ -0,0 +1,184 @@
+import json
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy import func
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.models.enums import PriorityEnum, StatusEnum
+from app.models.task import Task
+from app.models.task_event import TaskEvent
+from app.models.user import User
+from migration.migrate import (
+    DataMigrator, JsonDumpSource, PostgresSink, SQLiteConnection, SQLiteSink, coerce_enum, copy_buffer, PRIORITIES,
+)
+
+# Scratch Postgres database for the COPY sink; its tables are dropped and recreated
+POSTGRES_URL = os.getenv("MIGRATION_POSTGRES_URL")
+
+def write_dump(directory, count: int):
+    with open(directory / "notes.json", "w") as f:
+        for i in range(count):
+            f.write(json.dumps({
+                "_id": {"$oid": f"{i * 7919 % 1000003:024x}"},
+                "title": f"Task {i}",
+                "createdAt": {"$date": "2024-03-13T10:00:00Z"},
+                "updatedAt": {"$date": 1710324000000},
+            }) + "\n")
+
+def loaded_ids(path):
+    with sqlite3.connect(path) as conn:
+        return [row[0] for row in conn.execute("SELECT id FROM notes")]
+
+def test_partitions_load_every_document_once(tmp_path):
+    write_dump(tmp_path, 1050)
+    migrator = DataMigrator(JsonDumpSource(str(tmp_path)), SQLiteSink(str(tmp_path / "out.db")), batch_size=100, workers=4)
+    progress = migrator.migrate_collection("notes")
+
+    ids = loaded_ids(tmp_path / "out.db")
+    assert len(ids) == len(set(ids)) == 1050
+    assert progress.loaded == progress.total == 1050 and progress.eta() == 0
+    with sqlite3.connect(tmp_path / "out.db") as conn:
+        row = conn.execute("SELECT data, created_at FROM notes WHERE id = ?", (f"{7919:024x}",)).fetchone()
+        assert json.loads(row[0])["title"] == "Task 1" and row[1] == "2024-03-13 10:00:00.000000"
+        assert conn.execute("SELECT COUNT(*), SUM(loaded), MIN(done) FROM migration_checkpoints").fetchone() == (4, 1050, 1)
+
+def test_crashed_runs_resume_from_checkpoints(tmp_path, monkeypatch):
+    write_dump(tmp_path, 1000)
+    writes = []
+    write_batch = SQLiteConnection.write_batch
+
+    def crash_on_fifth_write(self, *args):
+        writes.append(None)
+        if len(writes) == 5:
+            raise RuntimeError("connection lost")
+        write_batch(self, *args)
+
+    monkeypatch.setattr(SQLiteConnection, "write_batch", crash_on_fifth_write)
+    migrator = DataMigrator(JsonDumpSource(str(tmp_path)), SQLiteSink(str(tmp_path / "out.db")), batch_size=50, workers=2)
+    with pytest.raises(RuntimeError):
+        migrator.migrate_collection("notes")
+    partial = len(loaded_ids(tmp_path / "out.db"))
+    assert 0 < partial < 1000
+
+    monkeypatch.setattr(SQLiteConnection, "write_batch", write_batch)
+    progress = migrator.migrate_collection("notes")
+    # Only what the first run didn't commit is read again
+    assert progress.loaded == 1000 - partial
+    assert sorted(loaded_ids(tmp_path / "out.db")) == sorted(set(loaded_ids(tmp_path / "out.db")))
+    assert len(loaded_ids(tmp_path / "out.db")) == 1000
+
+def test_copy_buffer_escapes_text_format():
+    buffer = copy_buffer([("a\tb", None, "line\nbreak\\", True)])
+    assert buffer.getvalue() == "a\\tb\t\\N\tline\\nbreak\\\\\tt\n"
+
+def test_users_and_tasks_load_into_the_app_schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(email="existing@example.com", username="existing", hashed_password="x"))
+        session.commit()
+    users = [
+        {"_id": {"$oid": "a" * 24}, "email": "ann@example.com", "username": "ann", "hashed_password": "h1"},
+        {"_id": {"$oid": "b" * 24}, "email": "bob@example.com", "username": "bob", "hashed_password": "h2", "is_active": False},
+        {"_id": {"$oid": "c" * 24}, "username": "no-email", "hashed_password": "h3"},
+    ]
+    tasks = [
+        {"_id": {"$oid": "1" * 24}, "title": "Plan", "user_id": "a" * 24, "due_date": {"$date": "2025-01-02T00:00:00Z"},
+         "priority": "high", "status": "COMPLETED", "updated_at": {"$date": "2024-01-01T00:00:00Z"}},
+        {"_id": {"$oid": "2" * 24}, "title": "Plan", "user_id": "a" * 24, "due_date": {"$date": "2025-02-03T00:00:00Z"},
+         "priority": "Low", "status": "in_progress", "updated_at": {"$date": "2024-06-01T00:00:00Z"}},
+        {"_id": {"$oid": "3" * 24}, "title": "Plan", "user_id": "b" * 24, "due_date": "2025-03-04"},
+        {"_id": {"$oid": "4" * 24}, "title": "Orphan", "user_id": "c" * 24, "due_date": "2025-03-04"},
+    ]
+    for name, docs in (("users", users), ("tasks", tasks)):
+        (tmp_path / f"{name}.json").write_text("\n".join(json.dumps(doc) for doc in docs))
+
+    sink = SQLiteSink(str(tmp_path / "app.db"))
+    DataMigrator(JsonDumpSource(str(tmp_path)), sink, batch_size=2, workers=2).migrate_collection("users")
+    # A later run resolves owners through the persisted id map
+    migrator = DataMigrator(JsonDumpSource(str(tmp_path)), sink, batch_size=2, workers=2)
+    migrator.migrate_collection("tasks")
+
+    with Session(engine) as session:
+        ids = {user.username: user.id for user in session.exec(select(User))}
+        assert ids == {"existing": 1, "ann": 2, "bob": 3}
+        loaded = {(task.title, task.user_id): task for task in session.exec(select(Task))}
+    assert set(loaded) == {("Plan", 2), ("Plan", 3)}
+    # The most recently updated duplicate wins; unknown statuses fall back to Pending
+    newest = loaded[("Plan", 2)]
+    assert (newest.priority, newest.status, str(newest.due_date)) == (PriorityEnum.LOW, StatusEnum.PENDING, "2025-02-03")
+    assert loaded[("Plan", 3)].priority == PriorityEnum.MEDIUM
+
+def test_duplicate_users_merge_into_one_account(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(email="carol@example.com", username="carol", hashed_password="x"))
+        session.commit()
+    users = [
+        {"_id": {"$oid": "a" * 24}, "email": "ann@example.com", "username": "ann", "hashed_password": "h1"},
+        # Same email under another _id, in a later batch
+        {"_id": {"$oid": "b" * 24}, "email": "ann@example.com", "username": "ann2", "hashed_password": "h2"},
+        # Username already held by a row that predates the migration
+        {"_id": {"$oid": "c" * 24}, "email": "carol@mongo.example.com", "username": "carol", "hashed_password": "h3"},
+        # Email and username held by two different users
+        {"_id": {"$oid": "d" * 24}, "email": "ann@example.com", "username": "carol", "hashed_password": "h4"},
+    ]
+    tasks = [
+        {"_id": {"$oid": f"{i}" * 24}, "title": f"Task {i}", "user_id": owner * 24, "due_date": "2025-03-04"}
+        for i, owner in enumerate("abcd", start=1)
+    ]
+    for name, docs in (("users", users), ("tasks", tasks)):
+        (tmp_path / f"{name}.json").write_text("\n".join(json.dumps(doc) for doc in docs))
+
+    migrator = DataMigrator(JsonDumpSource(str(tmp_path)), SQLiteSink(str(tmp_path / "app.db")), batch_size=1, workers=1)
+    progress = migrator.migrate_collection("users")
+    migrator.migrate_collection("tasks")
+
+    assert progress.loaded == 4
+    with Session(engine) as session:
+        ids = {user.username: user.id for user in session.exec(select(User))}
+        assert ids == {"carol": 1, "ann": 2}
+        owners = {task.title: task.user_id for task in session.exec(select(Task))}
+    assert owners == {"Task 1": 2, "Task 2": 2, "Task 3": 1}
+
+def test_enum_coercion_accepts_names_values_and_case():
+    names, unknown = coerce_enum(["High", "HIGH", "high", " low ", "urgent", None], PRIORITIES, "MEDIUM")
+    assert names == ["HIGH", "HIGH", "HIGH", "LOW", "MEDIUM", "MEDIUM"] and unknown == 2
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="MIGRATION_POSTGRES_URL not set")
+def test_parallel_task_partitions_load_into_postgres(tmp_path):
+    engine = create_engine(POSTGRES_URL)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS migration_checkpoints, migration_id_map")
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    users = [
+        {"_id": {"$oid": f"{u:024x}"}, "email": f"user{u}@example.com", "username": f"user{u}", "hashed_password": "x"}
+        for u in range(1, 21)
+    ]
+    # Every batch of each partition mixes all the owners
+    tasks = [
+        {"_id": {"$oid": f"{i + 1000:024x}"}, "title": f"Task {i}", "user_id": f"{i % 20 + 1:024x}", "due_date": "2025-03-04"}
+        for i in range(2000)
+    ]
+    for name, docs in (("users", users), ("tasks", tasks)):
+        (tmp_path / f"{name}.json").write_text("\n".join(json.dumps(doc) for doc in docs))
+
+    try:
+        migrator = DataMigrator(JsonDumpSource(str(tmp_path)), PostgresSink({"dsn": POSTGRES_URL}), batch_size=100, workers=2)
+        migrator.migrate_collection("users")
+        progress = migrator.migrate_collection("tasks")
+
+        assert progress.loaded == 2000
+        with Session(engine) as session:
+            assert session.exec(select(func.count()).select_from(Task)).one() == 2000
+            # The load bypasses the change-log trigger
+            assert session.exec(select(func.count()).select_from(TaskEvent)).one() == 0
+    finally:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE IF EXISTS migration_checkpoints, migration_id_map")
+        SQLModel.metadata.drop_all(engine)
+        engine.dispose()
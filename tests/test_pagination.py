@@ -0,0 +1,56 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+
+@pytest.fixture
+def many_tasks(client: TestClient, auth_headers: dict):
+    for i in range(25):
+        client.post(
+            "/tasks/",
+            json={
+                "title": f"Paged Task {i:02d}",
+                "due_date": (date.today() + timedelta(days=25 - i)).isoformat()
+            },
+            headers=auth_headers
+        )
+
+def collect_pages(client: TestClient, auth_headers: dict, **params):
+    seen = []
+    cursor = None
+    while True:
+        page_params = dict(params, limit=10)
+        if cursor:
+            page_params["cursor"] = cursor
+        response = client.get("/tasks/", params=page_params, headers=auth_headers)
+        assert response.status_code == 200
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen
+
+def test_cursor_pagination_walks_every_task_once(client: TestClient, auth_headers: dict, many_tasks):
+    tasks = collect_pages(client, auth_headers)
+    ids = [task["id"] for task in tasks]
+    assert len(ids) == 25
+    assert ids == sorted(ids)
+
+def test_cursor_pagination_by_due_date(client: TestClient, auth_headers: dict, many_tasks):
+    tasks = collect_pages(client, auth_headers, sort_by="due_date")
+    assert len({task["id"] for task in tasks}) == 25
+    due_dates = [task["due_date"] for task in tasks]
+    assert due_dates == sorted(due_dates)
+
+def test_skip_limit_still_supported(client: TestClient, auth_headers: dict, many_tasks):
+    response = client.get("/tasks/", params={"skip": 20, "limit": 10}, headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert "X-Next-Cursor" not in response.headers
+
+def test_invalid_cursor(client: TestClient, auth_headers: dict, many_tasks):
+    response = client.get("/tasks/", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == 400
+
+    first_page = client.get("/tasks/", params={"limit": 10}, headers=auth_headers)
+    cursor = first_page.headers["X-Next-Cursor"]
+    response = client.get("/tasks/", params={"cursor": cursor, "sort_by": "created_at"}, headers=auth_headers)
+    assert response.status_code == 400
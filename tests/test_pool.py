@@ -0,0 +1,101 @@
+import asyncio
+import time
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.core.metrics import TimedAsyncAdaptedQueuePool
+from app.core.pool import async_engine_options, install_idle_pre_ping, sync_engine_options, warm_up_pool
+from app.utils.sql import check_dialect_supported
+
+def test_engine_options_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 1)
+    options = async_engine_options("postgresql+asyncpg://db/tasks")
+    assert options["poolclass"] is TimedAsyncAdaptedQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (3, 1)
+    assert "connect_args" not in options
+
+    # libpq keepalives only go to psycopg2
+    assert sync_engine_options("postgresql://db/tasks")["connect_args"]["keepalives"] == 1
+    assert "connect_args" not in sync_engine_options("sqlite:///./tasks.db")
+
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    monkeypatch.setattr(settings, "DB_NULL_POOL", True)
+    options = async_engine_options("postgresql+asyncpg://pgbouncer/tasks")
+    assert options["poolclass"] is NullPool and "pool_size" not in options
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+
+def test_idle_pre_ping(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db", pool_size=1, max_overflow=0)
+    install_idle_pre_ping(engine, 0.05)
+    pings = []
+    monkeypatch.setattr(engine.dialect, "do_ping", lambda dbapi_connection: pings.append(dbapi_connection))
+
+    with engine.connect() as conn:
+        first = conn.connection.dbapi_connection
+    with engine.connect():
+        pass
+    assert pings == []
+
+    time.sleep(0.06)
+    with engine.connect() as conn:
+        assert conn.connection.dbapi_connection is first
+    assert pings == [first]
+
+    # A connection that fails its ping is replaced
+    def failing_ping(dbapi_connection):
+        raise OSError("connection reset")
+
+    time.sleep(0.06)
+    monkeypatch.setattr(engine.dialect, "do_ping", failing_ping)
+    with engine.connect() as conn:
+        assert conn.connection.dbapi_connection is not first
+    engine.dispose()
+
+def test_warm_up_opens_pool_size_connections(tmp_path):
+    async def scenario():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path}/pool.db", poolclass=TimedAsyncAdaptedQueuePool, pool_size=3
+        )
+        await warm_up_pool(engine)
+        assert engine.sync_engine.pool.checkedin() == 3
+        await engine.dispose()
+
+        # Nothing to warm without a pool
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/pool.db", poolclass=NullPool)
+        await warm_up_pool(engine)
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+def test_in_memory_sqlite_shares_one_database():
+    for url in ("sqlite://", "sqlite:///:memory:"):
+        engine = create_engine(url, **sync_engine_options(url))
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        with engine.connect() as first, engine.connect() as second:
+            assert first.exec_driver_sql("SELECT count(*) FROM t").scalar() == 0
+            assert second.exec_driver_sql("SELECT count(*) FROM t").scalar() == 0
+        engine.dispose()
+
+    async def scenario():
+        url = "sqlite+aiosqlite:///:memory:"
+        engine = create_async_engine(url, **async_engine_options(url))
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        async with engine.connect() as first, engine.connect() as second:
+            assert (await first.exec_driver_sql("SELECT count(*) FROM t")).scalar() == 0
+            assert (await second.exec_driver_sql("SELECT count(*) FROM t")).scalar() == 0
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+def test_unsupported_dialect_is_rejected_up_front():
+    check_dialect_supported(create_engine("sqlite://"))
+    with pytest.raises(ValueError, match="mysql"):
+        check_dialect_supported(SimpleNamespace(dialect=SimpleNamespace(name="mysql")))
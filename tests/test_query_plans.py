@@ -0,0 +1,178 @@
+"""
+Query-plan regression suite for the GET /tasks/ filters.
+
+Every filter/sort/pagination combination that get_tasks can produce is run
+through EXPLAIN against a seeded tasks table and must not fall back to a full
+scan of tasks.
+
+The SQLite run always happens, against 10k rows by default. Set
+QUERY_PLAN_ROWS (e.g. 1000000) for production-sized plans; Postgres in
+particular prefers seq scans on small tables. Set QUERY_PLAN_POSTGRES_URL to a
+scratch Postgres database to run the same checks there; its tables are dropped
+and recreated.
+"""
+import itertools
+import json
+import os
+import re
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlmodel import SQLModel
+
+from app.api.tasks import build_task_query, paginate_task_query
+from app.models.enums import PriorityEnum, StatusEnum, TaskSortEnum
+from app.models.task import Task
+from app.utils.search import relevance_order
+
+SEED_ROWS = int(os.getenv("QUERY_PLAN_ROWS", "10000"))
+SEED_USERS = max(SEED_ROWS // 1000, 1)
+TASKS_PER_USER = SEED_ROWS // SEED_USERS
+POSTGRES_URL = os.getenv("QUERY_PLAN_POSTGRES_URL")
+
+# Cursor positions matching each sort key
+AFTER = {
+    TaskSortEnum.ID: (500, 500),
+    TaskSortEnum.DUE_DATE: (date(2025, 3, 1), 500),
+    TaskSortEnum.CREATED_AT: (datetime(2025, 1, 1, 0, 5), 500),
+}
+
+SEARCH = "seeded 12"
+
+FILTERS = [
+    [None, "Task 12"],                         # title
+    [None, "Seeded"],                          # description
+    [None, date(2025, 2, 1)],                  # due_date
+    [None, StatusEnum.PENDING],                # status
+    [None, PriorityEnum.HIGH],                 # priority
+]
+
+COMBINATIONS = list(itertools.product(
+    [None, SEARCH],                            # q
+    *FILTERS,
+    [TaskSortEnum.ID, TaskSortEnum.DUE_DATE, TaskSortEnum.CREATED_AT],
+    [False, True],                             # keyset cursor
+)) + list(itertools.product(
+    # Relevance ordering needs q and only pages with offsets
+    [SEARCH], *FILTERS, [TaskSortEnum.RELEVANCE], [False],
+))
+
+def combination_id(combination) -> str:
+    q, title, description, due_date, status, priority, sort_by, keyset = combination
+    filters = [
+        name for name, value in
+        [("q", q), ("title", title), ("description", description), ("due_date", due_date), ("status", status), ("priority", priority)]
+        if value is not None
+    ]
+    return f"{'+'.join(filters) or 'unfiltered'}-{sort_by.value}-{'cursor' if keyset else 'offset'}"
+
+def task_list_query(combination, user_id: int, dialect: str):
+    q, title, description, due_date, status, priority, sort_by, keyset = combination
+    query = build_task_query(user_id, title, description, due_date, status, priority, q, dialect)
+    if sort_by == TaskSortEnum.RELEVANCE:
+        return query.order_by(relevance_order(q, dialect), Task.id).offset(100).limit(50)
+    return paginate_task_query(query, sort_by, skip=100, after=AFTER[sort_by] if keyset else None)
+
+SQLITE_SEED = f"""
+WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < {SEED_ROWS - 1})
+INSERT INTO tasks (title, description, due_date, priority, status, created_at, updated_at, user_id)
+SELECT
+    'Task ' || n,
+    'Seeded task ' || n,
+    date('2025-01-01', '+' || (n % 365) || ' days'),
+    CASE n % 3 WHEN 0 THEN 'LOW' WHEN 1 THEN 'MEDIUM' ELSE 'HIGH' END,
+    CASE n % 4 WHEN 0 THEN 'COMPLETED' ELSE 'PENDING' END,
+    datetime('2025-01-01', '+' || n || ' seconds'),
+    datetime('2025-01-01', '+' || n || ' seconds'),
+    n / {TASKS_PER_USER} + 1
+FROM seq
+"""
+
+POSTGRES_SEED = f"""
+INSERT INTO tasks (title, description, due_date, priority, status, created_at, updated_at, user_id)
+SELECT
+    'Task ' || n,
+    'Seeded task ' || n,
+    DATE '2025-01-01' + (n % 365),
+    (ARRAY['LOW', 'MEDIUM', 'HIGH'])[n % 3 + 1]::priorityenum,
+    (CASE WHEN n % 4 = 0 THEN 'COMPLETED' ELSE 'PENDING' END)::statusenum,
+    TIMESTAMP '2025-01-01' + n * INTERVAL '1 second',
+    TIMESTAMP '2025-01-01' + n * INTERVAL '1 second',
+    n / {TASKS_PER_USER} + 1
+FROM generate_series(0, {SEED_ROWS - 1}) AS n
+"""
+
+def seed_users(conn, insert_sql: str):
+    conn.exec_driver_sql(insert_sql.format(users=SEED_USERS))
+
+@pytest.fixture(scope="module")
+def sqlite_plan_engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # The FTS5 triggers are irrelevant to plans and would dominate seeding time
+        for trigger in ("tasks_fts_ai", "tasks_fts_ad", "tasks_fts_au"):
+            conn.exec_driver_sql(f"DROP TRIGGER {trigger}")
+        seed_users(conn, """
+            WITH RECURSIVE seq(u) AS (SELECT 1 UNION ALL SELECT u + 1 FROM seq WHERE u < {users})
+            INSERT INTO users (email, username, hashed_password, is_active, created_at)
+            SELECT 'user' || u || '@example.com', 'user' || u, 'x', 1, datetime('2025-01-01') FROM seq
+        """)
+        conn.exec_driver_sql(SQLITE_SEED)
+        conn.exec_driver_sql("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+        conn.exec_driver_sql("ANALYZE")
+    yield engine
+    engine.dispose()
+
+@pytest.fixture(scope="module")
+def postgres_plan_engine():
+    if not POSTGRES_URL:
+        pytest.skip("QUERY_PLAN_POSTGRES_URL not set")
+    engine = create_engine(POSTGRES_URL)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        seed_users(conn, """
+            INSERT INTO users (email, username, hashed_password, is_active, created_at)
+            SELECT 'user' || u || '@example.com', 'user' || u, 'x', true, TIMESTAMP '2025-01-01'
+            FROM generate_series(1, {users}) AS u
+        """)
+        conn.exec_driver_sql(POSTGRES_SEED)
+        conn.exec_driver_sql("ANALYZE users")
+        conn.exec_driver_sql("ANALYZE tasks")
+    yield engine
+    SQLModel.metadata.drop_all(engine)
+    engine.dispose()
+
+def test_seeded_row_count(sqlite_plan_engine):
+    with sqlite_plan_engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM tasks").scalar() == SEED_USERS * TASKS_PER_USER
+
+@pytest.mark.parametrize("combination", COMBINATIONS, ids=combination_id)
+def test_sqlite_task_filters_avoid_full_scans(sqlite_plan_engine, combination):
+    query = task_list_query(combination, user_id=SEED_USERS // 2, dialect="sqlite")
+    sql = str(query.compile(dialect=sqlite_plan_engine.dialect, compile_kwargs={"literal_binds": True}))
+    with sqlite_plan_engine.connect() as conn:
+        plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    full_scans = [step for step in plan if re.match(r"SCAN tasks\b", step)]
+    assert not full_scans, f"Full scan in plan: {plan}"
+
+def _seq_scans(node):
+    if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") == "tasks":
+        yield node
+    for child in node.get("Plans", []):
+        yield from _seq_scans(child)
+
+@pytest.mark.parametrize("combination", COMBINATIONS, ids=combination_id)
+def test_postgres_task_filters_avoid_seq_scans(postgres_plan_engine, combination):
+    query = task_list_query(combination, user_id=SEED_USERS // 2, dialect="postgresql")
+    # Named paramstyle keeps literal '%' unescaped in the rendered SQL
+    sql = str(query.compile(dialect=postgresql.dialect(paramstyle="named"), compile_kwargs={"literal_binds": True}))
+    with postgres_plan_engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    seq_scans = list(_seq_scans(plan[0]["Plan"]))
+    assert not seq_scans, f"Seq Scan on tasks in plan: {json.dumps(plan, indent=2)}"
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import shutil
+import sqlite3
+from datetime import date, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import select
+
+from app import database, main
+from app.core.principal_cache import principal_cache
+from app.core.replicas import Replica, ReplicaSet
+from app.database import RequestSession
+from app.models.task import Task
+from app.models.user import User
+
+REPLICA_PATH = "./test_replica.db"
+
+@pytest.fixture(name="replicas")
+def replicas_fixture(client: TestClient, test_user: dict, monkeypatch):
+    # A snapshot of the primary stands in for a streaming replica; lag is
+    # whatever the test sets, None meaning unreachable
+    shutil.copyfile("./test.db", REPLICA_PATH)
+    lags = {"replica0": 0.0}
+
+    async def measure(engine):
+        if lags["replica0"] is None:
+            raise ConnectionError("replica down")
+        return lags["replica0"]
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{REPLICA_PATH}", poolclass=NullPool)
+    replicas = ReplicaSet([Replica("replica0", engine)], max_lag=5, check_interval=60, measure=measure)
+    monkeypatch.setattr(database, "replica_set", replicas)
+    monkeypatch.setattr(main, "replica_set", replicas)
+    asyncio.run(replicas.refresh())
+    yield replicas, lags
+    os.remove(REPLICA_PATH)
+
+def test_reads_use_replica_within_lag(client: TestClient, auth_headers: dict, replicas):
+    replica_set, lags = replicas
+    with sqlite3.connect(REPLICA_PATH) as conn:
+        conn.execute("UPDATE users SET email = 'replica@example.com'")
+    principal_cache.clear()
+    assert client.get("/users/me", headers=auth_headers).json()["email"] == "replica@example.com"
+
+    # Writes go to the primary, which the snapshot never sees
+    task_id = client.post(
+        "/tasks/",
+        json={"title": "Primary only", "due_date": (date.today() + timedelta(days=1)).isoformat()},
+        headers=auth_headers
+    ).json()["id"]
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).status_code == 404
+    assert client.get("/tasks/", headers=auth_headers).json() == []
+
+    # Lagging, unreachable or unmeasured replicas are skipped
+    lags["replica0"] = 30.0
+    asyncio.run(replica_set.refresh())
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).status_code == 200
+
+    lags["replica0"] = None
+    asyncio.run(replica_set.refresh())
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).status_code == 200
+    assert client.get("/health").json()["database"]["replicas"] == [
+        {"name": "replica0", "lag_seconds": None, "usable": False}
+    ]
+
+    lags["replica0"] = 0.0
+    asyncio.run(replica_set.refresh())
+    assert replica_set.choose() is not None
+    replica_set.replicas[0].checked_at -= 3600
+    assert replica_set.choose() is None
+
+def test_session_reads_its_own_writes_from_primary(async_engine, replicas):
+    async def scenario():
+        async with RequestSession(async_engine, expire_on_commit=False) as session:
+            session.info["read_replica"] = True
+            user_id = (await session.exec(select(User.id))).first()
+            session.add(Task(title="Just written", due_date=date.today() + timedelta(days=1), user_id=user_id))
+            await session.commit()
+            written = (await session.exec(select(Task).where(Task.title == "Just written"))).first()
+            assert written is not None
+
+    asyncio.run(scenario())
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import date, timedelta
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import auth, tasks
+from app.config import settings
+from app.database import RequestSession, get_async_session
+from app.models.task import Task
+
+@pytest.fixture(name="sessions")
+def sessions_fixture(client: TestClient, async_engine):
+    # Keep a handle on each request's session to inspect it mid-request
+    sessions = []
+
+    async def get_async_session_override():
+        async with RequestSession(async_engine, expire_on_commit=False) as async_session:
+            sessions.append(async_session)
+            yield async_session
+
+    app.dependency_overrides[get_async_session] = get_async_session_override
+    return sessions
+
+def test_login_releases_connection_before_hashing(client: TestClient, test_user: dict, sessions: list, monkeypatch):
+    held_during_verify = []
+    verify = auth.verify_password_async
+
+    async def checking_verify(password, hashed_password):
+        held_during_verify.append(sessions[-1].in_transaction())
+        return await verify(password, hashed_password)
+
+    monkeypatch.setattr(auth, "verify_password_async", checking_verify)
+    response = client.post("/token", data={"username": test_user["username"], "password": test_user["password"]})
+    assert response.status_code == 200
+    assert held_during_verify == [False]
+
+def test_reads_release_connection_before_encoding(client: TestClient, auth_headers: dict, sessions: list, monkeypatch):
+    task_id = client.post(
+        "/tasks/",
+        json={"title": "Released", "due_date": (date.today() + timedelta(days=1)).isoformat()},
+        headers=auth_headers
+    ).json()["id"]
+    held_during_encode = []
+    encode_row, encode_rows = tasks.encode_row, tasks.encode_rows
+
+    def checking(encode):
+        def wrapper(*args):
+            held_during_encode.append(sessions[-1].in_transaction())
+            return encode(*args)
+        return wrapper
+
+    monkeypatch.setattr(tasks, "encode_row", checking(encode_row))
+    monkeypatch.setattr(tasks, "encode_rows", checking(encode_rows))
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["title"] == "Released"
+    assert client.get("/tasks/", headers=auth_headers).status_code == 200
+    assert held_during_encode == [False, False]
+
+def test_server_timing_reports_query_count(client: TestClient, auth_headers: dict, monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING", True)
+    # Warm the principal cache so only the handler's own query runs
+    client.get("/users/me", headers=auth_headers)
+
+    response = client.get("/tasks/", headers=auth_headers)
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert response.headers["Server-Timing"].endswith('desc="1 queries"')
+
+    # Requests rejected before reaching the database never touch the pool
+    response = client.get("/tasks/", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+    assert response.headers["Server-Timing"].endswith('desc="0 queries"')
+
+    monkeypatch.setattr(settings, "SERVER_TIMING", False)
+    assert "Server-Timing" not in client.get("/tasks/", headers=auth_headers).headers
+
+def test_release_refuses_pending_changes(async_engine):
+    async def scenario():
+        async with RequestSession(async_engine, expire_on_commit=False) as session:
+            session.add(Task(title="Pending", user_id=1))
+            with pytest.raises(RuntimeError):
+                await session.release()
+
+    asyncio.run(scenario())
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.response_cache import MemoryResponseCacheBackend, RedisResponseCacheBackend, ResponseCache, response_cache
+
+def cache_hits(endpoint: str) -> float:
+    return REGISTRY.get_sample_value("response_cache_requests_total", {"endpoint": endpoint, "result": "hit"}) or 0.0
+
+class FakeRedis:
+    """The few redis.asyncio calls the backend makes, over dicts."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.values = {}
+
+    async def hmget(self, key, *fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, px=None):
+        self.values[key] = value
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def hincrby(self, key, field, amount):
+        self.commands.append((key, field, lambda value: int(value or 0) + amount))
+
+    def hset(self, key, field, value):
+        self.commands.append((key, field, lambda _: value))
+
+    async def execute(self):
+        for key, field, apply in self.commands:
+            fields = self.redis.hashes.setdefault(key, {})
+            fields[field] = str(apply(fields.get(field))).encode()
+
+def test_cached_responses_follow_writes(client: TestClient, auth_headers: dict, monkeypatch):
+    monkeypatch.setattr(response_cache, "backend", MemoryResponseCacheBackend(max_bytes=1 << 20, ttl_seconds=60))
+    due_date = (date.today() + timedelta(days=1)).isoformat()
+    task_id = client.post("/tasks/", json={"title": "Cached", "due_date": due_date}, headers=auth_headers).json()["id"]
+
+    hits = cache_hits("list")
+    first = client.get("/tasks/?status=Pending", headers=auth_headers)
+    second = client.get("/tasks/?status=Pending", headers=auth_headers)
+    assert second.content == first.content and second.headers["ETag"] == first.headers["ETag"]
+    assert cache_hits("list") == hits + 1
+    cached = client.get("/tasks/?status=Pending", headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+
+    # Every write invalidates the user's cached responses
+    client.put(f"/tasks/{task_id}", json={"title": "Renamed"}, headers=auth_headers)
+    assert [t["title"] for t in client.get("/tasks/?status=Pending", headers=auth_headers).json()] == ["Renamed"]
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["title"] == "Renamed"
+    hits = cache_hits("detail")
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["title"] == "Renamed"
+    assert cache_hits("detail") == hits + 1
+
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+    assert client.get("/tasks/?status=Pending", headers=auth_headers).json() == []
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).status_code == 404
+
+def test_memory_backend_is_bounded_by_bytes():
+    backend = MemoryResponseCacheBackend(max_bytes=100, ttl_seconds=60)
+
+    async def scenario():
+        for i in range(5):
+            await backend.set(f"key-{i}", b"x" * 30)
+        assert len(backend) == 3 and backend.size_bytes == 90
+        assert await backend.get("key-0") is None
+        # Reading an entry protects it from the next eviction
+        assert await backend.get("key-2") is not None
+        await backend.set("key-5", b"x" * 30)
+        assert await backend.get("key-2") is not None
+        assert await backend.get("key-3") is None
+
+    asyncio.run(scenario())
+
+def test_replica_reads_right_after_a_write_are_not_cached():
+    cache = ResponseCache(MemoryResponseCacheBackend(max_bytes=1000, ttl_seconds=60), max_entry_bytes=100, replica_max_lag=5)
+
+    async def scenario():
+        await cache.invalidate_user(1)
+        slot, cached = await cache.lookup(1, "list", "params")
+        assert cached is None
+        await cache.store(slot, {"ETag": '"a"'}, b"[]", from_replica=True)
+        assert (await cache.lookup(1, "list", "params"))[1] is None
+
+        await cache.store(slot, {"ETag": '"a"'}, b"[]")
+        assert (await cache.lookup(1, "list", "params"))[1] == ({"ETag": '"a"'}, b"[]")
+        # Another user's write leaves this user's entries alone
+        await cache.invalidate_user(2)
+        assert (await cache.lookup(1, "list", "params"))[1] is not None
+        await cache.invalidate_user(1)
+        assert (await cache.lookup(1, "list", "params"))[1] is None
+
+    asyncio.run(scenario())
+
+def test_memory_generations_expire_without_reviving_stale_entries(monkeypatch):
+    backend = MemoryResponseCacheBackend(max_bytes=1000, ttl_seconds=60)
+    now = time.time()
+
+    async def scenario():
+        monkeypatch.setattr(time, "time", lambda: now)
+        await backend.bump(1)
+        await backend.bump(1)
+        stale = (await backend.generation(1))[0]
+        monkeypatch.setattr(time, "time", lambda: now + 120)
+        await backend.bump(2)
+        # User 1's record is gone, but the generation it falls back to is
+        # still past every generation it was given before
+        assert list(backend._generations) == [2]
+        assert (await backend.generation(1))[0] >= stale
+        await backend.bump(1)
+        assert (await backend.generation(1))[0] > stale
+
+    asyncio.run(scenario())
+
+def test_redis_generations_are_shared_between_workers():
+    shared = FakeRedis()
+    workers = [
+        ResponseCache(RedisResponseCacheBackend("redis://unused", ttl_seconds=60, client=shared), max_entry_bytes=100, replica_max_lag=5)
+        for _ in range(2)
+    ]
+
+    async def scenario():
+        slot, _ = await workers[0].lookup(1, "list", "params")
+        await workers[0].store(slot, {"ETag": '"a"'}, b"[]")
+        assert (await workers[1].lookup(1, "list", "params"))[1] == ({"ETag": '"a"'}, b"[]")
+        # A write handled by the other worker invalidates this one's entries too
+        await workers[1].invalidate_user(1)
+        assert (await workers[0].lookup(1, "list", "params"))[1] is None
+
+    asyncio.run(scenario())
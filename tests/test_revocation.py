@@ -0,0 +1,115 @@
+import asyncio
+import time
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.revocation import BloomFilter, DatabaseRevocationStore, InMemoryRevocationStore
+
+def test_logout_revokes_token(client: TestClient, auth_headers: dict, test_user: dict):
+    assert client.get("/users/me", headers=auth_headers).status_code == 200
+
+    response = client.post("/logout", headers=auth_headers)
+    assert response.status_code == 200
+
+    assert client.get("/users/me", headers=auth_headers).status_code == 401
+    assert client.post("/logout", headers=auth_headers).status_code == 401
+
+    # Other tokens for the same user are unaffected
+    token = client.post(
+        "/token",
+        data={"username": test_user["username"], "password": test_user["password"]}
+    ).json()["access_token"]
+    assert client.get("/users/me", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+def test_in_memory_store_expires_entries():
+    store = InMemoryRevocationStore()
+
+    async def scenario():
+        now = time.time()
+        await store.revoke("live", now + 60)
+        await store.revoke("short", now + 0.05)
+        await store.revoke("expired", now - 1)
+        assert await store.is_revoked("live")
+        assert await store.is_revoked("short")
+        assert not await store.is_revoked("expired")
+        assert not await store.is_revoked("unknown")
+
+        await asyncio.sleep(0.1)
+        assert not await store.is_revoked("short")
+        # Expired entries are dropped on the next write
+        await store.revoke("another", now + 60)
+        assert len(store) == 2
+
+    asyncio.run(scenario())
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    members = [f"member-{i}" for i in range(10_000)]
+    for member in members:
+        bloom.add(member)
+
+    assert all(member in bloom for member in members)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+def test_database_store_is_shared_between_replicas(client: TestClient, async_engine, sql_statements):
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def scenario():
+        replica_a = DatabaseRevocationStore(session_factory, sync_interval=3600)
+        replica_b = DatabaseRevocationStore(session_factory, sync_interval=3600)
+        expires_at = time.time() + 60
+
+        await replica_a.revoke("revoked-jti", expires_at)
+        await replica_a.revoke("revoked-jti", expires_at)
+        assert await replica_a.is_revoked("revoked-jti")
+        # Starting B loads the filter from the table
+        await replica_b.start()
+        assert await replica_b.is_revoked("revoked-jti")
+
+        # Unrevoked tokens are answered by the filter alone
+        with sql_statements() as statements:
+            for i in range(100):
+                assert not await replica_b.is_revoked(f"live-{i}")
+        assert statements == []
+
+        # Revocations made elsewhere show up on the next sync
+        await replica_a.revoke("later-jti", expires_at)
+        assert not await replica_b.is_revoked("later-jti")
+        await replica_b.sync()
+        assert await replica_b.is_revoked("later-jti")
+        await replica_b.stop()
+
+    asyncio.run(scenario())
+
+def test_database_store_prunes_expired_rows(client: TestClient, async_engine):
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def scenario():
+        store = DatabaseRevocationStore(session_factory)
+        await store.revoke("stale-jti", time.time() - 60)
+        await store.revoke("live-jti", time.time() + 60)
+        await store.sync(rebuild=True)
+        assert not await store.is_revoked("stale-jti")
+        assert await store.is_revoked("live-jti")
+
+    asyncio.run(scenario())
+
+def test_database_store_syncs_in_the_background(client: TestClient, async_engine):
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def scenario():
+        replica_a = DatabaseRevocationStore(session_factory)
+        replica_b = DatabaseRevocationStore(session_factory, sync_interval=0.05, rebuild_interval=0.1)
+        await replica_b.start()
+        await replica_a.revoke("elsewhere-jti", time.time() + 60)
+        # Revoked while B rebuilds: kept across the swap to the new filter
+        await replica_b.revoke("local-jti", time.time() + 60)
+        await asyncio.sleep(0.3)
+        assert await replica_b.is_revoked("elsewhere-jti")
+        assert await replica_b.is_revoked("local-jti")
+        await replica_b.stop()
+        assert replica_b._task is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+
+@pytest.fixture
+def searchable_tasks(client: TestClient, auth_headers: dict):
+    tasks = [
+        ("Write quarterly report", "Finance numbers for the board"),
+        ("Book flights", "Conference travel, report expenses afterwards"),
+        ("Refactor REPORTING module", None),
+        ("Water plants", "Balcony and kitchen"),
+        ("100% coverage", "Reach full test coverage"),
+    ]
+    for title, description in tasks:
+        client.post(
+            "/tasks/",
+            json={
+                "title": title,
+                "description": description,
+                "due_date": (date.today() + timedelta(days=2)).isoformat()
+            },
+            headers=auth_headers
+        )
+
+def titles(response) -> set:
+    assert response.status_code == 200
+    return {task["title"] for task in response.json()}
+
+def test_title_filter_is_case_insensitive(client: TestClient, auth_headers: dict, searchable_tasks):
+    response = client.get("/tasks/", params={"title": "report"}, headers=auth_headers)
+    assert titles(response) == {"Write quarterly report", "Refactor REPORTING module"}
+
+def test_filter_escapes_like_wildcards(client: TestClient, auth_headers: dict, searchable_tasks):
+    response = client.get("/tasks/", params={"title": "0%"}, headers=auth_headers)
+    assert titles(response) == {"100% coverage"}
+    response = client.get("/tasks/", params={"title": "_"}, headers=auth_headers)
+    assert titles(response) == set()
+
+def test_q_searches_title_and_description(client: TestClient, auth_headers: dict, searchable_tasks):
+    response = client.get("/tasks/", params={"q": "report"}, headers=auth_headers)
+    assert titles(response) == {"Write quarterly report", "Book flights", "Refactor REPORTING module"}
+
+    response = client.get("/tasks/", params={"q": "kitchen"}, headers=auth_headers)
+    assert titles(response) == {"Water plants"}
+
+def test_q_matches_all_words(client: TestClient, auth_headers: dict, searchable_tasks):
+    response = client.get("/tasks/", params={"q": "board finance"}, headers=auth_headers)
+    assert titles(response) == {"Write quarterly report"}
+
+def test_relevance_sort(client: TestClient, auth_headers: dict, searchable_tasks):
+    response = client.get("/tasks/", params={"q": "report", "sort_by": "relevance"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+    response = client.get("/tasks/", params={"sort_by": "relevance"}, headers=auth_headers)
+    assert response.status_code == 400
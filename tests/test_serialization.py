@@ -0,0 +1,49 @@
+import datetime
+import json
+from datetime import date, timedelta
+from typing import List
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from app.models.enums import PriorityEnum, StatusEnum
+from app.schemas.task import TaskResponse
+from app.utils.serialization import TASK_RESPONSE_COLUMNS, encode_rows
+
+def test_encode_rows_matches_pydantic():
+    keys = [column.key for column in TASK_RESPONSE_COLUMNS]
+    # TaskResponse rejects past due dates
+    due = date.today() + timedelta(days=1)
+    rows = [
+        ("Plain", None, due, PriorityEnum.HIGH, StatusEnum.PENDING, 1, 7,
+         datetime.datetime(2025, 1, 1, 9, 30), datetime.datetime(2025, 1, 1, 9, 30, 0, 123456)),
+        ("Ünïcode \"quoted\" ✓", "line\nbreak", due + timedelta(days=30), PriorityEnum.LOW, StatusEnum.COMPLETED, 2, 7,
+         datetime.datetime(2025, 6, 1, 0, 0, 0, 5), datetime.datetime(2025, 6, 2, 23, 59, 59)),
+    ]
+    adapter = TypeAdapter(List[TaskResponse])
+    models = adapter.validate_python([dict(zip(keys, row)) for row in rows])
+    # Starlette's JSONResponse encoding of the validated models
+    expected = json.dumps(
+        adapter.dump_python(models, mode="json"), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+    assert encode_rows(keys, rows) == expected
+
+def test_task_list_matches_detail_responses(client: TestClient, auth_headers: dict):
+    for i, description in enumerate([None, "Ünïcode ✓", "Plain"]):
+        client.post(
+            "/tasks/",
+            json={
+                "title": f"Serialized {i}",
+                "description": description,
+                "due_date": (date.today() + timedelta(days=i + 1)).isoformat(),
+                "priority": "High",
+            },
+            headers=auth_headers
+        )
+
+    response = client.get("/tasks/", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    tasks = response.json()
+    assert len(tasks) == 3
+    for task in tasks:
+        assert task == client.get(f"/tasks/{task['id']}", headers=auth_headers).json()
@@ -0,0 +1,51 @@
+import datetime
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models.enums import PriorityEnum, StatusEnum
+from app.models.task import Task
+from app.models.user import User
+
+def add_task(session: Session, user_id: int, title: str, due: date, priority: PriorityEnum, status: StatusEnum):
+    now = datetime.datetime.now()
+    session.add(Task(
+        title=title, due_date=due, priority=priority, status=status,
+        created_at=now, updated_at=now, user_id=user_id,
+    ))
+
+def test_task_stats(client: TestClient, auth_headers: dict, session: Session, sql_statements):
+    user_id = session.exec(select(User.id).where(User.username == "testuser")).one()
+    today = date.today()
+    week_end = today + timedelta(days=6 - today.weekday())
+    # Past due dates can't be created through the API
+    add_task(session, user_id, "Overdue", today - timedelta(days=3), PriorityEnum.HIGH, StatusEnum.PENDING)
+    add_task(session, user_id, "Done late", today - timedelta(days=3), PriorityEnum.HIGH, StatusEnum.COMPLETED)
+    add_task(session, user_id, "Due today", today, PriorityEnum.LOW, StatusEnum.PENDING)
+    add_task(session, user_id, "Due Sunday", week_end, PriorityEnum.LOW, StatusEnum.PENDING)
+    add_task(session, user_id, "Next week", week_end + timedelta(days=1), PriorityEnum.MEDIUM, StatusEnum.PENDING)
+    add_task(session, user_id, "Done this week", today, PriorityEnum.MEDIUM, StatusEnum.COMPLETED)
+    session.commit()
+
+    with sql_statements() as statements:
+        response = client.get("/tasks/stats", headers=auth_headers)
+    assert response.status_code == 200
+    assert len([statement for statement in statements if "FROM tasks" in statement]) == 1
+    assert response.json() == {
+        "as_of": today.isoformat(),
+        "total": 6,
+        "by_status": {"Pending": 4, "Completed": 2},
+        "by_priority": {"Low": 2, "Medium": 2, "High": 2},
+        "by_status_priority": {
+            "Pending": {"Low": 2, "Medium": 1, "High": 1},
+            "Completed": {"Low": 0, "Medium": 1, "High": 1},
+        },
+        "overdue": 1,
+        "due_this_week": 2,
+    }
+
+def test_task_stats_empty(client: TestClient, auth_headers: dict):
+    stats = client.get("/tasks/stats", headers=auth_headers).json()
+    assert stats["total"] == 0
+    assert stats["by_status"] == {"Pending": 0, "Completed": 0}
+    assert stats["overdue"] == 0
@@ -0,0 +1,91 @@
+import asyncio
+import datetime
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+from sqlmodel import Session, update
+
+from app.core.events import prune_task_events
+from app.database import RequestSession
+from app.models.task_event import TaskEvent
+from app.utils.pagination import encode_sync_token
+
+DUE_DATE = (date.today() + timedelta(days=1)).isoformat()
+
+def create(client: TestClient, auth_headers: dict, title: str) -> int:
+    return client.post("/tasks/", json={"title": title, "due_date": DUE_DATE}, headers=auth_headers).json()["id"]
+
+def test_snapshot_then_deltas(client: TestClient, auth_headers: dict):
+    kept, changed, removed = (create(client, auth_headers, title) for title in ("Kept", "Changed", "Removed"))
+    snapshot = client.get("/tasks/changes", headers=auth_headers).json()
+    assert [t["id"] for t in snapshot["changes"]] == [kept, changed, removed]
+    assert snapshot["deleted"] == [] and not snapshot["has_more"]
+
+    client.put(f"/tasks/{changed}", json={"title": "Changed once"}, headers=auth_headers)
+    client.put(f"/tasks/{changed}", json={"title": "Changed twice"}, headers=auth_headers)
+    added = create(client, auth_headers, "Added")
+    client.delete(f"/tasks/{removed}", headers=auth_headers)
+
+    delta = client.get(f"/tasks/changes?since={snapshot['sync_token']}", headers=auth_headers).json()
+    # Each task once, as it is now
+    assert [(t["id"], t["title"]) for t in delta["changes"]] == [(changed, "Changed twice"), (added, "Added")]
+    assert delta["deleted"] == [removed]
+
+    caught_up = client.get(f"/tasks/changes?since={delta['sync_token']}", headers=auth_headers).json()
+    assert caught_up["changes"] == [] and caught_up["deleted"] == []
+    assert caught_up["sync_token"] == delta["sync_token"]
+
+def test_deltas_page_by_limit(client: TestClient, auth_headers: dict):
+    token = client.get("/tasks/changes", headers=auth_headers).json()["sync_token"]
+    ids = [create(client, auth_headers, f"Paged {i}") for i in range(5)]
+    seen = []
+    while True:
+        page = client.get(f"/tasks/changes?since={token}&limit=2", headers=auth_headers).json()
+        seen += [t["id"] for t in page["changes"]]
+        token = page["sync_token"]
+        if not page["has_more"]:
+            break
+    assert seen == ids
+
+def test_pruned_tokens_are_gone(client: TestClient, auth_headers: dict, session: Session, async_engine):
+    create(client, auth_headers, "Old")
+    stale = client.get("/tasks/changes", headers=auth_headers).json()["sync_token"]
+    create(client, auth_headers, "Newer")
+    session.exec(update(TaskEvent).values(created_at=datetime.datetime.now() - timedelta(days=60)))
+    session.commit()
+
+    deleted = asyncio.run(prune_task_events(lambda: RequestSession(async_engine), timedelta(days=30)))
+    assert deleted == 2
+    assert client.get(f"/tasks/changes?since={stale}", headers=auth_headers).status_code == 410
+    assert client.get("/tasks/events", headers={**auth_headers, "Last-Event-ID": "1"}).status_code == 410
+
+    # A fresh snapshot starts past the pruned events, and later ids never reuse them
+    fresh = client.get("/tasks/changes", headers=auth_headers).json()
+    assert [t["title"] for t in fresh["changes"]] == ["Old", "Newer"]
+    added = create(client, auth_headers, "After prune")
+    delta = client.get(f"/tasks/changes?since={fresh['sync_token']}", headers=auth_headers).json()
+    assert [t["id"] for t in delta["changes"]] == [added]
+
+def test_other_users_pruned_events_leave_synced_clients_alone(client: TestClient, auth_headers: dict, session: Session, async_engine):
+    create(client, auth_headers, "Mine")
+    synced = client.get("/tasks/changes", headers=auth_headers).json()["sync_token"]
+
+    client.post("/register", json={"email": "other@example.com", "username": "other", "password": "otherpass123"})
+    token = client.post("/token", data={"username": "other", "password": "otherpass123"}).json()["access_token"]
+    other_headers = {"Authorization": f"Bearer {token}"}
+    other_stale = client.get("/tasks/changes", headers=other_headers).json()["sync_token"]
+    for i in range(3):
+        create(client, other_headers, f"Theirs {i}")
+    session.exec(update(TaskEvent).values(created_at=datetime.datetime.now() - timedelta(days=60)))
+    session.commit()
+    assert asyncio.run(prune_task_events(lambda: RequestSession(async_engine), timedelta(days=30))) == 4
+
+    # Nothing this user hadn't seen was pruned, so their position still holds
+    delta = client.get(f"/tasks/changes?since={synced}", headers=auth_headers)
+    assert delta.status_code == 200 and delta.json()["changes"] == []
+    assert client.get(f"/tasks/changes?since={other_stale}", headers=other_headers).status_code == 410
+    assert client.get("/tasks/events", headers={**other_headers, "Last-Event-ID": "1"}).status_code == 410
+
+def test_malformed_tokens_are_rejected(client: TestClient, auth_headers: dict):
+    for token in ("not-a-token", encode_sync_token(-1)):
+        response = client.get(f"/tasks/changes?since={token}", headers=auth_headers)
+        assert response.status_code == 400
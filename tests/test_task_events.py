@@ -0,0 +1,90 @@
+import asyncio
+from datetime import date, timedelta
+import orjson
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core import events
+from app.core.events import InMemoryEventBroker, stream_task_events
+from app.database import RequestSession
+from app.models.enums import TaskEventTypeEnum
+from app.models.task import Task
+from app.models.task_event import TaskEvent
+
+DUE_DATE = (date.today() + timedelta(days=1)).isoformat()
+
+def parse(chunk: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().split("\n"))
+    fields["data"] = orjson.loads(fields["data"])
+    return fields
+
+def test_every_write_path_is_logged(client: TestClient, auth_headers: dict, session: Session):
+    task_id = client.post("/tasks/", json={"title": "Logged", "due_date": DUE_DATE}, headers=auth_headers).json()["id"]
+    client.put(f"/tasks/{task_id}", json={"status": "Completed"}, headers=auth_headers)
+    client.post("/tasks/bulk", json={"items": [{"title": f"Bulk {i}", "due_date": DUE_DATE} for i in range(3)]}, headers=auth_headers)
+    client.delete(f"/tasks/{task_id}", headers=auth_headers)
+
+    logged = session.exec(select(TaskEvent.type, TaskEvent.task_id).order_by(TaskEvent.id)).all()
+    assert [event_type for event_type, _ in logged] == [
+        TaskEventTypeEnum.CREATED, TaskEventTypeEnum.UPDATED,
+        TaskEventTypeEnum.CREATED, TaskEventTypeEnum.CREATED, TaskEventTypeEnum.CREATED,
+        TaskEventTypeEnum.DELETED,
+    ]
+    assert logged[-1][1] == task_id
+
+def test_handlers_wake_streams_after_commit(client: TestClient, auth_headers: dict, monkeypatch):
+    woken = []
+    monkeypatch.setattr(events.event_broker, "committed", lambda user_ids: woken.extend(user_ids))
+    user_id = client.get("/users/me", headers=auth_headers).json()["id"]
+
+    task_id = client.post("/tasks/", json={"title": "Wakes", "due_date": DUE_DATE}, headers=auth_headers).json()["id"]
+    client.put(f"/tasks/{task_id}", json={"title": "Wakes again"}, headers=auth_headers)
+    assert woken == [user_id, user_id]
+    # Nothing committed, nothing to announce
+    client.delete("/tasks/999999", headers=auth_headers)
+    assert woken == [user_id, user_id]
+
+def test_stream_replays_then_follows_changes(client: TestClient, auth_headers: dict, async_engine):
+    ids = [
+        client.post("/tasks/", json={"title": f"Streamed {i}", "due_date": DUE_DATE}, headers=auth_headers).json()["id"]
+        for i in range(3)
+    ]
+    user_id = client.get("/users/me", headers=auth_headers).json()["id"]
+
+    async def scenario():
+        stream = stream_task_events(async_engine, events.event_broker, user_id, after_id=1, batch_size=2, keepalive=0.05)
+        # Resuming after the first event replays the rest, in batches
+        replayed = [parse(await stream.__anext__()) for _ in range(2)]
+        assert [e["data"]["task_id"] for e in replayed] == ids[1:]
+        assert replayed[0]["event"] == "created" and replayed[0]["data"]["task"]["title"] == "Streamed 1"
+        assert await stream.__anext__() == b": keep-alive\n\n"
+
+        # A commit made while the stream waits is pushed right away
+        next_chunk = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        async with RequestSession(async_engine, expire_on_commit=False) as session:
+            task = await session.get(Task, ids[0])
+            await session.delete(task)
+            events.event_broker.notify_after_commit(session, user_id)
+            await session.commit()
+        deleted = parse(await asyncio.wait_for(next_chunk, 1))
+        assert deleted["event"] == "deleted" and deleted["data"] == {"task_id": ids[0], "task": None}
+        assert int(deleted["id"]) > int(replayed[-1]["id"])
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+def test_slow_streams_are_dropped(client: TestClient, auth_headers: dict, async_engine):
+    broker = InMemoryEventBroker(queue_size=2)
+
+    async def scenario():
+        stream = stream_task_events(async_engine, broker, 1, after_id=0, batch_size=10, keepalive=0.05)
+        assert await stream.__anext__() == b": keep-alive\n\n"
+        # Three changes while the client isn't reading overflow its queue
+        for _ in range(3):
+            broker.dispatch(1)
+        assert await stream.__anext__() == b"event: dropped\ndata: {}\n\n"
+        assert broker._subscribers == {}
+        await stream.aclose()
+
+    asyncio.run(scenario())
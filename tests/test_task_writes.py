@@ -0,0 +1,56 @@
+import pytest
+from datetime import date, timedelta
+from fastapi.testclient import TestClient
+
+@pytest.fixture
+def task_id(client: TestClient, auth_headers: dict) -> int:
+    response = client.post(
+        "/tasks/",
+        json={
+            "title": "Write Path Task",
+            "due_date": (date.today() + timedelta(days=1)).isoformat()
+        },
+        headers=auth_headers
+    )
+    # Warm the principal cache so authentication issues no queries
+    client.get("/users/me", headers=auth_headers)
+    return response.json()["id"]
+
+def test_update_is_one_statement(client: TestClient, auth_headers: dict, sql_statements, task_id: int):
+    with sql_statements() as statements:
+        response = client.put(f"/tasks/{task_id}", json={"status": "Completed"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "Completed"
+    assert response.json()["title"] == "Write Path Task"
+    assert len(statements) == 1
+    assert statements[0].lstrip().upper().startswith("UPDATE")
+    assert "RETURNING" in statements[0].upper()
+
+def test_delete_is_one_statement(client: TestClient, auth_headers: dict, sql_statements, task_id: int):
+    with sql_statements() as statements:
+        response = client.delete(f"/tasks/{task_id}", headers=auth_headers)
+    assert response.status_code == 204
+    assert len(statements) == 1
+    assert statements[0].lstrip().upper().startswith("DELETE")
+
+    response = client.delete(f"/tasks/{task_id}", headers=auth_headers)
+    assert response.status_code == 404
+
+def test_update_missing_task(client: TestClient, auth_headers: dict, sql_statements, task_id: int):
+    with sql_statements() as statements:
+        response = client.put("/tasks/999999", json={"status": "Completed"}, headers=auth_headers)
+    assert response.status_code == 404
+    assert len(statements) == 1
+
+def test_update_other_users_task(client: TestClient, auth_headers: dict, task_id: int):
+    client.post("/register", json={
+        "email": "other@example.com",
+        "username": "otheruser",
+        "password": "otherpassword"
+    })
+    token = client.post("/token", data={"username": "otheruser", "password": "otherpassword"}).json()["access_token"]
+    other_headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.put(f"/tasks/{task_id}", json={"status": "Completed"}, headers=other_headers).status_code == 404
+    assert client.delete(f"/tasks/{task_id}", headers=other_headers).status_code == 404
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["status"] == "Pending"